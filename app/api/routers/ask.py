@@ -1,22 +1,132 @@
 # app/api/routers/ask.py
+import asyncio
 import json
-from fastapi import APIRouter, Depends
+from typing import AsyncIterator
+from cachetools import LRUCache
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from app.schemas.ask import AskBody
-from app.services.gemini import ask_gemini
-from app.core.config import DATA_FILE
+from app.services.gemini import ask_gemini_cached, stream_gemini
+from app.services.answer_cache import answer_cache
+from app.services.query import QueryEngine
+from app.services.store import get_store
+from app.core.config import DATA_FILE, PROMPT_LOCAL_ANSWERS, PROMPT_TOP_K
+from app.core.metrics import phase, collect_timings, timings_ms, PROMPT_REQUESTS
 from app.core.auth import require_bearer  # 👈
-from app.core.auth import require_jwt
+from app.core.auth import require_scope
 
 router = APIRouter(
     prefix="/prompt",
     tags=["prompt"],
-    dependencies=[Depends(require_jwt)]  # 👈
+    dependencies=[Depends(require_scope("ask"))]  # 👈
 )
 
+# índices ya construidos por snapshot (los snapshots terminados no cambian)
+_engines: LRUCache = LRUCache(maxsize=8)
+
+def load_products(scrape_id: int | None = None) -> tuple[int | None, list[dict] | None]:
+    # snapshot del store (índice por scrape_id); data.json solo como respaldo heredado.
+    # Los snapshots recortados con `fields` no cuentan: sin rating/reseñas los filtros darían "ninguno"
+    store = get_store()
+    if scrape_id is None:
+        latest = store.latest_scrape()
+        scrape_id = latest["id"] if latest else None
+    if scrape_id is not None:
+        return scrape_id, store.products(scrape_id=scrape_id)
+    if store.list_scrapes(limit=1):
+        return None, None  # solo hay scrapes recortados (y data.json sería uno de ellos)
+    if DATA_FILE.exists():
+        return None, json.loads(DATA_FILE.read_text(encoding="utf-8"))
+    return None, None
+
+def _engine(scrape_id: int | None, data: list[dict]) -> QueryEngine:
+    if scrape_id is None:
+        return QueryEngine(data)
+    key = (scrape_id, len(data))
+    engine = _engines.get(key)
+    if engine is None:
+        engine = _engines[key] = QueryEngine(data)
+    return engine
+
+NO_DATA = {"status": "error", "message": "No hay productos guardados con todos los campos. Ejecuta primero /scrape (sin `fields`)."}
+
+async def _route(body: AskBody) -> tuple[dict | None, list[dict] | None]:
+    # (respuesta local, None) | (None, productos relevantes para el LLM) | (None, None) sin datos
+    with phase("store_read"):
+        scrape_id, data = await run_in_threadpool(load_products, body.scrape_id)
+    if not data:
+        return None, None
+    with phase("local_query"):
+        engine = _engine(scrape_id, data)
+        if PROMPT_LOCAL_ANSWERS and body.local:
+            local = engine.answer(body.question)
+            if local is not None:
+                PROMPT_REQUESTS.inc(source="local")
+                return local.to_dict(), None
+        return None, engine.top_k(body.question, body.top_k or PROMPT_TOP_K)
+
+def _sse(event: str, payload: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(payload, ensure_ascii=False)}\n\n"
+
 @router.post("")
-def ask(body: AskBody):
-    if not DATA_FILE.exists():
-        return {"status": "error", "message": "data.json no existe. Ejecuta primero /scrape."}
-    data = json.loads(DATA_FILE.read_text(encoding="utf-8"))
-    ans = ask_gemini(data, body.question)
-    return {"status": "success", "answer": ans}
+async def ask(body: AskBody, timings: bool = Query(False, description="Añade el desglose de tiempos por fase (ms)")):
+    with collect_timings() as spent:
+        result = await _ask(body)
+    if timings:
+        result["timings"] = timings_ms(spent)
+    return result
+
+async def _ask(body: AskBody) -> dict:
+    local, relevant = await _route(body)
+    if local is not None:
+        return {"status": "success", "source": "local", **local}
+    if relevant is None:
+        return dict(NO_DATA)
+    try:
+        ans, encoded, source = await ask_gemini_cached(
+            relevant, body.question, fields=body.fields, token_budget=body.token_budget, strategy=body.overflow,
+            fresh=body.fresh,
+        )
+    except asyncio.TimeoutError:  # en 3.10 no es el TimeoutError builtin
+        raise HTTPException(status_code=status.HTTP_504_GATEWAY_TIMEOUT, detail="Gemini no respondió a tiempo")
+    PROMPT_REQUESTS.inc(source="gemini" if source == "miss" else "cache")
+    return {"status": "success", "source": "gemini", "answer": ans, "cached": source != "miss", "prompt": encoded.to_dict()}
+
+@router.post("/stream")
+async def ask_stream(body: AskBody):
+    """SSE: `meta` → `token`* → `done` (o `error`). Si el cliente se desconecta se cancela la generación."""
+    local, relevant = await _route(body)
+    if local is None and relevant is None:
+        return NO_DATA
+
+    async def events() -> AsyncIterator[str]:
+        if local is not None:
+            yield _sse("meta", {"source": "local", "intent": local["intent"]})
+            yield _sse("token", {"text": local["answer"]})
+            yield _sse("done", {"product_ids": local["product_ids"], "matched": local["matched"]})
+            return
+        PROMPT_REQUESTS.inc(source="gemini_stream")
+        encoded, chunks = await stream_gemini(
+            relevant, body.question, fields=body.fields, token_budget=body.token_budget, strategy=body.overflow,
+            fresh=body.fresh,
+        )
+        yield _sse("meta", {"source": "gemini", "prompt": encoded.to_dict()})
+        size = 0
+        try:
+            async for text in chunks:
+                size += len(text)
+                yield _sse("token", {"text": text})
+        except asyncio.TimeoutError:
+            yield _sse("error", {"detail": "Gemini no respondió a tiempo"})
+            return
+        except Exception as e:  # cabeceras ya enviadas: el error va como evento
+            yield _sse("error", {"detail": str(e) or type(e).__name__})
+            return
+        yield _sse("done", {"chars": size})
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+@router.get("/cache")
+async def answer_cache_stats():
+    return answer_cache.stats()
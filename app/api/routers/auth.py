@@ -1,8 +1,10 @@
 # app/api/routers/auth.py
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status
+from jose import JWTError
 from pydantic import BaseModel
 from app.core.config import AUTH_CLIENT_ID, AUTH_CLIENT_SECRET, JWT_EXPIRES_MINUTES
-from app.core.security import create_access_token
+from app.core.security import create_access_token, decode_token, token_verifier
+from app.core.auth import bearer_token, require_jwt
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
@@ -10,6 +12,9 @@ class TokenRequest(BaseModel):
     client_id: str
     client_secret: str
 
+class RevokeRequest(BaseModel):
+    token: str | None = None  # por defecto, el propio token de la petición
+
 @router.post("/token")
 def issue_token(body: TokenRequest):
     if body.client_id != AUTH_CLIENT_ID or body.client_secret != AUTH_CLIENT_SECRET:
@@ -21,3 +26,19 @@ def issue_token(body: TokenRequest):
         "token_type": "bearer",
         "expires_in": JWT_EXPIRES_MINUTES * 60,
     }
+
+@router.post("/revoke")
+def revoke_token(
+    body: RevokeRequest | None = None,
+    claims: dict = Depends(require_jwt),
+    own_token: str = Depends(bearer_token),
+):
+    token = body.token if body and body.token else own_token
+    try:
+        target = decode_token(token)
+    except JWTError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Token inválido o ya expirado")
+    if target.get("sub") != claims.get("sub"):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Solo puedes revocar tokens propios")
+    revoked = token_verifier.revoke(token)
+    return {"status": "revoked", "jti": revoked.get("jti"), "exp": revoked.get("exp")}
@@ -2,6 +2,7 @@
 from fastapi import APIRouter
 from datetime import datetime, timezone
 from app.core.config import SERVICE_NAME, VERSION
+from app.services.readiness import readiness
 
 router = APIRouter(tags=["health"])
 
@@ -14,23 +15,6 @@ def healthz():
     return {"status": "ok", "service": SERVICE_NAME, "version": VERSION, "uptime_seconds": int(uptime)}
 
 @router.get("/readiness")
-def readiness():
-    import shutil, importlib
-    checks = {}
-    try:
-        importlib.import_module("playwright")
-        checks["playwright_import"] = True
-    except Exception as e:
-        checks["playwright_import"] = f"error: {e}"
-    checks["playwright_cli"] = bool(shutil.which("playwright"))
-
-    # fs write
-    try:
-        from pathlib import Path
-        p = Path(".writetest.tmp"); p.write_text("ok", encoding="utf-8"); p.unlink(missing_ok=True)
-        checks["fs_write"] = True
-    except Exception as e:
-        checks["fs_write"] = f"error: {e}"
-
-    ready = all(v is True for v in checks.values())
-    return {"status": "ok" if ready else "degraded", "ready": ready, "checks": checks}
+async def readiness_probe():
+    # resultado cacheado (se refresca en segundo plano cada READINESS_INTERVAL s)
+    return await readiness.snapshot()
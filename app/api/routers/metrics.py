@@ -0,0 +1,11 @@
+# app/api/routers/metrics.py
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from app.services.worker_metrics import collect
+
+router = APIRouter(tags=["metrics"])
+
+@router.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    # formato de texto de Prometheus (público, como /healthz); con varios workers, los de todos
+    return PlainTextResponse(collect(), media_type="text/plain; version=0.0.4; charset=utf-8")
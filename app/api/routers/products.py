@@ -0,0 +1,45 @@
+# app/api/routers/products.py
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.concurrency import run_in_threadpool
+from app.services.store import get_store
+from app.services.cache import normalize_url
+from app.services.raw_store import raw_store
+from app.core.auth import require_scope
+
+router = APIRouter(
+    prefix="/products",
+    tags=["products"],
+    dependencies=[Depends(require_scope("scrape"))]
+)
+
+@router.get("")
+async def list_products(
+    scrape_id: int | None = Query(None, description="Snapshot concreto (ver /products/scrapes)"),
+    asin: str | None = Query(None, description="Historial de un producto por ASIN"),
+    since: float | None = Query(None, description="Solo productos guardados desde este epoch (s)"),
+    limit: int = Query(100, ge=1, le=1000),
+    offset: int = Query(0, ge=0),
+):
+    items = await run_in_threadpool(
+        get_store().products, scrape_id=scrape_id, asin=asin, since=since, limit=limit, offset=offset, with_meta=True,
+    )
+    return {"count": len(items), "limit": limit, "offset": offset, "items": items}
+
+@router.get("/scrapes")
+async def list_scrapes(
+    url: str | None = Query(None, description="Filtra por URL de búsqueda (normalizada)"),
+    limit: int = Query(50, ge=1, le=500),
+    offset: int = Query(0, ge=0),
+):
+    norm = normalize_url(url) if url else None
+    scrapes = await run_in_threadpool(get_store().list_scrapes, url=norm, limit=limit, offset=offset)
+    return {"count": len(scrapes), "items": scrapes}
+
+@router.get("/scrapes/{scrape_id}/raw")
+async def raw_capture(scrape_id: int):
+    """Captura cruda de un scrape en el formato de RAW_FILE (raw_html solo si se capturó con raw=full)."""
+    await run_in_threadpool(raw_store.flush)  # la captura se escribe en segundo plano
+    capture = await run_in_threadpool(raw_store.load, scrape_id)
+    if capture is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Sin captura cruda para ese scrape")
+    return capture
@@ -1,37 +1,192 @@
 import json
+from contextlib import contextmanager
+from typing import AsyncIterator, Iterator, Literal
 
-from fastapi import APIRouter, Query, Depends
-from starlette.concurrency import run_in_threadpool
-from app.services.scraper import scrape_amazon
-from app.services.purify import normalize_children_text
-from app.core.config import RAW_FILE, DATA_FILE
-from app.core.auth import require_jwt
+from fastapi import APIRouter, Query, Depends, Header, HTTPException, status
+from fastapi.responses import StreamingResponse
+from app.services.pipeline import scrape_and_save, stream_scrape
+from app.services.batch_scrape import scrape_batch
+from app.schemas.scrape import BatchBody
+from app.services.jobs import job_manager, JobQueueFull
+from app.services.cache import scrape_cache
+from app.services.browser_pool import PoolTimeout
+from app.services.limiter import QueueFull, QueueTimeout
+from app.services.http_fetch import FastPathMiss
+from app.services.purify import FIELDS, parse_fields
+from app.core.config import SCRAPE_RETRY_AFTER, SCRAPE_MAX_PAGES, SCRAPE_BATCH_PARALLELISM
+from app.core.metrics import collect_timings, timings_ms
+from app.core.auth import require_scope
 
 router = APIRouter(
     prefix="/scrape",
     tags=["scrape"],
-    dependencies=[Depends(require_jwt)]   # 👈 protege todo el router
+    dependencies=[Depends(require_scope("scrape"))]   # 👈 protege todo el router
 )
 
+BlockProfileName = Literal["minimal", "text-only", "full"]
+FetchMode = Literal["auto", "http", "browser"]
+StreamFormat = Literal["ndjson", "sse"]
+RawMode = Literal["none", "compact", "full"]
+
+def _fields(
+    fields: str | None = Query(None, description=f"Campos a extraer, separados por comas ({', '.join(FIELDS)}); por defecto todos"),
+) -> tuple[str, ...] | None:
+    try:
+        return parse_fields(fields)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e))
+
+def _bypass_cache(fresh: bool, cache_control: str | None) -> bool:
+    return fresh or "no-cache" in (cache_control or "").lower()
+
+def _overloaded(code: int, exc: Exception) -> HTTPException:
+    return HTTPException(status_code=code, detail=str(exc), headers={"Retry-After": str(SCRAPE_RETRY_AFTER)})
+
+def _error_status(exc: Exception) -> int | None:
+    if isinstance(exc, QueueFull):
+        return status.HTTP_429_TOO_MANY_REQUESTS
+    if isinstance(exc, (QueueTimeout, PoolTimeout)):
+        return status.HTTP_503_SERVICE_UNAVAILABLE
+    if isinstance(exc, FastPathMiss):
+        return status.HTTP_502_BAD_GATEWAY
+    return None
+
+@contextmanager
+def _scrape_errors() -> Iterator[None]:
+    try:
+        yield
+    except (QueueFull, QueueTimeout, PoolTimeout) as e:
+        raise _overloaded(_error_status(e), e)
+    except FastPathMiss as e:
+        raise HTTPException(status_code=status.HTTP_502_BAD_GATEWAY, detail=f"Modo http sin resultados: {e}")
+
+def _frame(record: dict, fmt: str) -> str:
+    data = json.dumps(record, ensure_ascii=False)
+    if fmt == "sse":
+        return f"event: {record['type']}\ndata: {data}\n\n"
+    return data + "\n"
+
 @router.post("")
-async def scrape_and_purify(url: str = Query(..., description="URL de búsqueda de Amazon")):
-    raw_data = await run_in_threadpool(scrape_amazon, url)
-    RAW_FILE.write_text(json.dumps(raw_data, indent=2, ensure_ascii=False), encoding="utf-8")
-
-    structured = []
-    for idx, prod in enumerate(raw_data, start=1):
-        if isinstance(prod, dict) and "children_text" in prod:
-            clean = normalize_children_text(prod["children_text"])
-            if clean:
-                clean["id"] = idx
-                structured.append(clean)
-
-    DATA_FILE.write_text(json.dumps(structured, indent=2, ensure_ascii=False), encoding="utf-8")
+async def scrape_and_purify(
+    url: str = Query(..., description="URL de búsqueda de Amazon"),
+    pages: int = Query(1, ge=1, le=SCRAPE_MAX_PAGES, description="Páginas de resultados a recorrer (en paralelo)"),
+    max_items: int | None = Query(None, ge=1, description="Corta al alcanzar este nº de productos únicos"),
+    fresh: bool = Query(False, description="Ignora la caché y vuelve a scrapear"),
+    block: BlockProfileName | None = Query(None, description="Recursos a bloquear (por defecto SCRAPE_BLOCK_PROFILE)"),
+    mode: FetchMode | None = Query(None, description="auto: HTTP con respaldo Playwright (por defecto SCRAPE_FETCH_MODE)"),
+    raw: RawMode | None = Query(None, description="HTML crudo a guardar: none | compact (sin raw_html) | full (por defecto RAW_CAPTURE)"),
+    incremental: bool = Query(False, description="Purifica solo lo nuevo/cambiado desde el último snapshot y devuelve `delta`"),
+    timings: bool = Query(False, description="Añade el desglose de tiempos por fase (ms; las páginas paralelas suman)"),
+    fields: tuple[str, ...] | None = Depends(_fields),
+    cache_control: str | None = Header(None),
+):
+    with _scrape_errors(), collect_timings() as spent:
+        result = await scrape_and_save(
+            url, pages=pages, max_items=max_items, fresh=_bypass_cache(fresh, cache_control), block=block, mode=mode,
+            raw=raw, incremental=incremental, fields=fields,
+        )
+    if timings:
+        result["timings"] = timings_ms(spent)
+    return {"status": "success", **result}
+
+@router.post("/stream")
+async def stream_scrape_and_purify(
+    url: str = Query(..., description="URL de búsqueda de Amazon"),
+    pages: int = Query(1, ge=1, le=SCRAPE_MAX_PAGES),
+    max_items: int | None = Query(None, ge=1),
+    fresh: bool = Query(False),
+    block: BlockProfileName | None = Query(None),
+    mode: FetchMode | None = Query(None),
+    raw: RawMode | None = Query(None),
+    format: StreamFormat = Query("ndjson", description="ndjson (una línea por registro) o sse (text/event-stream)"),
+    fields: tuple[str, ...] | None = Depends(_fields),
+    cache_control: str | None = Header(None),
+):
+    records = stream_scrape(
+        url, pages=pages, max_items=max_items, fresh=_bypass_cache(fresh, cache_control), block=block, mode=mode,
+        raw=raw, fields=fields,
+    )
+    # el primer registro se espera aquí: los rechazos de admisión siguen siendo 429/503 y no un 200 a medias
+    with _scrape_errors():
+        first = await anext(records)
+
+    async def body() -> AsyncIterator[str]:
+        yield _frame(first, format)
+        try:
+            async for record in records:
+                yield _frame(record, format)
+        except Exception as e:  # ya se enviaron cabeceras: el error va como último registro
+            yield _frame({"type": "error", "detail": str(e) or type(e).__name__}, format)
+        finally:
+            await records.aclose()
+
+    media_type = "text/event-stream" if format == "sse" else "application/x-ndjson"
+    return StreamingResponse(body(), media_type=media_type, headers={"Cache-Control": "no-cache"})
+
+@router.post("/batch")
+async def scrape_batch_and_purify(body: BatchBody):
+    """
+    Varias búsquedas en paralelo (`parallelism`, por defecto SCRAPE_BATCH_PARALLELISM) sobre el pool
+    de navegadores compartido. Cada URL trae su resultado o su error; ninguna aborta el lote.
+    """
+    items, elapsed = await scrape_batch(
+        body.urls, parallelism=body.parallelism, pages=body.pages, max_items=body.max_items,
+        fresh=body.fresh, block=body.block, mode=body.mode, raw=body.raw, incremental=body.incremental,
+        fields=parse_fields(body.fields),
+    )
+    results = []
+    for item in items:
+        entry = {"url": item.url, "seconds": round(item.seconds, 3), "duplicate": item.duplicate}
+        if item.error is None:
+            results.append({**entry, "status": "success", **item.result})
+        else:
+            code = _error_status(item.error) or status.HTTP_500_INTERNAL_SERVER_ERROR
+            detail = str(item.error) or type(item.error).__name__
+            results.append({**entry, "status": "error", "status_code": code, "error": detail})
+    ok = sum(r["status"] == "success" for r in results)
     return {
-        "status": "success",
-        "url": url,
-        "saved_raw": str(RAW_FILE.resolve()),
-        "saved_structured": str(DATA_FILE.resolve()),
-        "raw_items": len(raw_data),
-        "structured_items": len(structured)
+        "status": "success" if ok == len(results) else ("partial" if ok else "error"),
+        "count": len(results),
+        "succeeded": ok,
+        "failed": len(results) - ok,
+        "cached": sum(bool(r.get("cached")) for r in results),
+        "parallelism": body.parallelism or SCRAPE_BATCH_PARALLELISM,
+        "structured_items": sum(r.get("structured_items", 0) for r in results if not r["duplicate"]),
+        "seconds": round(elapsed, 3),
+        "sequential_seconds": round(sum(i.seconds for i in items if not i.duplicate), 3),  # suma de cada URL por separado
+        "urls_per_second": round(len(results) / elapsed, 2) if elapsed else None,
+        "results": results,
     }
+
+@router.post("/jobs", status_code=status.HTTP_202_ACCEPTED)
+async def submit_scrape_job(
+    url: str = Query(..., description="URL de búsqueda de Amazon"),
+    pages: int = Query(1, ge=1, le=SCRAPE_MAX_PAGES),
+    max_items: int | None = Query(None, ge=1),
+    fresh: bool = Query(False),
+    block: BlockProfileName | None = Query(None),
+    mode: FetchMode | None = Query(None),
+    raw: RawMode | None = Query(None),
+    incremental: bool = Query(False),
+    fields: tuple[str, ...] | None = Depends(_fields),
+    cache_control: str | None = Header(None),
+):
+    try:
+        job, coalesced = await job_manager.submit(
+            url, pages=pages, max_items=max_items, fresh=_bypass_cache(fresh, cache_control), block=block, mode=mode,
+            raw=raw, incremental=incremental, fields=fields,
+        )
+    except JobQueueFull as e:
+        raise _overloaded(status.HTTP_429_TOO_MANY_REQUESTS, e)
+    return {"status": "accepted", "job_id": job.id, "job_status": job.status, "coalesced": coalesced}
+
+@router.get("/jobs/{job_id}")
+async def get_scrape_job(job_id: str):
+    job = await job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job no encontrado o expirado")
+    return job
+
+@router.get("/cache")
+async def scrape_cache_stats():
+    return scrape_cache.stats()
@@ -1,22 +1,24 @@
 # app/core/auth.py
+from typing import Any, Callable, Dict
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from jose import JWTError
-from app.core.security import decode_token
+from app.core.security import token_verifier
 
 bearer_scheme = HTTPBearer(auto_error=False)
 
-def require_jwt(credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme)):
+def bearer_token(credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme)) -> str:
     if credentials is None or credentials.scheme.lower() != "bearer":
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Not authenticated",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    token = credentials.credentials
+    return credentials.credentials
+
+def require_jwt(token: str = Depends(bearer_token)) -> Dict[str, Any]:
     try:
-        claims = decode_token(token)
-        return claims
+        return token_verifier.verify(token)  # caché de claims verificados (ver TokenVerifier)
     except JWTError:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -24,5 +26,17 @@ def require_jwt(credentials: HTTPAuthorizationCredentials = Depends(bearer_schem
             headers={"WWW-Authenticate": "Bearer"},
         )
 
+def require_scope(scope: str) -> Callable[..., Dict[str, Any]]:
+    """Dependencia: token válido y con `scope` entre sus `scopes` (403 si no)."""
+    def checker(claims: Dict[str, Any] = Depends(require_jwt)) -> Dict[str, Any]:
+        if scope not in (claims.get("scopes") or []):
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail=f"Token sin el scope '{scope}'",
+                headers={"WWW-Authenticate": f'Bearer scope="{scope}"'},
+            )
+        return claims
+    return checker
+
 # Compatibilidad con código antiguo:
 require_bearer = require_jwt  # 👈 opcional, pero práctico
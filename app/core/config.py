@@ -11,19 +11,97 @@ DATA_DIR.mkdir(exist_ok=True)
 
 GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")  # requerido para /ask
 GEMINI_MODEL = os.getenv("GEMINI_MODEL", "gemini-2.5-flash-lite")
+# Codificación de productos en el prompt de /prompt (tabla compacta)
+PROMPT_FIELDS = [f.strip() for f in os.getenv("PROMPT_FIELDS", "id,title,rating,reviews,price,delivery").split(",") if f.strip()]
+PROMPT_TOKEN_BUDGET = int(os.getenv("PROMPT_TOKEN_BUDGET", "30000"))  # tokens estimados (~4 caracteres/token); 0 = sin límite
+PROMPT_OVERFLOW = os.getenv("PROMPT_OVERFLOW", "truncate")          # truncate (primeros N) | sample (muestreo uniforme)
+PROMPT_TIMEOUT = float(os.getenv("PROMPT_TIMEOUT", "60"))  # segundos máximos por respuesta de Gemini (504 si se agota)
+# Motor de consultas local de /prompt: responde intenciones estructuradas sin LLM y, si no, envía los top-k
+PROMPT_LOCAL_ANSWERS = os.getenv("PROMPT_LOCAL_ANSWERS", "true").lower() != "false"
+PROMPT_TOP_K = int(os.getenv("PROMPT_TOP_K", "50"))
+# Caché de respuestas de /prompt (clave = datos enviados + pregunta normalizada + modelo)
+PROMPT_CACHE_TTL = int(os.getenv("PROMPT_CACHE_TTL", "600"))              # segundos; 0 desactiva la caché
+PROMPT_CACHE_MAX_ENTRIES = int(os.getenv("PROMPT_CACHE_MAX_ENTRIES", "512"))
 
 SERVICE_NAME = "amazon-scraper"
 VERSION = "1.0.0"
 
+# Servidor (start.py). Cada worker es un proceso con su propio pool de navegadores y cachés en memoria
+WEB_HOST = os.getenv("WEB_HOST", "127.0.0.1")
+WEB_PORT = int(os.getenv("WEB_PORT", "8000"))
+WEB_WORKERS = int(os.getenv("WEB_WORKERS", "1"))                    # p.ej. nº de núcleos del nodo
+WEB_PRELOAD = os.getenv("WEB_PRELOAD", "false").lower() == "true"   # importar la app antes del fork (gunicorn)
+WEB_TIMEOUT = int(os.getenv("WEB_TIMEOUT", "120"))                  # segundos sin respuesta antes de reiniciar un worker
+METRICS_SYNC = float(os.getenv("METRICS_SYNC", "5"))                 # con varios workers: segundos entre publicaciones de métricas
+# Subsistemas pesados que se inicializan al arrancar (browser, gemini); el resto, en su primer uso
+STARTUP_WARM = {s.strip() for s in os.getenv("STARTUP_WARM", "browser").split(",") if s.strip()}
+READINESS_INTERVAL = float(os.getenv("READINESS_INTERVAL", "10"))   # segundos entre refrescos de los checks de /readiness
+
 RAW_FILE = DATA_DIR / "scrapped_info.json"
 DATA_FILE = DATA_DIR / "data.json"
+EXPORT_LOCK = DATA_DIR / ".export.lock"  # cerrojo entre workers para volcar RAW_FILE/DATA_FILE juntos
 
-# Placeholder para DB a futuro
-DATABASE_URL = os.getenv("DATABASE_URL")  # e.g. "postgresql+psycopg://..."
+# Almacén de scrapes/productos. Sin valor → SQLite (WAL) en data/amazon.db
+DATABASE_URL = os.getenv("DATABASE_URL")  # e.g. "sqlite:///data/amazon.db"
+# Estado compartido entre workers del mismo host (jobs, tokens revocados)
+STATE_DB = os.getenv("STATE_DB", "data/state.db")
+# Seguir volcando RAW_FILE/DATA_FILE en cada scrape (compatibilidad)
+EXPORT_JSON_FILES = os.getenv("EXPORT_JSON_FILES", "true").lower() != "false"
+# Captura del HTML crudo: none (no se guarda) | compact (attrs + children_text) | full (con raw_html)
+RAW_CAPTURE = os.getenv("RAW_CAPTURE", "full")
+RAW_CAPTURE_DIR = os.getenv("RAW_CAPTURE_DIR", "data/raw")                # blobs por contenido + una captura por scrape
+RAW_CAPTURE_COMPRESSION = os.getenv("RAW_CAPTURE_COMPRESSION", "auto")  # auto (zstd si está instalado) | zstd | gzip
 # Token de acceso para autenticación
 ACCESS_TOKEN = os.getenv("ACCESS_TOKEN")
 
 JWT_SECRET = os.getenv("JWT_SECRET")
 JWT_EXPIRES_MINUTES = int(os.getenv("JWT_EXPIRES_MINUTES", "60"))
+JWT_CACHE_MAX_ENTRIES = int(os.getenv("JWT_CACHE_MAX_ENTRIES", "10000"))  # tokens verificados en memoria (0 = sin caché)
+JWT_REVOCATION_SYNC = float(os.getenv("JWT_REVOCATION_SYNC", "1"))        # segundos entre lecturas de revocaciones de otros workers
 AUTH_CLIENT_ID = os.getenv("AUTH_CLIENT_ID")
-AUTH_CLIENT_SECRET = os.getenv("AUTH_CLIENT_SECRET")
\ No newline at end of file
+AUTH_CLIENT_SECRET = os.getenv("AUTH_CLIENT_SECRET")
+
+# Pool de navegadores Playwright (se arranca en el lifespan de la app)
+BROWSER_POOL_SIZE = int(os.getenv("BROWSER_POOL_SIZE", "2"))                  # nº de Chromium vivos
+BROWSER_CONTEXTS_PER_BROWSER = int(os.getenv("BROWSER_CONTEXTS_PER_BROWSER", "2"))
+BROWSER_CONTEXT_MAX_USES = int(os.getenv("BROWSER_CONTEXT_MAX_USES", "50"))    # reciclar contexto tras N usos
+BROWSER_ACQUIRE_TIMEOUT = float(os.getenv("BROWSER_ACQUIRE_TIMEOUT", "30"))    # segundos esperando un contexto libre
+BROWSER_HEADLESS = os.getenv("BROWSER_HEADLESS", "true").lower() != "false"
+BROWSER_WARM = os.getenv("BROWSER_WARM", "true").lower() != "false"          # crear los contextos al arrancar
+
+# Control de admisión de /scrape: páginas en vuelo + cola de espera acotada
+SCRAPE_MAX_IN_FLIGHT = int(os.getenv("SCRAPE_MAX_IN_FLIGHT", str(BROWSER_POOL_SIZE * BROWSER_CONTEXTS_PER_BROWSER)))
+SCRAPE_MAX_QUEUE = int(os.getenv("SCRAPE_MAX_QUEUE", "20"))            # si se llena → 429
+SCRAPE_QUEUE_TIMEOUT = float(os.getenv("SCRAPE_QUEUE_TIMEOUT", "30"))  # si se agota esperando → 503
+SCRAPE_RETRY_AFTER = int(os.getenv("SCRAPE_RETRY_AFTER", "5"))         # segundos sugeridos en Retry-After
+
+# Paginación de búsquedas (/scrape?pages=N)
+SCRAPE_MAX_PAGES = int(os.getenv("SCRAPE_MAX_PAGES", "20"))
+SCRAPE_PAGE_CONCURRENCY = int(os.getenv("SCRAPE_PAGE_CONCURRENCY", "3"))  # páginas simultáneas por scrape (cada una con su turno de admisión)
+# Límite de peticiones por host (token bucket; 0 = sin límite), para todas las páginas que se piden
+SCRAPE_HOST_RATE = float(os.getenv("SCRAPE_HOST_RATE", "0"))   # peticiones/s por host
+SCRAPE_HOST_BURST = int(os.getenv("SCRAPE_HOST_BURST", "5"))
+
+# Scrapes por lotes (POST /scrape/batch)
+SCRAPE_BATCH_MAX_URLS = int(os.getenv("SCRAPE_BATCH_MAX_URLS", "100"))
+SCRAPE_BATCH_PARALLELISM = int(os.getenv("SCRAPE_BATCH_PARALLELISM", str(SCRAPE_MAX_IN_FLIGHT)))  # URLs a la vez
+
+# Jobs de scraping en segundo plano (POST /scrape/jobs)
+SCRAPE_JOB_WORKERS = int(os.getenv("SCRAPE_JOB_WORKERS", "2"))
+SCRAPE_JOB_QUEUE = int(os.getenv("SCRAPE_JOB_QUEUE", "100"))          # jobs en cola antes de responder 429
+SCRAPE_JOB_TTL = int(os.getenv("SCRAPE_JOB_TTL", "3600"))             # segundos que se conserva un job
+SCRAPE_JOB_MAX = int(os.getenv("SCRAPE_JOB_MAX", "1000"))             # jobs recordados como máximo
+
+# Caché de resultados de /scrape (clave = URL normalizada sin parámetros de tracking)
+SCRAPE_CACHE_TTL = int(os.getenv("SCRAPE_CACHE_TTL", "300"))                  # segundos; 0 desactiva la caché
+SCRAPE_CACHE_MAX_ENTRIES = int(os.getenv("SCRAPE_CACHE_MAX_ENTRIES", "256"))
+SCRAPE_CACHE_MAX_BYTES = int(os.getenv("SCRAPE_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+SCRAPE_CACHE_DIR = os.getenv("SCRAPE_CACHE_DIR")                             # p.ej. "data/cache" → sobrevive a reinicios
+
+# Bloqueo de recursos al cargar búsquedas: minimal | text-only | full
+SCRAPE_BLOCK_PROFILE = os.getenv("SCRAPE_BLOCK_PROFILE", "minimal")
+
+# Camino rápido sin navegador: auto (HTTP y, si falla, Playwright) | http | browser
+SCRAPE_FETCH_MODE = os.getenv("SCRAPE_FETCH_MODE", "auto")
+HTTP_FETCH_TIMEOUT = float(os.getenv("HTTP_FETCH_TIMEOUT", "20"))
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "20"))
@@ -0,0 +1,222 @@
+# app/core/metrics.py
+"""
+Métricas en memoria expuestas en /metrics con el formato de texto de Prometheus
+(sin dependencias). Contadores, gauges e histogramas con etiquetas, más `phase()`
+para cronometrar fases del camino caliente y, opcionalmente, devolver el desglose
+por petición (`collect_timings`). El registro es por proceso; con varios workers
+/metrics los junta con `families`/`render_merged` (ver services/worker_metrics).
+"""
+import math
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Iterator
+
+LabelValues = tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _fmt(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, help: str, labelnames: tuple[str, ...] = ()):
+        self.name, self.help, self.labelnames = name, help, tuple(labelnames)
+        self._lock = threading.Lock()
+        self._fns: dict[LabelValues, Callable[[], float]] = {}
+        REGISTRY.append(self)
+
+    def _key(self, labels: dict[str, str]) -> LabelValues:
+        return tuple(str(labels[n]) for n in self.labelnames)
+
+    def _labels(self, key: LabelValues, *extra: str) -> str:
+        parts = [f'{n}="{_escape(v)}"' for n, v in zip(self.labelnames, key)]
+        parts.extend(e for e in extra if e)
+        return "{" + ",".join(parts) + "}" if parts else ""
+
+    def set_function(self, fn: Callable[[], float], **labels: str) -> None:
+        """El valor de esa serie se lee al renderizar (p.ej. el tamaño de una cola)."""
+        self._fns[self._key(labels)] = fn
+
+    def samples(self, const: str = "") -> Iterator[str]:
+        """`const`: etiqueta fija añadida a cada serie (p.ej. `worker="123"`)."""
+        raise NotImplementedError
+
+    def header(self) -> list[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+    def render(self) -> str:
+        return "\n".join(self.header() + list(self.samples()))
+
+
+class _Simple(_Metric):
+    def __init__(self, name: str, help: str, labelnames: tuple[str, ...] = ()):
+        super().__init__(name, help, labelnames)
+        self._values: dict[LabelValues, float] = {}
+
+    def _add(self, amount: float, labels: dict[str, str]) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def samples(self, const: str = "") -> Iterator[str]:
+        values = dict(self._values)
+        for key, fn in self._fns.items():
+            values[key] = fn()
+        if not values and not self.labelnames:
+            values = {(): 0.0}
+        for key, v in sorted(values.items()):
+            yield f"{self.name}{self._labels(key, const)} {_fmt(v)}"
+
+
+class Counter(_Simple):
+    kind = "counter"
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        self._add(amount, labels)
+
+
+class Gauge(_Simple):
+    kind = "gauge"
+
+    def set(self, value: float, **labels: str) -> None:
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        self._add(amount, labels)
+
+    def dec(self, amount: float = 1, **labels: str) -> None:
+        self._add(-amount, labels)
+
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: tuple[str, ...] = (), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        self._counts: dict[LabelValues, list[int]] = {}
+        self._sums: dict[LabelValues, float] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            counts = self._counts.get(key)
+            if counts is None:
+                counts = self._counts[key] = [0] * len(self.buckets)
+                self._sums[key] = 0.0
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+                    break
+            self._sums[key] += value
+
+    def samples(self, const: str = "") -> Iterator[str]:
+        for key in sorted(self._counts):
+            cumulative = 0
+            for bound, n in zip(self.buckets, self._counts[key]):
+                cumulative += n
+                le = 'le="%s"' % _fmt(bound)
+                yield f"{self.name}_bucket{self._labels(key, const, le)} {cumulative}"
+            yield f"{self.name}_sum{self._labels(key, const)} {_fmt(self._sums[key])}"
+            yield f"{self.name}_count{self._labels(key, const)} {cumulative}"
+
+
+REGISTRY: list[_Metric] = []
+
+
+def render() -> str:
+    return "\n".join(m.render() for m in REGISTRY) + "\n"
+
+
+# ── varios workers ──────────────────────────────────────────────────────────
+def families(worker: str) -> dict[str, list[str]]:
+    """Series de este proceso por métrica, con la etiqueta `worker` (se publican en el estado compartido)."""
+    const = f'worker="{_escape(worker)}"'
+    return {m.name: list(m.samples(const)) for m in REGISTRY}
+
+
+def render_merged(workers: list[dict[str, list[str]]]) -> str:
+    """Un único documento con las series de todos los workers, agrupadas por métrica (HELP/TYPE una vez)."""
+    lines: list[str] = []
+    for m in REGISTRY:
+        lines += m.header()
+        for fam in workers:
+            lines += fam.get(m.name, ())
+    return "\n".join(lines) + "\n"
+
+
+# ── fases del camino caliente ────────────────────────────────────────────────
+PHASE_SECONDS = Histogram("amazon_phase_seconds", "Duración de cada fase de /scrape y /prompt", ("phase",))
+_timings: ContextVar[dict[str, float] | None] = ContextVar("timings", default=None)
+
+
+@contextmanager
+def phase(name: str) -> Iterator[None]:
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - t0
+        PHASE_SECONDS.observe(elapsed, phase=name)
+        timings = _timings.get()
+        if timings is not None:
+            timings[name] = timings.get(name, 0.0) + elapsed
+
+
+@contextmanager
+def collect_timings() -> Iterator[dict[str, float]]:
+    """
+    Acumula en el dict devuelto los segundos de cada `phase()` de esta petición (también
+    en tareas e hilos lanzados desde ella). Las fases concurrentes (páginas en paralelo) suman.
+    """
+    timings: dict[str, float] = {}
+    token = _timings.set(timings)
+    t0 = time.perf_counter()
+    try:
+        yield timings
+    finally:
+        timings["total"] = time.perf_counter() - t0
+        _timings.reset(token)
+
+
+def timings_ms(timings: dict[str, float]) -> dict[str, float]:
+    return {k: round(v * 1000, 2) for k, v in timings.items()}
+
+
+# ── contadores y gauges ──────────────────────────────────────────────────────
+CARDS_SEEN = Counter("amazon_cards_seen_total", "Tarjetas de resultados vistas (incluye patrocinadas)")
+SPONSORED_SKIPPED = Counter("amazon_sponsored_skipped_total", "Tarjetas patrocinadas descartadas")
+STRUCTURED_ITEMS = Counter("amazon_structured_items_total", "Productos purificados")
+INCREMENTAL_ITEMS = Counter("amazon_incremental_items_total", "Productos en modo incremental por resultado", ("result",))
+PAGES_FETCHED = Counter("amazon_pages_fetched_total", "Páginas de resultados descargadas", ("via",))
+FALLBACKS = Counter("amazon_http_fallbacks_total", "Páginas que cayeron del camino HTTP al navegador")
+SCRAPE_REQUESTS = Counter("amazon_scrape_requests_total", "Scrapes servidos", ("cached",))
+PROMPT_REQUESTS = Counter("amazon_prompt_requests_total", "Preguntas servidas", ("source",))
+
+POOL_CAPACITY = Gauge("amazon_browser_pool_capacity", "Contextos de navegador totales")
+POOL_IDLE = Gauge("amazon_browser_pool_idle", "Contextos de navegador libres")
+SCRAPE_IN_FLIGHT = Gauge("amazon_scrape_in_flight", "Scrapes con turno de navegador")
+SCRAPE_WAITING = Gauge("amazon_scrape_queue_waiting", "Scrapes esperando turno de navegador")
+JOBS_QUEUED = Gauge("amazon_scrape_jobs_queued", "Jobs en cola")
+CACHE_ENTRIES = Gauge("amazon_cache_entries", "Entradas en memoria por caché", ("cache",))
+CACHE_LOOKUPS = Counter("amazon_cache_lookups_total", "Consultas a cada caché por resultado", ("cache", "result"))
+RAW_BLOBS = Counter("amazon_raw_blobs_total", "raw_html capturados por resultado", ("result",))
+RAW_WRITES_PENDING = Gauge("amazon_raw_writes_pending", "Escrituras de capturas/volcados en cola")
+ANSWER_LATENCY_SAVED = Counter("amazon_answer_cache_saved_seconds_total", "Latencia de Gemini ahorrada por la caché")
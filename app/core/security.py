@@ -1,8 +1,16 @@
 # app/core/security.py
+import hashlib
+import threading
+import time
+import uuid
 from datetime import datetime, timedelta, timezone
 from typing import Any, Dict, List, Optional
+from cachetools import TLRUCache
 from jose import jwt, JWTError
-from app.core.config import JWT_SECRET, JWT_EXPIRES_MINUTES
+from app.core import config
+from app.core.config import JWT_SECRET, JWT_EXPIRES_MINUTES, JWT_CACHE_MAX_ENTRIES, JWT_REVOCATION_SYNC
+from app.core.metrics import CACHE_ENTRIES, CACHE_LOOKUPS
+from app.core.state import get_state
 
 ALGORITHM = "HS256"
 
@@ -21,6 +29,7 @@ def create_access_token(
         "scopes": scopes or [],
         "iat": int(now.timestamp()),
         "exp": int(exp.timestamp()),
+        "jti": uuid.uuid4().hex,  # identificador para poder revocarlo
     }
     return jwt.encode(to_encode, JWT_SECRET, algorithm=ALGORITHM)
 
@@ -28,3 +37,96 @@ def decode_token(token: str) -> Dict[str, Any]:
     if not JWT_SECRET:
         raise RuntimeError("Server misconfigured: JWT_SECRET not set")
     return jwt.decode(token, JWT_SECRET, algorithms=[ALGORITHM])
+
+def token_digest(token: str) -> bytes:
+    return hashlib.sha256(token.encode("utf-8")).digest()
+
+def revocation_id(claims: Dict[str, Any], token: str) -> str:
+    # jti si lo tiene; los tokens antiguos sin jti se revocan por su digest
+    return claims.get("jti") or token_digest(token).hex()
+
+
+class TokenVerifier:
+    """
+    Claims ya verificados en memoria, por digest del token y hasta su `exp`:
+    un token reutilizado solo paga la firma HMAC la primera vez.
+    Incluye la lista de revocados (jti → exp), que se purga sola al expirar y se comparte
+    entre workers por STATE_DB: cada `sync_interval` segundos se leen las revocaciones nuevas.
+    """
+
+    def __init__(self, max_entries: int = JWT_CACHE_MAX_ENTRIES, sync_interval: float = JWT_REVOCATION_SYNC):
+        self.enabled = max_entries > 0
+        self._claims: TLRUCache[bytes, Dict[str, Any]] = TLRUCache(
+            maxsize=max(1, max_entries),
+            ttu=lambda _k, claims, _now: claims.get("exp", 0),
+            timer=time.time,
+        )
+        self._revoked: Dict[str, float] = {}
+        self._lock = threading.Lock()  # require_jwt también corre en el threadpool
+        self.sync_interval = sync_interval
+        self._synced_at = float("-inf")
+        self._synced_seq = 0
+        self.hits = self.misses = 0
+
+    def _sync(self) -> None:
+        # revocaciones hechas en otros workers desde la última lectura. Con un solo worker basta
+        # la primera (las que siguen vigentes tras un reinicio): las nuevas pasan por revoke() aquí
+        now = time.monotonic()
+        if now - self._synced_at < self.sync_interval:
+            return
+        if self._synced_at != float("-inf") and config.WEB_WORKERS <= 1:
+            return
+        with self._lock:
+            if now - self._synced_at < self.sync_interval:
+                return
+            self._synced_at = now  # este hilo lee; el resto sigue con lo que hay en memoria
+            since = self._synced_seq
+        seq, revoked = get_state().revoked_since(since)  # SQLite fuera del cerrojo
+        with self._lock:
+            self._synced_seq = max(self._synced_seq, seq)
+            self._revoked.update(revoked)
+
+    def verify(self, token: str) -> Dict[str, Any]:
+        """Claims del token; JWTError si la firma no vale, expiró o fue revocado."""
+        key = token_digest(token)
+        self._sync()
+        with self._lock:
+            claims = self._claims.get(key) if self.enabled else None
+        if claims is None:
+            self.misses += 1
+            claims = decode_token(token)
+            if self.enabled and "exp" in claims:
+                with self._lock:
+                    self._claims[key] = claims
+        else:
+            self.hits += 1
+        if self._revoked and revocation_id(claims, token) in self._revoked:
+            raise JWTError("Token revoked")
+        return claims
+
+    def revoke(self, token: str) -> Dict[str, Any]:
+        claims = decode_token(token)  # solo se revocan tokens válidos (firma + exp)
+        now = time.time()
+        rid, exp = revocation_id(claims, token), claims.get("exp", now + JWT_EXPIRES_MINUTES * 60)
+        get_state().revoke(rid, exp)
+        with self._lock:
+            self._revoked = {k: e for k, e in self._revoked.items() if e > now}
+            self._revoked[rid] = exp
+            self._claims.pop(token_digest(token), None)
+        return claims
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "entries": len(self._claims),
+            "max_entries": self._claims.maxsize,
+            "revoked": len(self._revoked),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+token_verifier = TokenVerifier()
+CACHE_ENTRIES.set_function(lambda: len(token_verifier._claims), cache="jwt")
+CACHE_LOOKUPS.set_function(lambda: token_verifier.hits, cache="jwt", result="hit")
+CACHE_LOOKUPS.set_function(lambda: token_verifier.misses, cache="jwt", result="miss")
@@ -0,0 +1,175 @@
+# app/core/state.py
+"""
+Estado compartido entre los procesos worker de un mismo host (SQLite en WAL, STATE_DB):
+jobs de scraping, tokens revocados, qué búsqueda hay volcada en RAW_FILE/DATA_FILE y
+la última foto de las métricas de cada worker. Lo demás (cachés en memoria, pool de
+navegadores) es por worker.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any
+
+from app.core.config import BASE_DIR, STATE_DB
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id          TEXT PRIMARY KEY,
+    key         TEXT NOT NULL,
+    status      TEXT NOT NULL,
+    pid         INTEGER NOT NULL,  -- worker que lo ejecuta
+    updated_at  REAL NOT NULL,
+    finished_at REAL,
+    data        TEXT NOT NULL      -- Job.to_dict() en JSON
+);
+CREATE INDEX IF NOT EXISTS ix_jobs_key ON jobs(key, status);
+CREATE INDEX IF NOT EXISTS ix_jobs_finished ON jobs(finished_at);
+
+CREATE TABLE IF NOT EXISTS revoked_tokens (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    rid TEXT NOT NULL UNIQUE,      -- jti o digest del token
+    exp REAL NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS meta (
+    key   TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS worker_metrics (
+    pid        INTEGER PRIMARY KEY,
+    updated_at REAL NOT NULL,
+    data       TEXT NOT NULL       -- {métrica: [líneas]} con la etiqueta worker
+);
+"""
+ACTIVE = ("queued", "running")
+
+
+class SharedState:
+    def __init__(self, path: str | Path = STATE_DB):
+        self.path = Path(path)
+        if not self.path.is_absolute():
+            self.path = BASE_DIR / self.path
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        with self._conn() as conn:
+            conn.executescript(SCHEMA)
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    # ── jobs ────────────────────────────────────────────────────────────────
+    def save_job(self, job: dict[str, Any], key: str, ttl: float) -> None:
+        now = time.time()
+        with self._conn() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO jobs (id, key, status, pid, updated_at, finished_at, data) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (job["job_id"], key, job["status"], os.getpid(), now, job.get("finished_at"),
+                 json.dumps(job, ensure_ascii=False)),
+            )
+            conn.execute("DELETE FROM jobs WHERE finished_at IS NOT NULL AND finished_at < ?", (now - ttl,))
+
+    def get_job(self, job_id: str) -> dict[str, Any] | None:
+        row = self._conn().execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return _job_row(row) if row else None
+
+    def active_job(self, key: str) -> dict[str, Any] | None:
+        """Job en cola o en curso para esa búsqueda en cualquier worker vivo."""
+        rows = self._conn().execute(
+            "SELECT * FROM jobs WHERE key = ? AND status IN (?, ?) ORDER BY updated_at DESC", (key, *ACTIVE),
+        )
+        for row in rows:
+            job = _job_row(row)
+            if job["status"] in ACTIVE:
+                return job
+        return None
+
+    # ── tokens revocados ────────────────────────────────────────────────────
+    def revoke(self, rid: str, exp: float) -> None:
+        with self._conn() as conn:
+            conn.execute("INSERT OR REPLACE INTO revoked_tokens (rid, exp) VALUES (?, ?)", (rid, exp))
+            conn.execute("DELETE FROM revoked_tokens WHERE exp < ?", (time.time(),))
+
+    def revoked_since(self, seq: int) -> tuple[int, dict[str, float]]:
+        """Revocaciones posteriores a `seq`: (último seq, {rid: exp})."""
+        rows = self._conn().execute("SELECT seq, rid, exp FROM revoked_tokens WHERE seq > ? ORDER BY seq", (seq,))
+        revoked = {}
+        for row in rows:
+            seq = row["seq"]
+            revoked[row["rid"]] = row["exp"]
+        return seq, revoked
+
+    # ── valores sueltos ─────────────────────────────────────────────────────
+    def get_meta(self, key: str) -> str | None:
+        row = self._conn().execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row["value"] if row else None
+
+    def set_meta(self, key: str, value: str) -> None:
+        with self._conn() as conn:
+            conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+
+    # ── métricas por worker ─────────────────────────────────────────────────
+    def publish_metrics(self, families: dict[str, list[str]]) -> None:
+        with self._conn() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO worker_metrics (pid, updated_at, data) VALUES (?, ?, ?)",
+                (os.getpid(), time.time(), json.dumps(families, ensure_ascii=False)),
+            )
+
+    def worker_metrics(self) -> list[dict[str, list[str]]]:
+        """Última foto de cada worker vivo (las de workers terminados se borran)."""
+        out, dead = [], []
+        for row in self._conn().execute("SELECT pid, data FROM worker_metrics ORDER BY pid"):
+            if _pid_alive(row["pid"]):
+                out.append(json.loads(row["data"]))
+            else:
+                dead.append((row["pid"],))
+        if dead:
+            with self._conn() as conn:
+                conn.executemany("DELETE FROM worker_metrics WHERE pid = ?", dead)
+        return out
+
+
+def _pid_alive(pid: int) -> bool:
+    if pid == os.getpid():
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except (PermissionError, OSError):
+        return True  # existe pero no es nuestro (o la plataforma no lo permite)
+    return True
+
+
+def _job_row(row: sqlite3.Row) -> dict[str, Any]:
+    job = json.loads(row["data"])
+    if job["status"] in ACTIVE and not _pid_alive(row["pid"]):
+        job.update(status="error", error="worker terminado antes de acabar el job")
+    return job
+
+
+_state: SharedState | None = None
+_state_pid: int | None = None
+_state_lock = threading.Lock()
+
+
+def get_state() -> SharedState:
+    # una instancia (y conexiones) por proceso: tras un fork (gunicorn --preload) se reabre
+    global _state, _state_pid
+    if _state is None or _state_pid != os.getpid():
+        with _state_lock:
+            if _state is None or _state_pid != os.getpid():
+                _state, _state_pid = SharedState(), os.getpid()
+    return _state
@@ -1,18 +1,56 @@
 # app/main.py
 import sys, asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from app.api.routers import health as health_router
 from app.api.routers import scrape as scrape_router
 from app.api.routers import ask as ask_router
+from app.api.routers import products as products_router
+from app.api.routers import metrics as metrics_router
 from .api.routers import auth as auth_router
+from app.services.browser_pool import browser_pool
+from app.services.jobs import job_manager
+from app.services.http_fetch import close_client
+from app.services.store import get_store
+from app.services.raw_store import raw_store
+from app.services.readiness import readiness
+from app.services.worker_metrics import metrics_publisher
+from app.services.gemini import get_client
+from app.core.config import STARTUP_WARM
 
 # Windows: ProactorEventLoop para Playwright
 if sys.platform.startswith("win"):
     asyncio.set_event_loop_policy(asyncio.WindowsProactorEventLoopPolicy())
 
-app = FastAPI(title="Amazon Scraper Service")
+async def warm_up(subsystems: set[str] = STARTUP_WARM) -> None:
+    """Inicializa ya lo pedido en STARTUP_WARM; lo demás se carga en su primer uso."""
+    if "browser" in subsystems:
+        await browser_pool.start()  # navegadores calientes durante toda la vida del proceso
+    if "gemini" in subsystems:
+        await asyncio.to_thread(get_client)  # importa el SDK fuera del event loop
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await warm_up()
+    await job_manager.start()
+    readiness.start()
+    metrics_publisher.start()
+    try:
+        yield
+    finally:
+        await metrics_publisher.stop()
+        await readiness.stop()
+        await job_manager.stop()
+        await asyncio.to_thread(raw_store.close)  # termina las capturas/volcados pendientes
+        await close_client()
+        await browser_pool.stop()
+        get_store().close()
+
+app = FastAPI(title="Amazon Scraper Service", lifespan=lifespan)
 
 app.include_router(health_router.router)
+app.include_router(metrics_router.router)
 app.include_router(scrape_router.router)
 app.include_router(ask_router.router)
+app.include_router(products_router.router)
 app.include_router(auth_router.router)
@@ -1,5 +1,15 @@
 # app/schemas/ask.py
-from pydantic import BaseModel
+from typing import Literal
+from pydantic import BaseModel, Field
+
+ProductField = Literal["id", "title", "rating", "reviews", "price", "delivery", "badges"]
 
 class AskBody(BaseModel):
     question: str
+    scrape_id: int | None = None  # por defecto, el último scrape servido
+    fields: list[ProductField] | None = None  # columnas enviadas al modelo (por defecto PROMPT_FIELDS)
+    token_budget: int | None = Field(None, ge=0)  # por defecto PROMPT_TOKEN_BUDGET; 0 = sin límite
+    overflow: Literal["truncate", "sample"] | None = None
+    fresh: bool = False  # ignora la caché de respuestas
+    local: bool = True   # permite responder sin LLM las preguntas estructuradas (PROMPT_LOCAL_ANSWERS)
+    top_k: int | None = Field(None, ge=1)  # productos relevantes enviados al LLM (por defecto PROMPT_TOP_K)
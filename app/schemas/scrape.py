@@ -0,0 +1,17 @@
+# app/schemas/scrape.py
+from typing import Literal
+from pydantic import BaseModel, Field
+
+from app.core.config import SCRAPE_BATCH_MAX_URLS, SCRAPE_MAX_PAGES, SCRAPE_MAX_IN_FLIGHT, SCRAPE_MAX_QUEUE
+
+class BatchBody(BaseModel):
+    urls: list[str] = Field(..., min_length=1, max_length=SCRAPE_BATCH_MAX_URLS)
+    parallelism: int | None = Field(None, ge=1, le=SCRAPE_MAX_IN_FLIGHT + SCRAPE_MAX_QUEUE)  # por defecto SCRAPE_BATCH_PARALLELISM
+    pages: int = Field(1, ge=1, le=SCRAPE_MAX_PAGES)
+    max_items: int | None = Field(None, ge=1)
+    fresh: bool = False
+    block: Literal["minimal", "text-only", "full"] | None = None
+    mode: Literal["auto", "http", "browser"] | None = None
+    raw: Literal["none", "compact", "full"] | None = None
+    incremental: bool = False  # cada resultado trae `delta` frente al último snapshot de su búsqueda
+    fields: list[Literal["title", "rating", "reviews", "price", "delivery", "badges"]] | None = Field(None, min_length=1)  # por defecto todos
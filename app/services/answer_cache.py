@@ -0,0 +1,129 @@
+# app/services/answer_cache.py
+import asyncio
+import hashlib
+import re
+import time
+import unicodedata
+from dataclasses import dataclass
+from typing import Awaitable, Callable
+
+from cachetools import TTLCache
+from app.core.metrics import ANSWER_LATENCY_SAVED, CACHE_ENTRIES, CACHE_LOOKUPS
+from app.core.config import PROMPT_CACHE_TTL, PROMPT_CACHE_MAX_ENTRIES
+
+_PUNCT_EDGES = "¿?¡!.,;: "
+
+
+def normalize_question(question: str) -> str:
+    # "¿Cuál es la MÁS barata?  " y "cuál es la más barata" comparten entrada
+    q = unicodedata.normalize("NFKC", question).casefold()
+    return re.sub(r"\s+", " ", q).strip(_PUNCT_EDGES)
+
+
+def answer_key(dataset: str, question: str, model: str) -> str:
+    """`dataset`: texto exacto enviado al modelo (ya proyectado/recortado)."""
+    data_hash = hashlib.sha256(dataset.encode("utf-8")).hexdigest()
+    raw = f"{model}\0{normalize_question(question)}\0{data_hash}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class CachedAnswer:
+    answer: str
+    latency: float  # segundos que costó la llamada original
+    created_at: float
+
+
+class AnswerCache:
+    """TTL + LRU en memoria con single-flight: preguntas idénticas simultáneas comparten una llamada."""
+
+    def __init__(
+        self, ttl: int = PROMPT_CACHE_TTL, max_entries: int = PROMPT_CACHE_MAX_ENTRIES,
+        timer: Callable[[], float] = time.time,
+    ):
+        self.ttl = ttl
+        self._timer = timer
+        self._mem: TTLCache[str, CachedAnswer] = TTLCache(maxsize=max(1, max_entries), ttl=max(ttl, 1), timer=timer)
+        self._inflight: dict[str, asyncio.Task] = {}
+        self.hits = self.misses = self.coalesced = 0
+        self.latency_saved = 0.0
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0
+
+    async def get_or_compute(
+        self, key: str, compute: Callable[[], Awaitable[str]], fresh: bool = False,
+    ) -> tuple[CachedAnswer, str]:
+        """Devuelve (respuesta, origen) con origen = hit | coalesced | miss."""
+        if self.enabled and not fresh:
+            entry = self._mem.get(key)
+            if entry is not None:
+                self.hits += 1
+                self.latency_saved += entry.latency
+                return entry, "hit"
+        task = self._inflight.get(key)
+        if task is not None:
+            self.coalesced += 1
+            entry = await asyncio.shield(task)
+            self.latency_saved += entry.latency
+            return entry, "coalesced"
+
+        self.misses += 1
+        task = asyncio.create_task(self._run(compute))
+        self._inflight[key] = task
+        task.add_done_callback(lambda t: self._settle(key, t))
+        # shield: si este cliente se va, los que esperan la misma respuesta siguen recibiéndola
+        return await asyncio.shield(task), "miss"
+
+    async def _run(self, compute: Callable[[], Awaitable[str]]) -> CachedAnswer:
+        t0 = time.perf_counter()
+        answer = await compute()
+        return CachedAnswer(answer=answer, latency=time.perf_counter() - t0, created_at=self._timer())
+
+    def _settle(self, key: str, task: asyncio.Task) -> None:
+        self._inflight.pop(key, None)
+        if task.cancelled() or task.exception() is not None:
+            return  # los errores no se cachean
+        if self.enabled:
+            self._mem[key] = task.result()
+
+    def peek(self, key: str) -> CachedAnswer | None:
+        """Consulta sin single-flight (respuestas en streaming); cuenta como acierto o fallo."""
+        entry = self._mem.get(key) if self.enabled else None
+        if entry is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self.latency_saved += entry.latency
+        return entry
+
+    def put(self, key: str, answer: str, latency: float) -> None:
+        if self.enabled:
+            self._mem[key] = CachedAnswer(answer=answer, latency=latency, created_at=self._timer())
+
+    def clear(self) -> None:
+        self._mem.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.coalesced + self.misses
+        return {
+            "enabled": self.enabled,
+            "ttl_seconds": self.ttl,
+            "entries": len(self._mem),
+            "max_entries": self._mem.maxsize,
+            "in_flight": len(self._inflight),
+            "hits": self.hits,
+            "coalesced": self.coalesced,
+            "misses": self.misses,
+            "hit_ratio": round((self.hits + self.coalesced) / lookups, 4) if lookups else None,
+            "latency_saved_seconds": round(self.latency_saved, 3),
+        }
+
+
+answer_cache = AnswerCache()
+CACHE_ENTRIES.set_function(lambda: len(answer_cache._mem), cache="answer")
+CACHE_LOOKUPS.set_function(lambda: answer_cache.hits, cache="answer", result="hit")
+CACHE_LOOKUPS.set_function(lambda: answer_cache.coalesced, cache="answer", result="coalesced")
+CACHE_LOOKUPS.set_function(lambda: answer_cache.misses, cache="answer", result="miss")
+ANSWER_LATENCY_SAVED.set_function(lambda: answer_cache.latency_saved)
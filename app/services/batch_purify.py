@@ -0,0 +1,207 @@
+# app/services/batch_purify.py
+"""
+Purificación por lotes de volcados grandes (p.ej. archivos históricos de scrapped_info.json).
+
+    python -m app.services.batch_purify data/scrapped_info.json data/data.json --workers 8
+
+Lee los productos en streaming (array JSON o NDJSON, opcionalmente .gz), reparte
+`normalize_children_text` en trozos sobre un pool de procesos y escribe la salida
+incrementalmente con el mismo formato e `id` que `purify_raw`.
+"""
+import argparse
+import gzip
+import io
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, Future
+from pathlib import Path
+from typing import Any, Iterable, Iterator, TextIO
+
+from app.core.config import RAW_FILE, DATA_FILE
+from app.services.purify import FIELDS, normalize_children_text, parse_fields
+
+READ_CHUNK = 1 << 16
+
+
+def _open_text(path: Path) -> TextIO:
+    if path.suffix == ".gz":
+        return io.TextIOWrapper(gzip.open(path, "rb"), encoding="utf-8")
+    return open(path, "r", encoding="utf-8")
+
+
+def iter_raw_products(path: str | Path) -> Iterator[Any]:
+    """Itera los elementos de un array JSON (o líneas NDJSON) sin cargar el archivo entero."""
+    path = Path(path)
+    with _open_text(path) as fh:
+        if path.suffixes[-2:-1] in ([".ndjson"], [".jsonl"]) or path.suffix in (".ndjson", ".jsonl"):
+            for line in fh:
+                if line.strip():
+                    yield json.loads(line)
+            return
+        yield from _iter_json_array(fh)
+
+
+def _iter_json_array(fh: TextIO) -> Iterator[Any]:
+    decoder = json.JSONDecoder()
+    buf, pos, eof = "", 0, False
+
+    def fill() -> None:
+        nonlocal buf, pos, eof
+        more = fh.read(READ_CHUNK)
+        buf, pos, eof = buf[pos:] + more, 0, not more
+
+    def skip(chars: str) -> str | None:
+        # avanza sobre `chars` y devuelve el siguiente carácter (None al final del archivo)
+        nonlocal pos
+        while True:
+            while pos < len(buf) and buf[pos] in chars:
+                pos += 1
+            if pos < len(buf):
+                return buf[pos]
+            if eof:
+                return None
+            fill()
+
+    if skip(" \t\r\n") != "[":
+        raise ValueError("Se esperaba un array JSON")
+    pos += 1
+    while True:
+        nxt = skip(" \t\r\n,")
+        if nxt is None or nxt == "]":
+            return
+        try:
+            value, end = decoder.raw_decode(buf, pos)
+        except json.JSONDecodeError:
+            if eof:
+                raise
+            fill()
+            continue
+        if end == len(buf) and not eof:
+            fill()  # un número podría estar cortado al final del buffer
+            continue
+        yield value
+        pos = end
+
+
+def _purify_chunk(chunk: list[tuple[int, Any]], fields: tuple[str, ...] | None = None) -> list[dict]:
+    out = []
+    for idx, prod in chunk:
+        if isinstance(prod, dict) and "children_text" in prod:
+            clean = normalize_children_text(prod["children_text"], fields)
+            if clean:
+                clean["id"] = idx
+                out.append(clean)
+    return out
+
+
+def _purify_chunk_bodies(chunk: list[tuple[int, Any]], fields: tuple[str, ...] | None = None) -> list[str]:
+    # serializar también en el worker: el proceso principal solo concatena texto
+    return [_ArrayWriter.body(item) for item in _purify_chunk(chunk, fields)]
+
+
+def _chunks(items: Iterable[Any], size: int) -> Iterator[list[tuple[int, Any]]]:
+    chunk: list[tuple[int, Any]] = []
+    for idx, prod in enumerate(items, start=1):
+        chunk.append((idx, prod))
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+class _ArrayWriter:
+    # produce exactamente json.dumps(lista, indent=2, ensure_ascii=False), elemento a elemento
+    def __init__(self, fh: TextIO):
+        self.fh, self.count = fh, 0
+
+    @staticmethod
+    def body(item: dict) -> str:
+        return json.dumps(item, indent=2, ensure_ascii=False).replace("\n", "\n  ")
+
+    def write_body(self, body: str) -> None:
+        self.fh.write(("[\n  " if self.count == 0 else ",\n  ") + body)
+        self.count += 1
+
+    def close(self) -> None:
+        self.fh.write("[]" if self.count == 0 else "\n]")
+
+
+def purify_file(
+    src: str | Path,
+    dst: str | Path,
+    workers: int | None = None,
+    chunk_size: int = 500,
+    fields: tuple[str, ...] | None = None,
+) -> dict:
+    """Purifica `src` → `dst`. Con `workers=1` todo va en el proceso actual; `fields` como en `purify_raw`."""
+    workers = workers or os.cpu_count() or 1
+    dst = Path(dst)
+    tmp = dst.with_suffix(dst.suffix + ".tmp")
+    t0 = time.perf_counter()
+    read = 0
+
+    def counted(items: Iterable[Any]) -> Iterator[Any]:
+        nonlocal read
+        for item in items:
+            read += 1
+            yield item
+
+    chunks = _chunks(counted(iter_raw_products(src)), max(1, chunk_size))
+    with open(tmp, "w", encoding="utf-8") as fh:
+        writer = _ArrayWriter(fh)
+        if workers <= 1:
+            for chunk in chunks:
+                for body in _purify_chunk_bodies(chunk, fields):
+                    writer.write_body(body)
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                # ventana acotada de trozos en vuelo: memoria constante y orden preservado
+                window: deque[Future] = deque()
+                for chunk in chunks:
+                    window.append(pool.submit(_purify_chunk_bodies, chunk, fields))
+                    if len(window) >= workers * 2:
+                        for body in window.popleft().result():
+                            writer.write_body(body)
+                while window:
+                    for body in window.popleft().result():
+                        writer.write_body(body)
+        writer.close()
+    os.replace(tmp, dst)
+    elapsed = time.perf_counter() - t0
+    return {
+        "input": str(src),
+        "output": str(dst),
+        "raw_items": read,
+        "structured_items": writer.count,
+        "workers": workers,
+        "fields": list(fields) if fields else None,
+        "seconds": round(elapsed, 3),
+        "products_per_second": round(read / elapsed) if elapsed else None,
+    }
+
+
+def main(argv: list[str] | None = None) -> None:
+    ap = argparse.ArgumentParser(description="Purificación por lotes de volcados raw")
+    ap.add_argument("input", nargs="?", default=str(RAW_FILE), help="array JSON o NDJSON (.gz admitido)")
+    ap.add_argument("output", nargs="?", default=str(DATA_FILE))
+    ap.add_argument("--workers", type=int, default=None, help="procesos (por defecto nº de CPUs)")
+    ap.add_argument("--chunk-size", type=int, default=500)
+    ap.add_argument("--fields", default=None, help=f"campos separados por comas ({','.join(FIELDS)}); por defecto todos")
+    args = ap.parse_args(argv)
+    if not Path(args.input).exists():
+        sys.exit(f"No se encontró {args.input}")
+    try:
+        fields = parse_fields(args.fields)
+    except ValueError as e:
+        sys.exit(str(e))
+    stats = purify_file(args.input, args.output, workers=args.workers, chunk_size=args.chunk_size, fields=fields)
+    print(f"OK → {stats['output']} ({stats['structured_items']} items, "
+          f"{stats['products_per_second']} productos/s con {stats['workers']} procesos)")
+
+
+if __name__ == "__main__":
+    main()
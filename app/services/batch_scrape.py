@@ -0,0 +1,68 @@
+# app/services/batch_scrape.py
+import asyncio
+import time
+from dataclasses import dataclass
+
+from app.core.config import SCRAPE_BATCH_PARALLELISM
+from app.services.cache import cache_key
+from app.services.pipeline import scrape_and_save
+
+
+@dataclass
+class BatchItem:
+    url: str
+    result: dict | None = None
+    error: Exception | None = None
+    seconds: float = 0.0
+    duplicate: bool = False  # misma búsqueda que otra URL del lote: se reutilizó su resultado
+
+
+async def scrape_batch(
+    urls: list[str],
+    parallelism: int | None = None,
+    pages: int = 1,
+    max_items: int | None = None,
+    fresh: bool = False,
+    block: str | None = None,
+    mode: str | None = None,
+    raw: str | None = None,
+    incremental: bool = False,
+    fields: tuple[str, ...] | None = None,
+) -> tuple[list[BatchItem], float]:
+    """
+    Scrapea `urls` con como mucho `parallelism` a la vez (pool de navegadores, admisión y
+    límite por host compartidos con el resto del servicio). Un fallo no aborta el lote:
+    cada URL trae su resultado o su excepción. Devuelve (items en el orden de `urls`, segundos).
+    No vuelca RAW_FILE/DATA_FILE: cada resultado queda en el almacén con su `scrape_id`.
+    """
+    sem = asyncio.Semaphore(max(1, parallelism or SCRAPE_BATCH_PARALLELISM))
+    items = [BatchItem(url) for url in urls]
+    first: dict[str, BatchItem] = {}
+    for item in items:
+        key = cache_key(item.url, pages, max_items)
+        if key in first:
+            item.duplicate = True
+        else:
+            first[key] = item
+
+    async def run(item: BatchItem) -> None:
+        async with sem:
+            t0 = time.perf_counter()
+            try:
+                item.result = await scrape_and_save(
+                    item.url, pages=pages, max_items=max_items, fresh=fresh, block=block, mode=mode, raw=raw,
+                    export=False, incremental=incremental, fields=fields,
+                )
+            except Exception as e:
+                item.error = e
+            finally:
+                item.seconds = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(run(item) for item in first.values()))
+    elapsed = time.perf_counter() - t0
+    for item in items:
+        if item.duplicate:
+            origin = first[cache_key(item.url, pages, max_items)]
+            item.result, item.error = origin.result, origin.error
+    return items, elapsed
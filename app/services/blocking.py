@@ -0,0 +1,106 @@
+# app/services/blocking.py
+from __future__ import annotations
+
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING
+from urllib.parse import urlsplit
+
+from app.core.config import SCRAPE_BLOCK_PROFILE
+
+if TYPE_CHECKING:
+    from playwright.async_api import Page, Request, Response, Route
+
+# anuncios y analítica que nunca aportan texto a las tarjetas
+AD_DOMAINS = (
+    "amazon-adsystem.com", "doubleclick.net", "googlesyndication.com", "google-analytics.com",
+    "googletagmanager.com", "scorecardresearch.com", "adsrvr.org", "facebook.net",
+    "fls-na.amazon.com", "unagi.amazon.com", "unagi-na.amazon.com",
+)
+
+
+@dataclass(frozen=True)
+class BlockProfile:
+    name: str
+    resource_types: frozenset[str] = frozenset()
+    domains: tuple[str, ...] = ()
+
+    def blocks(self, resource_type: str, url: str) -> bool:
+        if resource_type in self.resource_types:
+            return True
+        if self.domains:
+            host = (urlsplit(url).hostname or "").lower()
+            return any(host == d or host.endswith("." + d) for d in self.domains)
+        return False
+
+
+PROFILES: dict[str, BlockProfile] = {
+    # sin bloqueo: comportamiento histórico
+    "full": BlockProfile("full"),
+    # fuera imágenes, vídeo, fuentes y anuncios; CSS se mantiene (afecta a innerText)
+    "minimal": BlockProfile("minimal", frozenset({"image", "media", "font"}), AD_DOMAINS),
+    # solo documento + CSS: el listado se lee del HTML estático en domcontentloaded
+    "text-only": BlockProfile(
+        "text-only",
+        frozenset({"image", "media", "font", "script", "xhr", "fetch", "websocket",
+                   "eventsource", "manifest", "texttrack", "ping", "other"}),
+        AD_DOMAINS,
+    ),
+}
+
+
+def get_profile(name: str | None) -> BlockProfile:
+    name = name or SCRAPE_BLOCK_PROFILE
+    try:
+        return PROFILES[name]
+    except KeyError:
+        raise ValueError(f"Perfil de bloqueo desconocido: {name!r} (usa {', '.join(PROFILES)})") from None
+
+
+@dataclass
+class BlockStats:
+    profile: str
+    blocked_requests: int = 0
+    allowed_requests: int = 0
+    allowed_bytes: int = 0  # según Content-Length de lo que sí se descargó
+    blocked_by_type: Counter = field(default_factory=Counter)
+
+    def merge(self, other: "BlockStats") -> None:
+        self.blocked_requests += other.blocked_requests
+        self.allowed_requests += other.allowed_requests
+        self.allowed_bytes += other.allowed_bytes
+        self.blocked_by_type.update(other.blocked_by_type)
+
+    def to_dict(self) -> dict:
+        return {
+            "profile": self.profile,
+            "blocked_requests": self.blocked_requests,
+            "allowed_requests": self.allowed_requests,
+            "allowed_bytes": self.allowed_bytes,
+            "blocked_by_type": dict(self.blocked_by_type),
+        }
+
+
+async def apply_profile(page: Page, profile: BlockProfile, stats: BlockStats) -> None:
+    """Instala la interceptación en la página y va acumulando en `stats`."""
+
+    def on_response(response: Response) -> None:
+        stats.allowed_requests += 1
+        try:
+            stats.allowed_bytes += int(response.headers.get("content-length") or 0)
+        except ValueError:
+            pass
+
+    page.on("response", on_response)
+    if not profile.resource_types and not profile.domains:
+        return  # "full": sin route → sin coste de interceptación
+
+    async def handler(route: Route, request: Request) -> None:
+        if profile.blocks(request.resource_type, request.url):
+            stats.blocked_requests += 1
+            stats.blocked_by_type[request.resource_type] += 1
+            await route.abort("blockedbyclient")
+        else:
+            await route.continue_()
+
+    await page.route("**/*", handler)
@@ -0,0 +1,190 @@
+# app/services/browser_pool.py
+from __future__ import annotations
+
+import asyncio
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, AsyncIterator
+
+from app.core.config import (
+    BROWSER_POOL_SIZE, BROWSER_CONTEXTS_PER_BROWSER, BROWSER_CONTEXT_MAX_USES,
+    BROWSER_ACQUIRE_TIMEOUT, BROWSER_HEADLESS, BROWSER_WARM,
+)
+from app.core.metrics import phase, POOL_CAPACITY, POOL_IDLE
+
+# Playwright solo se importa en `start()`: importar la app (o scraper, extraction, blocking,
+# que solo lo usan en anotaciones) no lo carga
+if TYPE_CHECKING:
+    from playwright.async_api import Browser, BrowserContext, Playwright
+
+LOCALE = "es-ES"
+USER_AGENT = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+    "AppleWebKit/537.36 (KHTML, like Gecko) Chrome Safari"
+)
+
+
+class PoolTimeout(Exception):
+    """No hubo un contexto libre dentro del timeout de préstamo."""
+
+
+@dataclass
+class _Slot:
+    browser_idx: int
+    context: BrowserContext | None = None
+    uses: int = 0
+
+
+class BrowserPool:
+    """
+    Navegadores Chromium de larga vida con contextos reutilizables.
+    - `size` navegadores, cada uno con `contexts_per_browser` slots prestables.
+    - Un contexto se recicla tras `max_uses` préstamos o si el préstamo termina con error.
+    - Si un navegador se cae, se relanza al prestar el siguiente contexto.
+    - Con `warm` los contextos se crean al arrancar (cada worker calienta el suyo) y no en el primer scrape.
+    - Si no se arrancó en el lifespan (STARTUP_WARM sin `browser`), arranca con el primer préstamo.
+    """
+
+    def __init__(
+        self,
+        size: int = BROWSER_POOL_SIZE,
+        contexts_per_browser: int = BROWSER_CONTEXTS_PER_BROWSER,
+        max_uses: int = BROWSER_CONTEXT_MAX_USES,
+        acquire_timeout: float = BROWSER_ACQUIRE_TIMEOUT,
+        headless: bool = BROWSER_HEADLESS,
+        warm: bool = BROWSER_WARM,
+    ):
+        self.size = max(1, size)
+        self.contexts_per_browser = max(1, contexts_per_browser)
+        self.max_uses = max(1, max_uses)
+        self.acquire_timeout = acquire_timeout
+        self.headless = headless
+        self.warm = warm
+        self._pw: Playwright | None = None
+        self._browsers: list[Browser | None] = []
+        self._slots: asyncio.Queue[_Slot] | None = None
+        self._launch_lock = asyncio.Lock()
+        self._start_lock = asyncio.Lock()
+        self.started = False
+
+    @property
+    def capacity(self) -> int:
+        return self.size * self.contexts_per_browser
+
+    @property
+    def idle(self) -> int:
+        return self._slots.qsize() if self._slots is not None else 0
+
+    def alive(self) -> dict:
+        """Estado real del pool (para /readiness): navegadores conectados y contextos libres."""
+        connected = sum(1 for b in self._browsers if b is not None and b.is_connected())
+        return {"started": self.started, "browsers": self.size, "connected": connected, "idle": self.idle}
+
+    async def ping(self, timeout: float = 5.0) -> int:
+        """Navegadores que responden de verdad (abren y cierran un contexto dentro de `timeout`)."""
+        async def one(browser: Browser | None) -> bool:
+            if browser is None or not browser.is_connected():
+                return False
+            try:
+                ctx = await asyncio.wait_for(browser.new_context(), timeout)
+                await ctx.close()
+                return True
+            except Exception:
+                return False
+
+        return sum(await asyncio.gather(*(one(b) for b in self._browsers)))
+
+    async def start(self) -> None:
+        async with self._start_lock:
+            if self.started:
+                return
+            from playwright.async_api import async_playwright  # primer uso: no se paga al importar la app
+
+            self._pw = await async_playwright().start()
+            try:
+                self._browsers = [await self._launch() for _ in range(self.size)]
+            except BaseException:
+                # p.ej. Chromium sin instalar: no dejar el driver de Playwright vivo
+                await self._pw.stop()
+                self._pw = None
+                raise
+            self._slots = asyncio.Queue()
+            for idx in range(self.size):
+                for _ in range(self.contexts_per_browser):
+                    slot = _Slot(idx)
+                    if self.warm:
+                        with phase("context_warm"):
+                            slot.context = await self._new_context(self._browsers[idx])
+                    self._slots.put_nowait(slot)
+            self.started = True
+
+    async def stop(self) -> None:
+        if not self.started:
+            return
+        self.started = False
+        for browser in self._browsers:
+            if browser is not None:
+                try: await browser.close()
+                except Exception: pass
+        self._browsers = []
+        self._slots = None
+        if self._pw is not None:
+            await self._pw.stop()
+            self._pw = None
+
+    async def _launch(self) -> Browser:
+        with phase("browser_launch"):
+            return await self._pw.chromium.launch(headless=self.headless)
+
+    async def _ensure_browser(self, idx: int) -> Browser:
+        async with self._launch_lock:
+            browser = self._browsers[idx]
+            if browser is None or not browser.is_connected():
+                self._browsers[idx] = browser = await self._launch()
+            return browser
+
+    async def _new_context(self, browser: Browser) -> BrowserContext:
+        return await browser.new_context(locale=LOCALE, user_agent=USER_AGENT)
+
+    async def _discard(self, slot: _Slot) -> None:
+        if slot.context is not None:
+            try: await slot.context.close()
+            except Exception: pass
+        slot.context, slot.uses = None, 0
+
+    async def _ensure_context(self, slot: _Slot) -> BrowserContext:
+        browser = await self._ensure_browser(slot.browser_idx)
+        if slot.context is not None and (slot.uses >= self.max_uses or slot.context.browser is not browser):
+            await self._discard(slot)
+        if slot.context is None:
+            slot.context = await self._new_context(browser)
+        slot.uses += 1
+        return slot.context
+
+    @asynccontextmanager
+    async def context(self, timeout: float | None = None) -> AsyncIterator[BrowserContext]:
+        if not self.started:
+            await self.start()
+        timeout = self.acquire_timeout if timeout is None else timeout
+        with phase("browser_acquire"):
+            try:
+                slot = await asyncio.wait_for(self._slots.get(), timeout)
+            except asyncio.TimeoutError:
+                raise PoolTimeout(f"Sin contexto de navegador libre tras {timeout}s") from None
+        try:
+            with phase("context_ready"):
+                ctx = await self._ensure_context(slot)
+            try:
+                yield ctx
+            except BaseException:
+                # contexto posiblemente en mal estado → se recicla
+                await self._discard(slot)
+                raise
+        finally:
+            if self._slots is not None:
+                self._slots.put_nowait(slot)
+
+
+browser_pool = BrowserPool()
+POOL_CAPACITY.set_function(lambda: browser_pool.capacity)
+POOL_IDLE.set_function(lambda: browser_pool.idle)
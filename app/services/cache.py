@@ -0,0 +1,181 @@
+# app/services/cache.py
+import asyncio
+import hashlib
+import json
+import os
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+from cachetools import TLRUCache
+from app.core.metrics import CACHE_ENTRIES, CACHE_LOOKUPS
+from app.services.raw_store import raw_store
+from app.core.config import (
+    BASE_DIR, SCRAPE_CACHE_TTL, SCRAPE_CACHE_MAX_ENTRIES, SCRAPE_CACHE_MAX_BYTES, SCRAPE_CACHE_DIR,
+)
+
+# parámetros que Amazon añade para tracking y no cambian los resultados
+TRACKING_PARAMS = {"ref", "ref_", "qid", "crid", "sprefix", "dib", "dib_tag", "_encoding", "content-id", "tag", "linkcode"}
+TRACKING_PREFIXES = ("pd_rd_", "pf_rd_", "utm_")
+# tamaño aproximado en JSON de cada elemento sin contar raw_html (medido sobre las fixtures)
+RAW_ITEM_BYTES = 400
+PRODUCT_BYTES = 200
+
+def normalize_url(url: str) -> str:
+    parts = urlsplit(url.strip())
+    # /s/ref=nb_sb_noss → /s
+    path = "/".join(seg for seg in parts.path.split("/") if not seg.startswith("ref=")) or "/"
+    query = sorted(
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if k.lower() not in TRACKING_PARAMS and not k.lower().startswith(TRACKING_PREFIXES)
+    )
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), path, urlencode(query), ""))
+
+def cache_key(url: str, pages: int = 1, max_items: int | None = None, fields: tuple[str, ...] | None = None) -> str:
+    # sin `fields` (todos los campos) es también la clave del snapshot en el ProductStore
+    key = f"{normalize_url(url)}|pages={pages}|max={max_items or ''}"
+    return key if fields is None else f"{key}|fields={','.join(fields)}"
+
+
+def estimate_size(raw: list, structured: list[dict]) -> int:
+    # sin serializar en el event loop: raw_html domina, el resto va por nº de elementos
+    html = sum(len(i.get("raw_html") or "") for i in raw if isinstance(i, dict))
+    return html + RAW_ITEM_BYTES * len(raw) + PRODUCT_BYTES * len(structured)
+
+
+@dataclass
+class CacheEntry:
+    raw: list[dict]
+    structured: list[dict]
+    created_at: float
+    size: int
+    scrape_id: int | None = None  # snapshot correspondiente en el ProductStore
+
+
+class ScrapeCache:
+    """
+    LRU + TTL en memoria (acotada por nº de entradas y por bytes) y,
+    opcionalmente, un nivel en disco para que los aciertos sobrevivan a reinicios.
+    """
+
+    def __init__(
+        self,
+        ttl: int = SCRAPE_CACHE_TTL,
+        max_entries: int = SCRAPE_CACHE_MAX_ENTRIES,
+        max_bytes: int = SCRAPE_CACHE_MAX_BYTES,
+        disk_dir: str | Path | None = SCRAPE_CACHE_DIR,
+    ):
+        self.ttl = ttl
+        self.max_entries = max(1, max_entries)
+        self._mem: TLRUCache[str, CacheEntry] = TLRUCache(
+            maxsize=max(1, max_bytes),
+            ttu=lambda _k, e, _now: e.created_at + self.ttl,
+            timer=time.time,
+            getsizeof=lambda e: e.size,
+        )
+        self.disk_dir = None
+        if disk_dir:
+            self.disk_dir = Path(disk_dir)
+            if not self.disk_dir.is_absolute():
+                self.disk_dir = BASE_DIR / self.disk_dir
+            self.disk_dir.mkdir(parents=True, exist_ok=True)
+        self.hits = self.misses = self.disk_hits = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0
+
+    def _disk_path(self, key: str) -> Path:
+        return self.disk_dir / f"{hashlib.sha256(key.encode('utf-8')).hexdigest()}.json"
+
+    def _remember(self, key: str, entry: CacheEntry) -> None:
+        try:
+            self._mem[key] = entry
+        except ValueError:
+            return  # más grande que todo el presupuesto de bytes: no se cachea en memoria
+        while len(self._mem) > self.max_entries:
+            self._mem.popitem()  # LRU
+
+    async def get(self, key: str) -> CacheEntry | None:
+        if not self.enabled:
+            return None
+        entry = self._mem.get(key)
+        if entry is None and self.disk_dir is not None:
+            # leer y parsear el JSON fuera del event loop
+            entry = await asyncio.to_thread(self._disk_get, key)
+            if entry is not None:
+                self.disk_hits += 1
+                self._remember(key, entry)
+        if entry is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return entry
+
+    def set(self, key: str, raw: list[dict], structured: list[dict], scrape_id: int | None = None) -> CacheEntry | None:
+        if not self.enabled:
+            return None
+        now = time.time()
+        entry = CacheEntry(
+            raw=raw, structured=structured, created_at=now, size=estimate_size(raw, structured), scrape_id=scrape_id,
+        )
+        self._remember(key, entry)
+        if self.disk_dir is not None:
+            raw_store.submit(self._disk_put, key, entry)  # serializar y escribir en el hilo escritor
+        return entry
+
+    def _disk_put(self, key: str, entry: CacheEntry) -> None:
+        payload = json.dumps(
+            {"key": key, "created_at": entry.created_at, "scrape_id": entry.scrape_id,
+             "raw": entry.raw, "structured": entry.structured},
+            ensure_ascii=False,
+        )
+        path = self._disk_path(key)
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_text(payload, encoding="utf-8")
+        os.replace(tmp, path)  # escritura atómica
+
+    def _disk_get(self, key: str) -> CacheEntry | None:
+        path = self._disk_path(key)
+        try:
+            text = path.read_text(encoding="utf-8")
+            data = json.loads(text)
+        except (OSError, ValueError):
+            return None
+        if data.get("key") != key or time.time() - data.get("created_at", 0) >= self.ttl:
+            path.unlink(missing_ok=True)
+            return None
+        return CacheEntry(
+            raw=data["raw"], structured=data["structured"], created_at=data["created_at"],
+            size=len(text), scrape_id=data.get("scrape_id"),
+        )
+
+    def clear(self) -> None:
+        self._mem.clear()
+        if self.disk_dir is not None:
+            for p in self.disk_dir.glob("*.json"):
+                p.unlink(missing_ok=True)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "ttl_seconds": self.ttl,
+            "entries": len(self._mem),
+            "bytes": self._mem.currsize,
+            "max_entries": self.max_entries,
+            "max_bytes": self._mem.maxsize,
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+            "disk_tier": str(self.disk_dir) if self.disk_dir else None,
+        }
+
+
+scrape_cache = ScrapeCache()
+CACHE_ENTRIES.set_function(lambda: len(scrape_cache._mem), cache="scrape")
+CACHE_LOOKUPS.set_function(lambda: scrape_cache.hits - scrape_cache.disk_hits, cache="scrape", result="hit")
+CACHE_LOOKUPS.set_function(lambda: scrape_cache.disk_hits, cache="scrape", result="disk_hit")
+CACHE_LOOKUPS.set_function(lambda: scrape_cache.misses, cache="scrape", result="miss")
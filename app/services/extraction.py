@@ -0,0 +1,61 @@
+# app/services/extraction.py
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from app.core.metrics import CARDS_SEEN, SPONSORED_SKIPPED
+
+if TYPE_CHECKING:
+    from playwright.async_api import Page
+
+CARD_SELECTOR = 'div.s-main-slot > div[data-component-type="s-search-result"]'
+
+# Una sola ida y vuelta al navegador: se recorren todas las tarjetas dentro de la
+# página y se devuelve todo serializado (antes: decenas de llamadas IPC por tarjeta).
+EXTRACT_CARDS_JS = """
+({selector, rawHtml, allAttrs}) => {
+  const isSponsored = (card) => {
+    if (card.querySelector('span[data-component-type="s-status-badge-component"]')) return true;
+    for (const span of card.querySelectorAll('span')) {
+      const t = span.innerText;
+      if (t.includes('Sponsored') || t.includes('Patrocinado')) return true;
+    }
+    return false;
+  };
+  return Array.from(document.querySelectorAll(selector), (card) => {
+    if (isSponsored(card)) return {sponsored: true};
+    const attrs = {};
+    if (allAttrs) {
+      for (const a of card.attributes) attrs[a.name] = a.value;
+    } else if (card.hasAttribute('data-asin')) {
+      attrs['data-asin'] = card.getAttribute('data-asin');  // identidad del producto (almacén, incremental)
+    }
+    const children_text = {};
+    for (const child of card.children) {
+      const text = child.innerText.trim();
+      if (text) children_text[child.tagName.toLowerCase()] = text;
+    }
+    const out = {sponsored: false, attrs, children_text};
+    if (rawHtml) out.raw_html = card.innerHTML;
+    return out;
+  });
+}
+"""
+
+async def extract_cards(page: Page, raw_html: bool = True, attrs: bool = True) -> list[dict]:
+    """
+    Devuelve todas las tarjetas de resultados con su flag `sponsored`.
+    Las no patrocinadas traen `attrs` (todos o, con `attrs=False`, solo `data-asin`),
+    `children_text` y (opcional) `raw_html`.
+    """
+    return await page.evaluate(EXTRACT_CARDS_JS, {"selector": CARD_SELECTOR, "rawHtml": raw_html, "allAttrs": attrs})
+
+def to_raw_items(cards: list[dict]) -> list[dict]:
+    # mismo formato que `raw_data` histórico: {attrs, children_text, raw_html}
+    items = [
+        {k: v for k, v in card.items() if k != "sponsored"}
+        for card in cards if not card.get("sponsored")
+    ]
+    CARDS_SEEN.inc(len(cards))
+    SPONSORED_SKIPPED.inc(len(cards) - len(items))
+    return items
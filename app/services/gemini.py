@@ -1,24 +1,184 @@
 # app/services/gemini.py
-import json
-import google.generativeai as genai
-from app.core.config import GOOGLE_API_KEY, GEMINI_MODEL
+from __future__ import annotations
 
-if not GOOGLE_API_KEY:
-    raise RuntimeError("Falta GOOGLE_API_KEY en .env")
+import asyncio
+import threading
+from typing import TYPE_CHECKING, AsyncIterator, Protocol
 
-genai.configure(api_key=GOOGLE_API_KEY)
+from app.core.config import GOOGLE_API_KEY, GEMINI_MODEL, PROMPT_TIMEOUT
+from app.core.metrics import phase
+from app.services.prompt_encoding import EncodedProducts, encode_products, estimate_tokens
+from app.services.answer_cache import answer_cache, answer_key
 
-def ask_gemini(data: list[dict], question: str) -> str:
-    prompt = f"""
-Tengo una lista de productos en JSON (campos: title, rating, reviews, price, delivery, badges, id).
-Responde de forma clara y en español. Si algo no está en los datos, dilo.
+if TYPE_CHECKING:  # el SDK (gRPC/protobuf) se importa con el primer cliente, no al importar la app
+    import google.generativeai as genai
+
+PROMPT_TEMPLATE = """
+Tengo una lista de productos en una tabla separada por "|" (primera fila = columnas: {fields}; badges separados por ";").
+Responde de forma clara y en español. Si algo no está en los datos, dilo.{note}
 
 Datos:
-{json.dumps(data, ensure_ascii=False, indent=2)}
+{table}
 
 Pregunta del usuario:
 {question}
 """
-    model = genai.GenerativeModel(GEMINI_MODEL)
-    resp = model.generate_content(prompt)
-    return resp.text
+
+
+class LLMClient(Protocol):
+    def generate(self, prompt: str, model: str) -> str: ...
+
+    async def generate_async(self, prompt: str, model: str) -> str: ...
+
+    def stream(self, prompt: str, model: str) -> AsyncIterator[str]: ...
+
+
+class GeminiClient:
+    """Configura el SDK una vez y reutiliza un GenerativeModel por nombre de modelo."""
+
+    def __init__(self, api_key: str | None = GOOGLE_API_KEY):
+        if not api_key:
+            raise RuntimeError("Falta GOOGLE_API_KEY en .env")
+        import google.generativeai as genai
+
+        genai.configure(api_key=api_key)
+        self._genai = genai
+        self._models: dict[str, genai.GenerativeModel] = {}
+
+    def model(self, name: str) -> genai.GenerativeModel:
+        m = self._models.get(name)
+        if m is None:
+            m = self._models[name] = self._genai.GenerativeModel(name)
+        return m
+
+    def generate(self, prompt: str, model: str = GEMINI_MODEL) -> str:
+        return self.model(model).generate_content(prompt).text
+
+    async def generate_async(self, prompt: str, model: str = GEMINI_MODEL) -> str:
+        resp = await self.model(model).generate_content_async(prompt, request_options={"timeout": PROMPT_TIMEOUT})
+        return resp.text
+
+    async def stream(self, prompt: str, model: str = GEMINI_MODEL) -> AsyncIterator[str]:
+        resp = await self.model(model).generate_content_async(
+            prompt, stream=True, request_options={"timeout": PROMPT_TIMEOUT},
+        )
+        async for chunk in resp:
+            if chunk.text:
+                yield chunk.text
+
+
+_client: LLMClient | None = None
+_client_lock = threading.Lock()
+
+def get_client() -> LLMClient:
+    # primer uso (o STARTUP_WARM=gemini): importa y configura el SDK. Desde async va por
+    # asyncio.to_thread(get_client), así que dos peticiones pueden llegar a la vez
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = GeminiClient()
+    return _client
+
+def set_client(client: LLMClient | None) -> None:
+    """Sustituye el cliente (p.ej. un stub en pruebas/benchmarks); None vuelve al de Gemini."""
+    global _client
+    _client = client
+
+def build_prompt(encoded: EncodedProducts, question: str) -> str:
+    note = ""
+    if encoded.truncated:
+        how = "una muestra uniforme" if encoded.strategy == "sample" else "los primeros"
+        note = f"\nSolo se incluyen {encoded.rows_included} de {encoded.rows_total} productos ({how})."
+    return PROMPT_TEMPLATE.format(fields=", ".join(encoded.fields), note=note, table=encoded.text, question=question)
+
+def encode_for_question(
+    data: list[dict],
+    question: str,
+    fields: list[str] | None = None,
+    token_budget: int | None = None,
+    strategy: str | None = None,
+) -> EncodedProducts:
+    # reserva tokens para instrucciones + pregunta; la tabla se ajusta al resto del presupuesto
+    reserved = estimate_tokens(PROMPT_TEMPLATE) + estimate_tokens(question) + 40
+    return encode_products(data, fields=fields, token_budget=token_budget, strategy=strategy, reserved_tokens=reserved)
+
+def ask_gemini(
+    data: list[dict],
+    question: str,
+    fields: list[str] | None = None,
+    token_budget: int | None = None,
+    strategy: str | None = None,
+) -> tuple[str, EncodedProducts]:
+    encoded = encode_for_question(data, question, fields, token_budget, strategy)
+    return get_client().generate(build_prompt(encoded, question), GEMINI_MODEL), encoded
+
+async def ask_gemini_cached(
+    data: list[dict],
+    question: str,
+    fields: list[str] | None = None,
+    token_budget: int | None = None,
+    strategy: str | None = None,
+    fresh: bool = False,
+    model: str = GEMINI_MODEL,
+) -> tuple[str, EncodedProducts, str]:
+    """Como `ask_gemini`, pasando por `answer_cache`; devuelve también hit | coalesced | miss."""
+    with phase("prompt_encode"):
+        encoded = encode_for_question(data, question, fields, token_budget, strategy)
+        prompt = build_prompt(encoded, question)
+        key = answer_key(encoded.text, question, model)
+
+    async def generate() -> str:
+        client = _client or await asyncio.to_thread(get_client)  # un acierto no necesita el SDK
+        with phase("gemini"):
+            return await asyncio.wait_for(client.generate_async(prompt, model), PROMPT_TIMEOUT)
+
+    entry, source = await answer_cache.get_or_compute(key, generate, fresh=fresh)
+    return entry.answer, encoded, source
+
+async def stream_gemini(
+    data: list[dict],
+    question: str,
+    fields: list[str] | None = None,
+    token_budget: int | None = None,
+    strategy: str | None = None,
+    fresh: bool = False,
+    model: str = GEMINI_MODEL,
+) -> tuple[EncodedProducts, AsyncIterator[str]]:
+    """
+    Trozos de la respuesta según llegan. Un acierto de `answer_cache` sale en un solo trozo;
+    una respuesta completa se guarda en la caché. Corta con asyncio.TimeoutError cuando la espera
+    acumulada al modelo pasa de PROMPT_TIMEOUT.
+    """
+    with phase("prompt_encode"):
+        encoded = encode_for_question(data, question, fields, token_budget, strategy)
+        prompt = build_prompt(encoded, question)
+        key = answer_key(encoded.text, question, model)
+
+    async def chunks() -> AsyncIterator[str]:
+        cached = None if fresh else answer_cache.peek(key)
+        if cached is not None:
+            yield cached.answer
+            return
+        parts: list[str] = []
+        loop = asyncio.get_running_loop()
+        waited = 0.0  # solo la espera al SDK: lo que tarde el cliente en consumir no gasta PROMPT_TIMEOUT
+        client = _client or await asyncio.to_thread(get_client)
+        stream = client.stream(prompt, model)
+        try:
+            while True:
+                t0 = loop.time()
+                try:
+                    with phase("gemini"):
+                        text = await asyncio.wait_for(stream.__anext__(), max(0.0, PROMPT_TIMEOUT - waited))
+                except StopAsyncIteration:
+                    break
+                finally:
+                    waited += loop.time() - t0
+                parts.append(text)
+                yield text
+        finally:
+            await stream.aclose()  # desconexión/timeout: cierra la llamada al SDK
+        answer_cache.put(key, "".join(parts), waited)
+
+    return encoded, chunks()
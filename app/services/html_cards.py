@@ -0,0 +1,156 @@
+# app/services/html_cards.py
+from html.parser import HTMLParser
+
+# Parser de un solo paso sobre el HTML estático de la búsqueda. Produce las mismas
+# tarjetas que `extraction.extract_cards` (attrs, children_text, raw_html, sponsored)
+# sin navegador: children_text aproxima `innerText` (saltos en elementos de bloque).
+
+VOID_TAGS = {
+    "area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta",
+    "param", "source", "track", "wbr",
+}
+BLOCK_TAGS = {
+    "address", "article", "aside", "blockquote", "dd", "div", "dl", "dt", "fieldset",
+    "figcaption", "figure", "footer", "form", "h1", "h2", "h3", "h4", "h5", "h6",
+    "header", "hr", "li", "main", "nav", "ol", "p", "pre", "section", "table",
+    "tbody", "td", "tfoot", "th", "thead", "tr", "ul",
+}
+SKIP_TEXT_TAGS = {"script", "style", "noscript", "template"}
+SPONSORED_WORDS = ("Sponsored", "Patrocinado")
+
+
+def _classes(attrs: dict) -> list[str]:
+    return (attrs.get("class") or "").split()
+
+
+class _CardParser(HTMLParser):
+    def __init__(self, html: str, raw_html: bool):
+        super().__init__(convert_charrefs=True)
+        self.html = html
+        self.raw_html = raw_html
+        self._line_starts = [0]
+        if raw_html:
+            pos = html.find("\n")
+            while pos != -1:
+                self._line_starts.append(pos + 1)
+                pos = html.find("\n", pos + 1)
+        self.stack: list[str] = []
+        self.slot_depth: int | None = None  # profundidad de div.s-main-slot
+        self.card: dict | None = None
+        self.card_depth = 0
+        self.card_start = 0
+        self.child_tag: str | None = None
+        self.child_parts: list[str] = []
+        self.span_depth = 0
+        self.skip_depth = 0
+        self.found_slot = False
+        self.cards: list[dict] = []
+
+    def _offset(self) -> int:
+        line, col = self.getpos()
+        return self._line_starts[line - 1] + col
+
+    def handle_starttag(self, tag, attrs_list):
+        depth = len(self.stack)
+        attrs = {k: ("" if v is None else v) for k, v in attrs_list}
+        if self.card is None:
+            if self.slot_depth is None and tag == "div" and "s-main-slot" in _classes(attrs):
+                self.slot_depth, self.found_slot = depth, True
+            elif (
+                self.slot_depth is not None and depth == self.slot_depth + 1
+                and tag == "div" and attrs.get("data-component-type") == "s-search-result"
+            ):
+                self.card = {"attrs": attrs, "children_text": {}, "sponsored": False}
+                self.card_depth = depth
+                if self.raw_html:
+                    self.card_start = self._offset() + len(self.get_starttag_text() or "")
+        else:
+            if tag == "span":
+                self.span_depth += 1
+                if attrs.get("data-component-type") == "s-status-badge-component":
+                    self.card["sponsored"] = True
+            if depth == self.card_depth + 1:
+                self.child_tag, self.child_parts = tag, []
+            elif self.child_tag is not None:
+                if tag in SKIP_TEXT_TAGS:
+                    self.skip_depth += 1
+                elif tag in BLOCK_TAGS or tag == "br":
+                    self.child_parts.append("\n")
+        if tag not in VOID_TAGS:
+            self.stack.append(tag)
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag not in VOID_TAGS:
+            self.handle_endtag(tag)
+
+    def handle_endtag(self, tag):
+        if tag in VOID_TAGS or tag not in self.stack:
+            return
+        # cierre tolerante: desapila hasta la etiqueta correspondiente
+        while self.stack:
+            open_tag = self.stack.pop()
+            self._close(open_tag, len(self.stack))
+            if open_tag == tag:
+                break
+
+    def _close(self, tag: str, depth: int) -> None:
+        if self.card is not None:
+            if tag == "span" and self.span_depth:
+                self.span_depth -= 1
+            if self.child_tag is not None and depth > self.card_depth + 1:
+                if tag in SKIP_TEXT_TAGS and self.skip_depth:
+                    self.skip_depth -= 1
+                elif tag in BLOCK_TAGS:
+                    self.child_parts.append("\n")
+            elif depth == self.card_depth + 1 and self.child_tag is not None:
+                text = _inner_text(self.child_parts)
+                if text:
+                    self.card["children_text"][self.child_tag] = text
+                self.child_tag = None
+            elif depth == self.card_depth:
+                if self.raw_html:
+                    self.card["raw_html"] = self.html[self.card_start:self._offset()]
+                self.cards.append(self.card)
+                self.card = None
+        if self.slot_depth is not None and depth == self.slot_depth:
+            self.slot_depth = None
+
+    def handle_data(self, data):
+        if self.card is None or self.skip_depth:
+            return
+        if self.span_depth and any(w in data for w in SPONSORED_WORDS):
+            self.card["sponsored"] = True
+        if self.child_tag is not None:
+            self.child_parts.append(data)
+
+
+def _inner_text(parts: list[str]) -> str:
+    # colapsa espacios como el render (white-space: normal) y conserva los saltos de bloque
+    lines = []
+    for chunk in "".join(parts).split("\n"):
+        line = " ".join(chunk.split())
+        if line:
+            lines.append(line)
+    return "\n".join(lines)
+
+
+def parse_search_cards(html: str, raw_html: bool = True, attrs: bool = True) -> tuple[list[dict], bool]:
+    """
+    Devuelve (tarjetas, hay_s_main_slot). Cada tarjeta lleva `sponsored`;
+    las no patrocinadas, `attrs` (con `attrs=False` solo `data-asin`), `children_text` y (opcional) `raw_html`.
+    """
+    parser = _CardParser(html, raw_html)
+    parser.feed(html)
+    parser.close()
+    cards = []
+    for card in parser.cards:
+        if card["sponsored"]:
+            cards.append({"sponsored": True})
+        else:
+            if not raw_html:
+                card.pop("raw_html", None)
+            if not attrs:
+                card["attrs"] = {k: v for k, v in card["attrs"].items() if k == "data-asin"}
+            cards.append(card)
+    return cards, parser.found_slot
@@ -0,0 +1,89 @@
+# app/services/http_fetch.py
+import asyncio
+
+import httpx
+from app.core.config import HTTP_FETCH_TIMEOUT, HTTP_MAX_CONNECTIONS
+from app.core.metrics import phase
+from app.services.browser_pool import USER_AGENT
+from app.services.html_cards import parse_search_cards
+
+# señales de muro anti-bot de Amazon
+BOT_WALL_MARKERS = (
+    "/errors/validatecaptcha",
+    "api-services-support@amazon.com",
+    "type the characters you see in this image",
+    "introduce los caracteres que ves",
+    "<title>robot check</title>",
+)
+
+HEADERS = {
+    "User-Agent": USER_AGENT,
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    "Accept-Language": "es-ES,es;q=0.9,en;q=0.8",
+}
+
+
+class FastPathMiss(Exception):
+    """La respuesta HTTP no sirve (captcha, muro anti-bot, sin resultados): usar el navegador."""
+
+
+class EmptyResults(FastPathMiss):
+    """La página llegó bien pero `s-main-slot` no trae tarjetas (p.ej. más allá de la última página)."""
+
+
+_client: httpx.AsyncClient | None = None
+_client_lock = asyncio.Lock()
+
+
+async def get_client() -> httpx.AsyncClient:
+    # un único cliente con keep-alive para todo el proceso
+    global _client
+    if _client is None:
+        async with _client_lock:
+            if _client is None:
+                _client = httpx.AsyncClient(
+                    headers=HEADERS,
+                    timeout=HTTP_FETCH_TIMEOUT,
+                    follow_redirects=True,
+                    limits=httpx.Limits(
+                        max_connections=HTTP_MAX_CONNECTIONS,
+                        max_keepalive_connections=HTTP_MAX_CONNECTIONS,
+                    ),
+                )
+    return _client
+
+
+async def close_client() -> None:
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+def check_page(status_code: int, html: str) -> None:
+    if status_code != 200:
+        raise FastPathMiss(f"HTTP {status_code}")
+    low = html.lower()
+    for marker in BOT_WALL_MARKERS:
+        if marker in low:
+            raise FastPathMiss("captcha/bot wall")
+
+
+async def fetch_search_cards(url: str, raw_html: bool = True, attrs: bool = True) -> list[dict]:
+    """Mismo contrato que `extraction.extract_cards`, pero con una petición HTTP."""
+    client = await get_client()
+    try:
+        with phase("http_fetch"):
+            resp = await client.get(url)
+    except httpx.HTTPError as e:
+        raise FastPathMiss(f"{type(e).__name__}: {e}") from None
+    html = resp.text
+    check_page(resp.status_code, html)
+    # el parseo es CPU: fuera del event loop
+    with phase("html_parse"):
+        cards, has_slot = await asyncio.to_thread(parse_search_cards, html, raw_html, attrs)
+    if not has_slot:
+        raise FastPathMiss("sin div.s-main-slot")
+    if not cards:
+        raise EmptyResults("s-main-slot vacío")
+    return cards
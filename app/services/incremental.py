@@ -0,0 +1,136 @@
+# app/services/incremental.py
+"""
+Re-scrape incremental: cada tarjeta se identifica por `data-asin` + hash de su `children_text`.
+Las que no cambiaron desde el último snapshot de la misma búsqueda reutilizan su producto
+ya purificado; solo se purifican las nuevas o modificadas. `diff` resume los cambios.
+"""
+import hashlib
+import json
+from dataclasses import dataclass, field
+from typing import Any
+
+from app.services.purify import FIELDS, normalize_children_text, project
+
+# campos comparados entre snapshots (`id` es solo la posición en raw_data)
+DIFF_FIELDS = FIELDS
+
+
+def asin_of(item: Any) -> str | None:
+    return ((item.get("attrs") or {}).get("data-asin") or None) if isinstance(item, dict) else None
+
+
+def fingerprint(item: Any) -> str | None:
+    if not isinstance(item, dict) or not isinstance(item.get("children_text"), dict):
+        return None
+    text = json.dumps(item["children_text"], ensure_ascii=False, separators=(",", ":"))
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+
+@dataclass
+class IncrementalResult:
+    structured: list[dict]
+    asins: list[str | None]
+    fingerprints: list[str | None]
+    reused: int = 0
+    purified: int = 0
+
+
+def purify_incremental(
+    raw_data: list, previous: list[dict] | None, fields: tuple[str, ...] | None = None,
+) -> IncrementalResult:
+    """
+    Como `purify_raw` (mismos `id` = posición 1-based), pero reutilizando el producto de
+    `previous` (filas de `ProductStore.latest_snapshot`) cuando ASIN y huella coinciden
+    y tiene todos los `fields` pedidos (un snapshot con menos campos no sirve para más).
+    """
+    wanted = set(fields or FIELDS)
+    known = {
+        row["asin"]: row for row in previous or ()
+        if row.get("asin") and row.get("fingerprint")
+    }
+    out = IncrementalResult([], [], [])
+    for idx, item in enumerate(raw_data, start=1):
+        if not (isinstance(item, dict) and "children_text" in item):
+            continue
+        asin, fp = asin_of(item), fingerprint(item)
+        prev = known.get(asin) if asin else None
+        if prev is not None and fp is not None and prev["fingerprint"] == fp and wanted <= prev["product"].keys():
+            clean = {**project(prev["product"], fields), "id": idx}
+            out.reused += 1
+        else:
+            clean = normalize_children_text(item["children_text"], fields)
+            if not clean:
+                continue
+            clean["id"] = idx
+            out.purified += 1
+        out.structured.append(clean)
+        out.asins.append(asin)
+        out.fingerprints.append(fp)
+    return out
+
+
+def same_snapshot(previous: list[dict] | None, current: IncrementalResult) -> bool:
+    """Mismas tarjetas, en el mismo orden (mismos `id`), sin cambios y todas reutilizadas."""
+    if previous is None or current.purified or None in current.fingerprints:
+        return False
+    before = [(row["asin"], row["fingerprint"], row["product"].get("id")) for row in previous]
+    now = [(a, f, p["id"]) for a, f, p in zip(current.asins, current.fingerprints, current.structured)]
+    return before == now
+
+
+@dataclass
+class Delta:
+    previous_scrape_id: int | None
+    added: list[dict] = field(default_factory=list)
+    removed: list[dict] = field(default_factory=list)
+    changed: list[dict] = field(default_factory=list)
+    unchanged: int = 0
+    untracked: int = 0  # productos sin ASIN: no se pueden seguir entre snapshots
+    complete: bool = True  # False: faltaron páginas o se cortó en max_items → `removed` no se calcula
+
+    def to_dict(self) -> dict:
+        return {
+            "previous_scrape_id": self.previous_scrape_id,
+            "added": self.added,
+            "removed": self.removed,
+            "changed": self.changed,
+            "unchanged": self.unchanged,
+            "untracked": self.untracked,
+            "complete": self.complete,
+        }
+
+
+def diff(
+    previous_scrape_id: int | None, previous: list[dict] | None, current: IncrementalResult, complete: bool = True,
+) -> Delta:
+    """`complete=False` (ver `ScrapeStats.complete`): un ASIN no visto puede estar en lo que no se pidió."""
+    delta = Delta(previous_scrape_id, complete=complete)
+    before = {row["asin"]: row for row in previous or () if row.get("asin")}
+    seen: set[str] = set()
+    for prod, asin, fp in zip(current.structured, current.asins, current.fingerprints):
+        if not asin:
+            delta.untracked += 1
+            continue
+        if asin in seen:
+            continue
+        seen.add(asin)
+        prev = before.get(asin)
+        if prev is None:
+            delta.added.append({"asin": asin, **prod})
+            continue
+        if fp is not None and prev.get("fingerprint") == fp:
+            delta.unchanged += 1
+            continue
+        old = prev["product"]
+        # solo los campos presentes en ambos (uno de los dos puede venir de un scrape con `fields`)
+        changes = {
+            f: {"old": old[f], "new": prod[f]} for f in DIFF_FIELDS
+            if f in old and f in prod and old[f] != prod[f]
+        }
+        if changes:
+            delta.changed.append({"asin": asin, "id": prod.get("id"), "changes": changes})
+        else:
+            delta.unchanged += 1  # el HTML cambió pero no los campos purificados
+    if complete:
+        delta.removed = [{"asin": asin, **row["product"]} for asin, row in before.items() if asin not in seen]
+    return delta
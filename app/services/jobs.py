@@ -0,0 +1,187 @@
+# app/services/jobs.py
+import asyncio
+import sqlite3
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Any
+
+from cachetools import TTLCache
+from app.core.config import SCRAPE_JOB_WORKERS, SCRAPE_JOB_QUEUE, SCRAPE_JOB_TTL, SCRAPE_JOB_MAX
+from app.services.pipeline import scrape_and_save
+from app.services.cache import cache_key
+from app.services.raw_store import RAW_MODES
+from app.core.metrics import JOBS_QUEUED
+from app.core.state import get_state
+
+
+class JobQueueFull(Exception):
+    """No caben más jobs en la cola."""
+
+
+@dataclass
+class Job:
+    key: str
+    url: str
+    pages: int = 1
+    max_items: int | None = None
+    fresh: bool = False
+    block: str | None = None
+    mode: str | None = None
+    raw: str | None = None
+    incremental: bool = False
+    fields: tuple[str, ...] | None = None
+    id: str = field(default_factory=lambda: uuid.uuid4().hex)
+    status: str = "queued"  # queued | running | done | error
+    created_at: float = field(default_factory=time.time)
+    started_at: float | None = None
+    finished_at: float | None = None
+    result: dict | None = None
+    error: str | None = None
+    subscribers: int = 1    # peticiones que comparten este job
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "url": self.url,
+            "pages": self.pages,
+            "max_items": self.max_items,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "subscribers": self.subscribers,
+            "raw": self.raw,
+            "incremental": self.incremental,
+            "fields": list(self.fields) if self.fields else None,
+            "result": self.result,
+            "error": self.error,
+        }
+
+
+class JobManager:
+    """
+    Cola de scrapes en proceso con `workers` tareas asyncio.
+    Una misma búsqueda (URL normalizada, pages, max_items) en cola o en curso se comparte: no se lanza otro navegador.
+    Con varios workers cada uno ejecuta sus jobs, pero el estado se publica en STATE_DB: cualquier
+    worker responde GET /scrape/jobs/{id} y una búsqueda en marcha en otro worker también se comparte.
+    """
+
+    def __init__(
+        self,
+        workers: int = SCRAPE_JOB_WORKERS,
+        max_queue: int = SCRAPE_JOB_QUEUE,
+        ttl: int = SCRAPE_JOB_TTL,
+        max_jobs: int = SCRAPE_JOB_MAX,
+    ):
+        self.workers = max(1, workers)
+        self.max_queue = max(1, max_queue)
+        self.ttl = ttl
+        self._jobs: TTLCache[str, Job] = TTLCache(maxsize=max_jobs, ttl=ttl)
+        self._active: dict[str, Job] = {}
+        self._queue: asyncio.Queue[Job] | None = None
+        self._tasks: list[asyncio.Task] = []
+
+    async def start(self) -> None:
+        if self._tasks:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_queue)
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self) -> None:
+        for t in self._tasks:
+            t.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._queue = None
+
+    @property
+    def queued(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    async def _publish(self, job: Job) -> None:
+        try:
+            await asyncio.to_thread(get_state().save_job, job.to_dict(), job.key, self.ttl)
+        except sqlite3.Error:
+            pass  # sin estado compartido el job sigue visible en este worker
+
+    async def submit(
+        self,
+        url: str,
+        pages: int = 1,
+        max_items: int | None = None,
+        fresh: bool = False,
+        block: str | None = None,
+        mode: str | None = None,
+        raw: str | None = None,
+        incremental: bool = False,
+        fields: tuple[str, ...] | None = None,
+    ) -> tuple[Job, bool]:
+        """Devuelve (job, coalesced). `coalesced=True` si se reutilizó un job ya en marcha."""
+        if self._queue is None:
+            raise RuntimeError("JobManager no iniciado")
+        key = cache_key(url, pages, max_items, fields)  # solo se comparte con quien pide los mismos campos
+        job = self._active.get(key)
+        if job is not None:
+            job.subscribers += 1
+            if fresh and job.status == "queued":
+                job.fresh = True
+            if raw and job.status == "queued" and (job.raw is None or RAW_MODES.index(raw) > RAW_MODES.index(job.raw)):
+                job.raw = raw  # quien comparte el job recibe al menos la captura que pidió
+            if incremental and job.status == "queued":
+                job.incremental = True
+            return job, True
+        shared = await asyncio.to_thread(get_state().active_job, key)
+        if shared is not None and not fresh and not (incremental and not shared["incremental"]) and (
+            raw is None or (shared["raw"] and RAW_MODES.index(raw) <= RAW_MODES.index(shared["raw"]))
+        ):
+            # en marcha en otro worker y no hace falta mejorarlo (fresh/raw/incremental)
+            return Job(key=key, url=shared["url"], pages=shared["pages"], max_items=shared["max_items"],
+                       id=shared["job_id"], status=shared["status"], created_at=shared["created_at"]), True
+        job = Job(key=key, url=url, pages=pages, max_items=max_items, fresh=fresh, block=block, mode=mode, raw=raw,
+                  incremental=incremental, fields=fields)
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            raise JobQueueFull(f"Cola de jobs llena ({self.max_queue})") from None
+        self._active[key] = job
+        self._jobs[job.id] = job
+        await self._publish(job)
+        return job, False
+
+    async def get(self, job_id: str) -> dict[str, Any] | None:
+        job = self._jobs.get(job_id)
+        if job is None:
+            # un job activo nunca se pierde aunque la TTLCache lo haya expulsado
+            job = next((j for j in self._active.values() if j.id == job_id), None)
+        if job is not None:
+            return job.to_dict()
+        return await asyncio.to_thread(get_state().get_job, job_id)  # de otro worker
+
+    async def _worker(self) -> None:
+        while True:
+            job = await self._queue.get()
+            job.status, job.started_at = "running", time.time()
+            await self._publish(job)
+            try:
+                job.result = await scrape_and_save(
+                    job.url, pages=job.pages, max_items=job.max_items,
+                    fresh=job.fresh, block=job.block, mode=job.mode, raw=job.raw,
+                    incremental=job.incremental, fields=job.fields,
+                )
+                job.status = "done"
+            except asyncio.CancelledError:
+                job.status, job.error = "error", "cancelled"
+                raise
+            except Exception as e:
+                job.status, job.error = "error", f"{type(e).__name__}: {e}"
+            finally:
+                job.finished_at = time.time()
+                self._active.pop(job.key, None)
+                self._jobs[job.id] = job  # reinicia la TTL desde que termina
+                self._queue.task_done()
+            await self._publish(job)
+
+
+job_manager = JobManager()
+JOBS_QUEUED.set_function(lambda: job_manager.queued)
@@ -0,0 +1,93 @@
+# app/services/limiter.py
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+from urllib.parse import urlsplit
+
+from app.core.config import (
+    SCRAPE_MAX_IN_FLIGHT, SCRAPE_MAX_QUEUE, SCRAPE_QUEUE_TIMEOUT, SCRAPE_HOST_RATE, SCRAPE_HOST_BURST,
+)
+from app.core.metrics import phase, SCRAPE_IN_FLIGHT, SCRAPE_WAITING
+
+
+class QueueFull(Exception):
+    """La cola de admisión está llena: el cliente debe reintentar más tarde (429)."""
+
+
+class QueueTimeout(Exception):
+    """Se esperó turno más de lo permitido (503)."""
+
+
+class AdmissionLimiter:
+    """
+    Semáforo global de páginas en vuelo con una cola de espera acotada.
+    Con la cola llena se rechaza de inmediato en lugar de acumular peticiones
+    (y navegadores) sin límite.
+    """
+
+    def __init__(
+        self,
+        max_in_flight: int = SCRAPE_MAX_IN_FLIGHT,
+        max_queue: int = SCRAPE_MAX_QUEUE,
+        queue_timeout: float = SCRAPE_QUEUE_TIMEOUT,
+    ):
+        self.max_in_flight = max(1, max_in_flight)
+        self.max_queue = max(0, max_queue)
+        self.queue_timeout = queue_timeout
+        self._sem = asyncio.Semaphore(self.max_in_flight)
+        self.in_flight = 0
+        self.waiting = 0
+
+    @asynccontextmanager
+    async def admit(self) -> AsyncIterator[None]:
+        if not self._sem.locked():
+            await self._sem.acquire()  # hay hueco: no bloquea
+        else:
+            if self.waiting >= self.max_queue:
+                raise QueueFull(f"Cola de scraping llena ({self.waiting} en espera)")
+            self.waiting += 1
+            try:
+                with phase("admission_wait"):
+                    await asyncio.wait_for(self._sem.acquire(), self.queue_timeout)
+            except asyncio.TimeoutError:
+                raise QueueTimeout(f"Sin turno de scraping tras {self.queue_timeout}s") from None
+            finally:
+                self.waiting -= 1
+        self.in_flight += 1
+        try:
+            yield
+        finally:
+            self.in_flight -= 1
+            self._sem.release()
+
+
+class HostRateLimiter:
+    """
+    Token bucket por host: como mucho `rate` peticiones/s sostenidas, con ráfagas de `burst`.
+    Cada llamada reserva su turno al entrar (el saldo puede quedar negativo) y duerme lo que
+    le toque, así que los turnos se reparten en orden de llegada.
+    """
+
+    def __init__(self, rate: float = SCRAPE_HOST_RATE, burst: int = SCRAPE_HOST_BURST):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._buckets: dict[str, tuple[float, float]] = {}  # host → (tokens, instante)
+
+    async def wait(self, url: str) -> None:
+        if self.rate <= 0:
+            return
+        host = urlsplit(url).netloc.lower()
+        now = time.monotonic()
+        tokens, last = self._buckets.get(host, (float(self.burst), now))
+        tokens = min(float(self.burst), tokens + (now - last) * self.rate) - 1
+        self._buckets[host] = (tokens, now)
+        if tokens < 0:
+            with phase("host_rate_wait"):
+                await asyncio.sleep(-tokens / self.rate)
+
+
+scrape_limiter = AdmissionLimiter()
+host_limiter = HostRateLimiter()
+SCRAPE_IN_FLIGHT.set_function(lambda: scrape_limiter.in_flight)
+SCRAPE_WAITING.set_function(lambda: scrape_limiter.waiting)
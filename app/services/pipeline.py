@@ -0,0 +1,259 @@
+# app/services/pipeline.py
+import asyncio
+from dataclasses import replace
+from typing import AsyncIterator
+
+from app.core.config import RAW_FILE, DATA_FILE, EXPORT_LOCK, EXPORT_JSON_FILES, RAW_CAPTURE
+from app.core.jsonio import atomic_write, dumps, file_lock
+from app.core.state import get_state
+from app.core.metrics import phase, SCRAPE_REQUESTS, STRUCTURED_ITEMS, INCREMENTAL_ITEMS
+from app.services.scraper import scrape_amazon, ScrapeStats
+from app.services.purify import purify_raw, project
+from app.services.cache import CacheEntry, scrape_cache, cache_key
+from app.services.blocking import BlockStats, get_profile
+from app.services.store import get_store
+from app.services.raw_store import RAW_MODES, raw_store, needs_raw_html, compact_item
+from app.services.incremental import asin_of, fingerprint, purify_incremental, diff, same_snapshot
+
+LAST_EXPORT = "last_export"  # clave en STATE_DB: búsqueda (clave de caché + raw) volcada en RAW_FILE/DATA_FILE
+
+def asins_for(raw_data: list, structured: list[dict]) -> list[str | None]:
+    # `id` es la posición 1-based en raw_data
+    return [asin_of(raw_data[prod["id"] - 1]) for prod in structured]
+
+def fingerprints_for(raw_data: list, structured: list[dict]) -> list[str | None]:
+    return [fingerprint(raw_data[prod["id"] - 1]) for prod in structured]
+
+def _purify_batch(batch: list, offset: int, fields: tuple[str, ...] | None = None) -> list[dict]:
+    # mismos `id` que purify_raw sobre la lista completa
+    structured = purify_raw(batch, fields)
+    for prod in structured:
+        prod["id"] += offset
+    return structured
+
+def _export_files(
+    raw_data: list, structured: list[dict], raw: str = "full", key: str | None = None, hit: bool = False,
+) -> None:
+    # raw=none no toca RAW_FILE; compact lo escribe sin raw_html.
+    # El cerrojo entre procesos evita que con varios workers RAW_FILE y DATA_FILE queden de scrapes distintos;
+    # qué búsqueda quedó volcada se guarda en STATE_DB, así un acierto solo se salta el volcado si los
+    # archivos ya son de esa búsqueda (la escribiera este worker u otro)
+    with phase("json_export"), file_lock(EXPORT_LOCK):
+        saved = f"{key}|raw={raw}" if key is not None else None
+        state = get_state()
+        if hit and saved is not None and state.get_meta(LAST_EXPORT) == saved:
+            return
+        if raw != "none":
+            items = raw_data if raw == "full" else [compact_item(i) for i in raw_data]
+            atomic_write(RAW_FILE, dumps(items, indent=True))
+        atomic_write(DATA_FILE, dumps(structured, indent=True))
+        state.set_meta(LAST_EXPORT, saved or "")
+
+def _raw_mode(raw: str | None, fields: tuple[str, ...] | None = None) -> str:
+    # con `fields` el HTML crudo no forma parte de lo pedido: salvo raw=full explícito, se captura compact
+    raw = raw or (RAW_CAPTURE if fields is None or RAW_CAPTURE == "none" else "compact")
+    if raw not in RAW_MODES:
+        raise ValueError(f"Modo raw desconocido: {raw!r} (usa {', '.join(RAW_MODES)})")
+    return raw
+
+def _has_raw_html(raw_data: list) -> bool:
+    return not raw_data or any(isinstance(i, dict) and "raw_html" in i for i in raw_data)
+
+async def _cached(key: str, fkey: str, fields: tuple[str, ...] | None, raw: str, fresh: bool) -> CacheEntry | None:
+    if fresh:
+        return None
+    entry = await scrape_cache.get(fkey)
+    if entry is None and fields is not None:
+        # una entrada con todos los campos también sirve, recortada
+        full = await scrape_cache.get(key)
+        if full is not None:
+            entry = replace(full, structured=[project(p, fields) for p in full.structured])
+    if entry is not None and needs_raw_html(raw) and not _has_raw_html(entry.raw):
+        return None  # la entrada se scrapeó sin raw_html
+    return entry
+
+def _persist(
+    url: str, key: str, scrape_id: int | None, raw_data: list, structured: list[dict], raw: str, hit: bool,
+    export: bool = True,
+) -> None:
+    # captura y volcados en el hilo escritor: la respuesta no espera al disco
+    if scrape_id is not None:
+        raw_store.capture(scrape_id, url, raw_data, raw, only_missing=hit)
+    if export and EXPORT_JSON_FILES:
+        raw_store.submit(_export_files, raw_data, structured, raw, key, hit)
+
+async def scrape_and_save(
+    url: str,
+    pages: int = 1,
+    max_items: int | None = None,
+    fresh: bool = False,
+    block: str | None = None,
+    mode: str | None = None,
+    raw: str | None = None,
+    export: bool = True,
+    incremental: bool = False,
+    fields: tuple[str, ...] | None = None,
+) -> dict:
+    """
+    scrape → raw → purify → structured; compartido por /scrape, los lotes y los jobs en segundo plano.
+    `raw`: none | compact | full (por defecto RAW_CAPTURE), qué se guarda del HTML crudo.
+    `export`: False → no vuelca RAW_FILE/DATA_FILE (p.ej. en lotes, donde se pisarían entre sí).
+    `incremental`: compara con el último snapshot de la misma búsqueda, purifica solo las tarjetas
+    nuevas o cambiadas y devuelve `delta`; si nada cambió se reutiliza ese snapshot. Si alguna página
+    falló (`fetch.failed_pages`) o se cortó en max_items, `delta.removed` no se calcula y los ASIN
+    no vistos conservan su estado en el snapshot (ver `ProductStore.latest_snapshot`).
+    `fields`: subconjunto de `purify.FIELDS` (ver `parse_fields`); solo se extraen esos campos,
+    las tarjetas no traen más atributo que `data-asin` y, sin raw explícito, la captura es compact.
+    """
+    raw = _raw_mode(raw, fields)
+    store = get_store()
+    key, fkey = cache_key(url, pages, max_items), cache_key(url, pages, max_items, fields)
+    entry = await _cached(key, fkey, fields, raw, fresh)
+    stats = delta = inc = None
+    reused_snapshot = False
+    if entry is not None:
+        raw_data, structured, scrape_id = entry.raw, entry.structured, entry.scrape_id
+        if scrape_id is not None:
+            await asyncio.to_thread(store.touch_scrape, scrape_id)
+    else:
+        stats = ScrapeStats(BlockStats(get_profile(block).name))
+        with phase("scrape"):
+            raw_data = await scrape_amazon(
+                url, pages=pages, max_items=max_items, block=block, stats=stats, mode=mode,
+                raw_html=needs_raw_html(raw), attrs=fields is None,
+            )
+        if incremental:
+            with phase("store_read"):
+                previous = await asyncio.to_thread(store.latest_snapshot, key)
+            prev_id, prev_rows = previous or (None, None)
+            with phase("purify"):
+                inc = purify_incremental(raw_data, prev_rows, fields)
+            structured, asins, fingerprints = inc.structured, inc.asins, inc.fingerprints
+            INCREMENTAL_ITEMS.inc(inc.reused, result="reused")
+            INCREMENTAL_ITEMS.inc(inc.purified, result="purified")
+            delta = diff(prev_id, prev_rows, inc, complete=stats.complete)
+            reused_snapshot = same_snapshot(prev_rows, inc)  # nada cambió: no se escribe otro snapshot
+        else:
+            with phase("purify"):
+                structured = purify_raw(raw_data, fields)
+            asins, fingerprints = asins_for(raw_data, structured), fingerprints_for(raw_data, structured)
+        STRUCTURED_ITEMS.inc(len(structured))
+        if reused_snapshot:
+            scrape_id = prev_id
+            await asyncio.to_thread(store.touch_scrape, scrape_id)
+        else:
+            # un único lote transaccional por scrape, fuera del event loop
+            with phase("store_write"):
+                scrape_id = await asyncio.to_thread(
+                    store.save_scrape, url, key, len(raw_data), structured, asins, fingerprints,
+                    not stats.complete, fields,
+                )
+        if not stats.failed_pages:  # un reintento no debe servirse desde caché sin las páginas que fallaron
+            scrape_cache.set(fkey, raw_data, structured, scrape_id=scrape_id)
+    SCRAPE_REQUESTS.inc(cached=str(entry is not None).lower())
+
+    export = export and EXPORT_JSON_FILES
+    _persist(
+        url, fkey, scrape_id, raw_data, structured, raw,
+        hit=entry is not None or reused_snapshot, export=export,
+    )
+    result = {
+        "url": url,
+        "pages": pages,
+        "cached": entry is not None,
+        "scrape_id": scrape_id,
+        "raw": raw,
+        "fields": list(fields) if fields else None,
+        "saved_raw": str(RAW_FILE.resolve()) if export and raw != "none" else None,
+        "saved_structured": str(DATA_FILE.resolve()) if export else None,
+        "raw_items": len(raw_data),
+        "structured_items": len(structured),
+        "fetch": stats.to_dict() if stats else None,
+        "blocked": stats.blocked.to_dict() if stats else None,
+    }
+    if incremental:
+        # en un acierto de caché no hay scrape nuevo con el que comparar: delta = null
+        result["incremental"] = {
+            "reused_items": inc.reused if inc else None,
+            "purified_items": inc.purified if inc else None,
+            "snapshot_reused": reused_snapshot,
+        }
+        result["delta"] = delta.to_dict() if delta else None
+    return result
+
+async def stream_scrape(
+    url: str,
+    pages: int = 1,
+    max_items: int | None = None,
+    fresh: bool = False,
+    block: str | None = None,
+    mode: str | None = None,
+    raw: str | None = None,
+    fields: tuple[str, ...] | None = None,
+) -> AsyncIterator[dict]:
+    """
+    Igual que `scrape_and_save`, pero va cediendo `{"type": "product", ...}` por cada producto
+    purificado según se completan las páginas y termina con `{"type": "summary", ...}`.
+    """
+    raw = _raw_mode(raw, fields)
+    store = get_store()
+    key, fkey = cache_key(url, pages, max_items), cache_key(url, pages, max_items, fields)
+    entry = await _cached(key, fkey, fields, raw, fresh)
+    if entry is not None:
+        if entry.scrape_id is not None:
+            await asyncio.to_thread(store.touch_scrape, entry.scrape_id)
+        SCRAPE_REQUESTS.inc(cached="true")
+        _persist(url, fkey, entry.scrape_id, entry.raw, entry.structured, raw, hit=True)
+        for prod in entry.structured:
+            yield {"type": "product", **prod}
+        yield {
+            "type": "summary", "url": url, "pages": pages, "cached": True, "scrape_id": entry.scrape_id, "raw": raw,
+            "fields": list(fields) if fields else None,
+            "raw_items": len(entry.raw), "structured_items": len(entry.structured), "fetch": None, "blocked": None,
+        }
+        return
+
+    stats = ScrapeStats(BlockStats(get_profile(block).name))
+    batches: asyncio.Queue[list | None] = asyncio.Queue()
+    task = asyncio.create_task(
+        scrape_amazon(url, pages=pages, max_items=max_items, block=block, stats=stats, mode=mode,
+                      on_items=batches.put_nowait, raw_html=needs_raw_html(raw), attrs=fields is None)
+    )
+    task.add_done_callback(lambda _: batches.put_nowait(None))
+    raw_data: list = []
+    structured: list[dict] = []
+    scrape_id = None
+    try:
+        while (batch := await batches.get()) is not None:
+            with phase("purify"):
+                clean = _purify_batch(batch, len(raw_data), fields)
+            STRUCTURED_ITEMS.inc(len(clean))
+            raw_data += batch
+            structured += clean
+            with phase("store_write"):
+                if scrape_id is None:
+                    scrape_id = await asyncio.to_thread(store.begin_scrape, url, key, fields)
+                await asyncio.to_thread(
+                    store.add_products, scrape_id, clean, asins_for(raw_data, clean), fingerprints_for(raw_data, clean),
+                )
+            for prod in clean:
+                yield {"type": "product", **prod}
+        await task  # propaga el error del scrape, si lo hubo
+    finally:
+        if not task.done():
+            task.cancel()  # el cliente se desconectó: no seguir scrapeando
+            await asyncio.gather(task, return_exceptions=True)
+
+    if scrape_id is None:
+        scrape_id = await asyncio.to_thread(store.begin_scrape, url, key, fields)
+    await asyncio.to_thread(store.finish_scrape, scrape_id, len(raw_data), len(structured), not stats.complete)
+    if not stats.failed_pages:
+        scrape_cache.set(fkey, raw_data, structured, scrape_id=scrape_id)
+    SCRAPE_REQUESTS.inc(cached="false")
+    _persist(url, fkey, scrape_id, raw_data, structured, raw, hit=False)
+    yield {
+        "type": "summary", "url": url, "pages": pages, "cached": False, "scrape_id": scrape_id, "raw": raw,
+        "fields": list(fields) if fields else None,
+        "raw_items": len(raw_data), "structured_items": len(structured),
+        "fetch": stats.to_dict(), "blocked": stats.blocked.to_dict(),
+    }
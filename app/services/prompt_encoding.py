@@ -0,0 +1,131 @@
+# app/services/prompt_encoding.py
+"""
+Codifica los productos para el prompt como una tabla compacta:
+
+    id|title|rating|reviews|price|delivery
+    1|GPU RTX 4060 8GB|4.6|1,234|$299.99|FREE delivery Mon, Oct 6
+
+Una cabecera en vez de repetir cada clave por producto, solo los campos pedidos y
+un presupuesto de tokens que recorta o muestrea las filas de forma determinista.
+"""
+import math
+from dataclasses import dataclass
+from typing import Any, Iterable
+
+from app.core.config import PROMPT_FIELDS, PROMPT_TOKEN_BUDGET, PROMPT_OVERFLOW
+
+PRODUCT_FIELDS = ("id", "title", "rating", "reviews", "price", "delivery", "badges")
+OVERFLOW_STRATEGIES = ("truncate", "sample")
+CHARS_PER_TOKEN = 4
+SEP = "|"
+
+
+def estimate_tokens(text: str) -> int:
+    # aproximación barata (sin tokenizer): ~4 caracteres por token
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def _cell(value: Any) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, (list, tuple)):
+        value = ";".join(str(v) for v in value)
+    return " ".join(str(value).split()).replace(SEP, "/")
+
+
+def encode_row(product: dict, fields: Iterable[str]) -> str:
+    return SEP.join(_cell(product.get(f)) for f in fields)
+
+
+@dataclass
+class EncodedProducts:
+    text: str
+    fields: list[str]
+    rows_total: int
+    rows_included: int
+    strategy: str
+    budget: int | None
+
+    @property
+    def chars(self) -> int:
+        return len(self.text)
+
+    @property
+    def tokens(self) -> int:
+        return estimate_tokens(self.text)
+
+    @property
+    def truncated(self) -> bool:
+        return self.rows_included < self.rows_total
+
+    def to_dict(self) -> dict:
+        return {
+            "fields": self.fields,
+            "rows_total": self.rows_total,
+            "rows_included": self.rows_included,
+            "truncated": self.truncated,
+            "strategy": self.strategy,
+            "chars": self.chars,
+            "estimated_tokens": self.tokens,
+            "token_budget": self.budget,
+        }
+
+
+def _sample_indices(n: int, k: int) -> list[int]:
+    # k filas repartidas uniformemente (incluye la primera); siempre las mismas para el mismo n, k
+    if k >= n:
+        return list(range(n))
+    return [i * n // k for i in range(k)]
+
+
+def _fit(rows: list[str], avail: int, strategy: str) -> list[int]:
+    # índices de las filas que caben en `avail` caracteres (cada fila + "\n")
+    sizes = [len(r) + 1 for r in rows]
+    if sum(sizes) <= avail:
+        return list(range(len(rows)))
+    if strategy == "truncate":
+        out, used = [], 0
+        for i, size in enumerate(sizes):
+            if used + size > avail:
+                break
+            out.append(i); used += size
+        return out
+    k = min(len(rows), max(0, avail * len(rows) // sum(sizes) + 1))
+    while k > 0:
+        idx = _sample_indices(len(rows), k)
+        if sum(sizes[i] for i in idx) <= avail:
+            return idx
+        k -= 1
+    return []
+
+
+def encode_products(
+    products: list[dict],
+    fields: list[str] | None = None,
+    token_budget: int | None = None,
+    strategy: str | None = None,
+    reserved_tokens: int = 0,
+) -> EncodedProducts:
+    """
+    `fields`: columnas a incluir (por defecto PROMPT_FIELDS).
+    `token_budget`: tokens estimados para todo el prompt (por defecto PROMPT_TOKEN_BUDGET; 0 = sin límite);
+    `reserved_tokens` se descuenta para instrucciones y pregunta.
+    `strategy`: truncate | sample cuando las filas no caben.
+    """
+    fields = [f for f in (fields or PROMPT_FIELDS) if f in PRODUCT_FIELDS] or list(PROMPT_FIELDS)
+    strategy = strategy or PROMPT_OVERFLOW
+    if strategy not in OVERFLOW_STRATEGIES:
+        raise ValueError(f"Estrategia desconocida: {strategy!r} (usa {', '.join(OVERFLOW_STRATEGIES)})")
+    budget = PROMPT_TOKEN_BUDGET if token_budget is None else token_budget
+    header = SEP.join(fields)
+    rows = [encode_row(p, fields) for p in products]
+    if budget and budget > 0:
+        avail = (budget - reserved_tokens) * CHARS_PER_TOKEN - len(header)
+        keep = _fit(rows, max(0, avail), strategy)
+    else:
+        keep = range(len(rows))
+    text = "\n".join([header, *(rows[i] for i in keep)])
+    return EncodedProducts(
+        text=text, fields=fields, rows_total=len(rows), rows_included=len(keep),
+        strategy=strategy, budget=budget or None,
+    )
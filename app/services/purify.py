@@ -14,30 +14,32 @@ BADGE_KEYWORDS = [
     "Agregar al carrito", "Añadir a la cesta", "Ver opciones", "Más opciones de compra", "Solo quedan",
     "Exclusivo para miembros Prime"
 ]
+SPACES_REGEX  = re.compile(r"\s{2,}")
 
-def _join_lines(lines: list[str]) -> list[str]:
-    return [l.strip() for l in lines if l and l.strip()]
+# Campos de cada producto purificado (`id` siempre se añade); `fields=` elige un subconjunto
+FIELDS = ("title", "rating", "reviews", "price", "delivery", "badges")
 
-def _find_rating(lines: list[str]):
-    for line in lines:
-        m = RATING_REGEX.search(line)
-        if m:
-            num = m.group(1).replace(',', '.')
-            try: return float(num)
-            except: return num
-    return None
+def parse_fields(value: str | list[str] | None) -> tuple[str, ...] | None:
+    """"title,price" → ("title", "price") en el orden de FIELDS; None o todos → None (sin recorte)."""
+    if value is None:
+        return None
+    names = value.split(",") if isinstance(value, str) else value
+    wanted = {n.strip() for n in names if n and n.strip()}
+    unknown = wanted - set(FIELDS)
+    if unknown:
+        raise ValueError(f"Campos desconocidos: {', '.join(sorted(unknown))} (usa {', '.join(FIELDS)})")
+    if not wanted:
+        raise ValueError(f"fields vacío (usa {', '.join(FIELDS)})")
+    return None if wanted == set(FIELDS) else tuple(f for f in FIELDS if f in wanted)
 
-def _find_reviews(lines: list[str]):
-    for i, line in enumerate(lines):
-        if RATING_REGEX.search(line) and i + 1 < len(lines):
-            nxt = lines[i+1].strip().replace('\u00A0', '')
-            if REVIEWS_REGEX.match(nxt):
-                return nxt.replace(' ', '')
-    for line in lines:
-        candidate = line.strip().replace('\u00A0', '')
-        if REVIEWS_REGEX.match(candidate):
-            return candidate.replace(' ', '')
-    return None
+# Todas las keywords en una sola alternancia compilada: una pasada en C por línea
+# (ya en minúsculas) descarta las que no tienen ninguna; solo las que aciertan
+# se comprueban keyword a keyword para respetar el orden de BADGE_KEYWORDS.
+_BADGE_LOWER = [(kw, kw.lower(), kw.lower().startswith("list")) for kw in BADGE_KEYWORDS]
+BADGE_REGEX  = re.compile("|".join(re.escape(low) for _, low, _ in _BADGE_LOWER))
+
+def _join_lines(lines: list[str]) -> list[str]:
+    return [l.strip() for l in lines if l and l.strip()]
 
 def _reconstruct_split_price(lines: list[str], idx: int) -> str | None:
     try:
@@ -48,65 +50,128 @@ def _reconstruct_split_price(lines: list[str], idx: int) -> str | None:
         pass
     return None
 
-def _find_price(lines: list[str]) -> str | None:
-    for line in lines:
-        m = PRICE_REGEX.search(line.replace(" ", ""))
-        if m:
-            return m.group(0)
-    for idx, line in enumerate(lines):
-        if line.strip().startswith("$"):
-            rec = _reconstruct_split_price(lines, idx)
-            if rec: return rec
-    for line in lines:
-        if "List:" in line:
-            m = PRICE_REGEX.search(line)
-            if m: return m.group(0)
-    return None
-
-def _find_delivery(lines: list[str]) -> str | None:
-    for line in lines:
-        m = DELIVERY_REGEX.search(line)
-        if m: return m.group(0).strip()
-    return None
+class _Scan:
+    """Resultado de clasificar todas las líneas de una tarjeta en una sola pasada."""
+    __slots__ = (
+        "rating_idx", "rating", "price_idx", "price", "split_price", "list_price",
+        "reviews_after_rating", "reviews_any", "delivery", "badges",
+    )
 
-def _find_badges(lines: list[str]) -> list[str]:
-    badges: list[str] = []
-    for line in lines:
-        for kw in BADGE_KEYWORDS:
-            if kw.lower() in line.lower():
-                badges.append(line.strip() if kw.lower().startswith("list") else kw)
-    # dedup preservando orden
-    seen, out = set(), []
-    for b in badges:
-        if b not in seen:
-            seen.add(b); out.append(b)
-    return out
+    def __init__(self):
+        self.rating_idx = self.rating = None
+        self.price_idx = self.price = self.split_price = self.list_price = None
+        self.reviews_after_rating = self.reviews_any = None
+        self.delivery = None
+        self.badges: list[str] = []
 
-def _find_title(lines: list[str]) -> str | None:
-    rating_idx = price_idx = None
+def _scan(lines: list[str], fields: tuple[str, ...] | None = None) -> _Scan:
+    # solo se buscan los campos pedidos (y aquello de lo que dependen: el título se corta
+    # en el primer rating/precio y las reseñas se buscan tras el rating)
+    want = set(fields or FIELDS)
+    want_reviews, want_delivery, want_badges = "reviews" in want, "delivery" in want, "badges" in want
+    want_rating = want_reviews or bool(want & {"title", "rating"})
+    want_price, full_price = bool(want & {"title", "price"}), "price" in want
+    s = _Scan()
+    seen_badges: set[str] = set()
+    prev_rating = False
     for i, line in enumerate(lines):
-        if rating_idx is None and RATING_REGEX.search(line): rating_idx = i
-        if price_idx  is None and PRICE_REGEX.search(line.replace(" ", "")): price_idx = i
-    cut_idx = None
-    if rating_idx is not None and price_idx is not None: cut_idx = min(rating_idx, price_idx)
-    elif rating_idx is not None: cut_idx = rating_idx
-    elif price_idx  is not None: cut_idx = price_idx
-    if cut_idx is None:
+        # rating (el patrón exige un "5" literal: prefiltro barato)
+        is_rating = False
+        if want_rating and "5" in line:
+            m = RATING_REGEX.search(line)
+            if m:
+                is_rating = True
+                if s.rating_idx is None:
+                    s.rating_idx = i
+                    num = m.group(1).replace(',', '.')
+                    try: s.rating = float(num)
+                    except: s.rating = num
+
+        # reviews: primero la línea que sigue a un rating; si no, cualquiera que parezca un recuento
+        if want_reviews and s.reviews_after_rating is None:
+            candidate = line.replace('\u00A0', '')
+            if REVIEWS_REGEX.match(candidate):
+                value = candidate.replace(' ', '')
+                if prev_rating:
+                    s.reviews_after_rating = value
+                if s.reviews_any is None:
+                    s.reviews_any = value
+        prev_rating = is_rating
+
+        # precio: directo (tolerando espacios), partido en 3 líneas o "List:"
+        if want_price and s.price is None and "$" in line:
+            m = PRICE_REGEX.search(line.replace(" ", ""))
+            if m:
+                s.price_idx, s.price = i, m.group(0)
+            elif full_price and s.split_price is None and line.startswith("$"):
+                s.split_price = _reconstruct_split_price(lines, i)
+            if full_price and s.list_price is None and "List:" in line:
+                m = PRICE_REGEX.search(line)
+                if m: s.list_price = m.group(0)
+
+        if want_delivery and s.delivery is None:
+            m = DELIVERY_REGEX.search(line)
+            if m: s.delivery = m.group(0).strip()
+
+        if not want_badges:
+            continue
+        low = line.lower()
+        if BADGE_REGEX.search(low):
+            for kw, kw_low, whole_line in _BADGE_LOWER:
+                if kw_low in low:
+                    badge = line.strip() if whole_line else kw
+                    if badge not in seen_badges:
+                        seen_badges.add(badge); s.badges.append(badge)
+    return s
+
+def _title(lines: list[str], s: _Scan) -> str | None:
+    idxs = [i for i in (s.rating_idx, s.price_idx) if i is not None]
+    if not idxs:
         return lines[0].strip() if lines else None
-    title_lines = [l for l in lines[:cut_idx] if not l.lower().startswith("price, product page")]
-    import re as _re
-    title = _re.sub(r"\s{2,}", " ", " ".join(title_lines).strip())
+    title_lines = [l for l in lines[:min(idxs)] if not l.lower().startswith("price, product page")]
+    title = SPACES_REGEX.sub(" ", " ".join(title_lines).strip())
     return title or (lines[0].strip() if lines else None)
 
-def normalize_children_text(children_text_obj: dict[str, Any]) -> dict[str, Any] | None:
+def normalize_children_text(
+    children_text_obj: dict[str, Any], fields: tuple[str, ...] | None = None,
+) -> dict[str, Any] | None:
+    """`fields` (ver `parse_fields`): solo esos campos, y solo se ejecutan sus extractores."""
     if not isinstance(children_text_obj, dict): return None
     text = "\n".join([v for v in children_text_obj.values() if isinstance(v, str)])
     lines = _join_lines(text.splitlines())
-    return {
-        "title":   _find_title(lines),
-        "rating":  _find_rating(lines),
-        "reviews": _find_reviews(lines),
-        "price":   _find_price(lines),
-        "delivery":_find_delivery(lines),
-        "badges":  _find_badges(lines),
-    }
+    s = _scan(lines, fields)
+    if fields is None:
+        return {
+            "title":   _title(lines, s),
+            "rating":  s.rating,
+            "reviews": s.reviews_after_rating or s.reviews_any,
+            "price":   s.price or s.split_price or s.list_price,
+            "delivery":s.delivery,
+            "badges":  s.badges,
+        }
+    out: dict[str, Any] = {}
+    for f in fields:
+        if f == "title":      out[f] = _title(lines, s)
+        elif f == "rating":   out[f] = s.rating
+        elif f == "reviews":  out[f] = s.reviews_after_rating or s.reviews_any
+        elif f == "price":    out[f] = s.price or s.split_price or s.list_price
+        elif f == "delivery": out[f] = s.delivery
+        elif f == "badges":   out[f] = s.badges
+    return out
+
+def project(product: dict[str, Any], fields: tuple[str, ...] | None) -> dict[str, Any]:
+    """Recorta un producto ya purificado a `fields` (+ `id`)."""
+    if fields is None:
+        return product
+    return {k: v for k, v in product.items() if k in fields or k == "id"}
+
+def purify_raw(raw_data: list[Any], fields: tuple[str, ...] | None = None) -> list[dict[str, Any]]:
+    # `id` = posición 1-based en raw_data (se conserva aunque haya entradas descartadas)
+    structured = []
+    for idx, prod in enumerate(raw_data, start=1):
+        if isinstance(prod, dict) and "children_text" in prod:
+            clean = normalize_children_text(prod["children_text"], fields)
+            if clean:
+                clean["id"] = idx
+                structured.append(clean)
+    return structured
@@ -0,0 +1,367 @@
+# app/services/query.py
+"""
+Consultas locales sobre los productos estructurados, antes de llegar a Gemini.
+
+- Índice invertido sobre `title` con ranking BM25.
+- Intenciones reconocibles (ES/EN): "la más barata", "mejor valorada con más de 1000 reseñas",
+  "¿cuáles tienen envío gratis?", "menos de $300"… se resuelven con filtros y orden tipados.
+- El resto de preguntas va al LLM solo con los top-k productos relevantes.
+"""
+import math
+import re
+import unicodedata
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+
+# palabras vacías de las preguntas (ES/EN) y nombres genéricos de "producto"
+STOPWORDS = set("""
+a al algun alguna algunas alguno algunos cual cuales cuanto cuantos cuesta de del dame el en es esta estan este
+esto hay la las lo los me mas menos mi muestra muestrame o para por que quiero se son su sus tiene tienen un una
+unos unas y con sin cual cuál
+an and any are be best by do does for from give has have i in is it its me most of on one ones or show the
+that these this those to what which with
+producto productos articulo articulos opcion opciones item items product products option options
+tarjeta tarjetas grafica graficas
+precio precios price prices cuesta cuestan cost costs dolares usd dollars estrellas stars resenas reviews opiniones
+rating ratings valoracion envio delivery shipping gratis free dime tell list lista cuales tienen
+""".split())
+
+_N = r"(\d[\d.,]*\s*(?:k|mil)?)"
+_REVIEW_WORDS = r"(?:resenas|opiniones|valoraciones|calificaciones|reviews|ratings)"
+_STAR_WORDS = r"(?:estrellas|stars)"
+
+# (campo, descendente, patrón); gana el que aparece antes en la pregunta
+SORTS = [
+    ("price", False, r"\b(?:mas barat[oa]s?|barat[oa]s?|cheapest|lowest price[sd]?|least expensive|best price"
+                     r"|menor precio|mejor precio|precio mas bajo|mas economic[oa]s?|economic[oa]s?)\b"),
+    ("price", True, r"\b(?:mas car[oa]s?|most expensive|highest price[sd]?|mayor precio|precio mas alto)\b"),
+    ("rating", True, r"\b(?:mejor(?:es)? (?:valorad|calificad|puntuad|evaluad)[oa]s?|best[- ]rated|highest[- ]rated"
+                     r"|top[- ]rated|mejor(?:es)? rating|mayor rating|mas estrellas)\b"),
+    ("reviews", True, rf"\b(?:mas {_REVIEW_WORDS}|most {_REVIEW_WORDS}|most reviewed|most popular|mas popular(?:es)?)\b"),
+]
+MIN_REVIEWS = re.compile(rf"(?:mas de|over|more than|at least|al menos|minimo|>=?)\s*{_N}\s*\+?\s*{_REVIEW_WORDS}")
+MAX_PRICE = re.compile(
+    rf"(?:menos de|por debajo de|under|below|less than|cheaper than|hasta|max(?:imo)?|<=?)\s*(?:\$|usd)?\s*{_N}"
+    rf"(?!\s*\+?\s*(?:{_REVIEW_WORDS}|{_STAR_WORDS}|%))"
+)
+MIN_PRICE = re.compile(rf"(?:mas de|over|above|more than|desde|>=?)\s*(?:\$|usd)\s*{_N}")
+MIN_RATING = re.compile(
+    rf"{_N}\s*{_STAR_WORDS}\s*(?:o mas|or more|or above|or higher|\+)"
+    rf"|(?:al menos|at least|mas de|over|above|minimo|>=?)\s*{_N}\s*{_STAR_WORDS}"
+    rf"|(?:rating|valoracion|calificacion)\s*(?:de |above |over |mayor (?:a|que) |>=? ?|minim[oa] |at least )?{_N}"
+)
+# operadores que incluyen el valor límite ("al menos 4 estrellas", "hasta $300"); el resto es estricto
+INCLUSIVE = re.compile(r"at least|al menos|minim[oa]|>=|<=|hasta|max(?:imo)?|desde|o mas|or more|or above|or higher|\+")
+STRICT = re.compile(r"mas de|more than|over|above|mayor|menos de|por debajo|under|below|less than|cheaper than|[<>]")
+FREE_DELIVERY = re.compile(
+    r"(?:envio|entrega|delivery|shipping)s?\s*(?:gratis|gratuit[oa]|free)|free\s*(?:delivery|shipping)|sin costo de envio"
+)
+LIMIT = re.compile(r"\b(?:top|los|las|the)\s+(\d{1,2})\b|\b(\d{1,2})\s+(?:mas|most|best|cheapest|productos|products|opciones|options)\b")
+PLURAL = re.compile(r"\b(?:baratos|baratas|caros|caras|valorados|valoradas|economicos|economicas|cuales|which ones|productos|products|options|opciones)\b")
+# (límite, patrón, inclusivo si la frase no trae operador); en este orden se extraen de la pregunta
+BOUNDS = [
+    ("min_reviews", MIN_REVIEWS, False),
+    ("min_rating", MIN_RATING, True),
+    ("min_price", MIN_PRICE, False),
+    ("max_price", MAX_PRICE, False),
+]
+FREE_DELIVERY_VALUE = re.compile(r"free delivery|env[ií]o gratis|entrega gratis", re.IGNORECASE)
+
+
+def _inclusive(m: re.Match, default: bool) -> bool:
+    # "rating 4" / "rating de 4" no dicen operador: cuenta como mínimo inclusivo
+    text = m.group(0)
+    if INCLUSIVE.search(text):
+        return True
+    return False if STRICT.search(text) else default
+
+
+def fold(text: str) -> str:
+    # minúsculas y sin tildes: "Envío GRATIS" → "envio gratis"
+    text = unicodedata.normalize("NFKD", text.casefold())
+    return "".join(c for c in text if not unicodedata.combining(c))
+
+
+def tokenize(text: str) -> list[str]:
+    return [t for t in re.findall(r"[a-z0-9]+", fold(text)) if t not in STOPWORDS]
+
+
+def parse_number(text: str) -> float:
+    t = text.strip().replace(" ", "")
+    mult = 1
+    if t.endswith("mil"):
+        t, mult = t[:-3], 1000
+    elif t.endswith("k"):
+        t, mult = t[:-1], 1000
+    if re.fullmatch(r"\d+[.,]\d{1,2}", t):
+        return float(t.replace(",", ".")) * mult  # decimal: 299.99 / 4,5
+    return float(re.sub(r"[.,]", "", t) or 0) * mult
+
+
+def price_value(product: dict) -> float | None:
+    m = re.search(r"\d[\d,]*(?:\.\d+)?", product.get("price") or "")
+    return float(m.group(0).replace(",", "")) if m else None
+
+
+def reviews_value(product: dict) -> int | None:
+    digits = re.sub(r"\D", "", str(product.get("reviews") or ""))
+    return int(digits) if digits else None
+
+
+def rating_value(product: dict) -> float | None:
+    r = product.get("rating")
+    try:
+        return float(r) if r is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def has_free_delivery(product: dict) -> bool:
+    return bool(FREE_DELIVERY_VALUE.search(product.get("delivery") or ""))
+
+
+SORT_KEYS = {"price": price_value, "rating": rating_value, "reviews": reviews_value}
+
+
+class BM25Index:
+    """Índice invertido sobre los títulos (Okapi BM25)."""
+
+    def __init__(self, docs: list[str], k1: float = 1.2, b: float = 0.75):
+        self.k1, self.b = k1, b
+        self.postings: dict[str, dict[int, int]] = defaultdict(dict)
+        self.lengths: list[int] = []
+        for i, doc in enumerate(docs):
+            tokens = tokenize(doc)
+            self.lengths.append(len(tokens))
+            for term, tf in Counter(tokens).items():
+                self.postings[term][i] = tf
+        self.n = len(docs)
+        self.avgdl = (sum(self.lengths) / self.n) if self.n else 0.0
+
+    def df(self, term: str) -> int:
+        return len(self.postings.get(term, ()))
+
+    def idf(self, term: str) -> float:
+        df = self.df(term)
+        return math.log(1 + (self.n - df + 0.5) / (df + 0.5))
+
+    def scores(self, terms: list[str]) -> dict[int, float]:
+        out: dict[int, float] = defaultdict(float)
+        for term in set(terms):
+            posting = self.postings.get(term)
+            if not posting:
+                continue
+            idf = self.idf(term)
+            for doc, tf in posting.items():
+                norm = self.k1 * (1 - self.b + self.b * self.lengths[doc] / (self.avgdl or 1))
+                out[doc] += idf * tf * (self.k1 + 1) / (tf + norm)
+        return out
+
+    def search(self, query: str, k: int | None = None) -> list[tuple[int, float]]:
+        ranked = sorted(self.scores(tokenize(query)).items(), key=lambda kv: (-kv[1], kv[0]))
+        return ranked[:k] if k else ranked
+
+
+@dataclass
+class QueryPlan:
+    sort: tuple[str, bool] | None = None  # (campo, descendente)
+    min_reviews: int | None = None
+    min_price: float | None = None
+    max_price: float | None = None
+    min_rating: float | None = None
+    free_delivery: bool = False
+    limit: int | None = None
+    terms: list[str] = field(default_factory=list)  # palabras del título que acotan la búsqueda
+    inclusive: set[str] = field(default_factory=set)  # límites (min_reviews, max_price…) que admiten el valor exacto
+
+    @property
+    def structured(self) -> bool:
+        return bool(
+            self.sort or self.free_delivery
+            or any(v is not None for v in (self.min_reviews, self.min_price, self.max_price, self.min_rating))
+        )
+
+    def to_dict(self) -> dict:
+        return {
+            "sort": {"field": self.sort[0], "desc": self.sort[1]} if self.sort else None,
+            "min_reviews": self.min_reviews,
+            "min_price": self.min_price,
+            "max_price": self.max_price,
+            "min_rating": self.min_rating,
+            "free_delivery": self.free_delivery,
+            "limit": self.limit,
+            "terms": self.terms,
+            "inclusive": sorted(self.inclusive),
+        }
+
+    def within(self, bound: str, value: float | None) -> bool:
+        """`value` cumple el límite `bound` (min_* / max_*) según su operador; sin valor no cumple."""
+        limit = getattr(self, bound)
+        if limit is None:
+            return True
+        if value is None:
+            return False
+        if bound in self.inclusive:
+            return value >= limit if bound.startswith("min_") else value <= limit
+        return value > limit if bound.startswith("min_") else value < limit
+
+
+def parse_question(question: str) -> QueryPlan:
+    q = fold(question)
+    plan = QueryPlan()
+    spans: list[tuple[int, int]] = []
+
+    def take(m: re.Match | None) -> re.Match | None:
+        if m:
+            spans.append(m.span())
+        return m
+
+    first = None
+    for fld, desc, pattern in SORTS:
+        m = re.search(pattern, q)
+        if m and (first is None or m.start() < first[0].start()):
+            first = (m, fld, desc)
+    if first:
+        take(first[0])
+        plan.sort = (first[1], first[2])
+    for bound, pattern, default in BOUNDS:
+        if m := take(pattern.search(q)):
+            value = parse_number(next(g for g in m.groups() if g))
+            setattr(plan, bound, int(value) if bound == "min_reviews" else value)
+            if _inclusive(m, default):
+                plan.inclusive.add(bound)
+    if take(FREE_DELIVERY.search(q)):
+        plan.free_delivery = True
+    if m := take(LIMIT.search(q)):
+        plan.limit = int(m.group(1) or m.group(2))
+    elif plan.sort:
+        plan.limit = 5 if PLURAL.search(q) else 1
+
+    rest = q
+    for s, e in sorted(spans, reverse=True):
+        rest = rest[:s] + " " + rest[e:]
+    plan.terms = tokenize(rest)
+    return plan
+
+
+@dataclass
+class LocalAnswer:
+    answer: str
+    products: list[dict]
+    matched: int
+    plan: QueryPlan
+
+    def to_dict(self) -> dict:
+        return {"answer": self.answer, "product_ids": [p.get("id") for p in self.products],
+                "matched": self.matched, "intent": self.plan.to_dict()}
+
+
+def _describe(p: dict) -> str:
+    bits = [p.get("price") or "precio no disponible"]
+    if p.get("rating") is not None:
+        bits.append(f"{p['rating']} estrellas")
+    if p.get("reviews"):
+        bits.append(f"{p['reviews']} reseñas")
+    if p.get("delivery"):
+        bits.append(p["delivery"])
+    return f"«{p.get('title')}» (id {p.get('id')}): " + ", ".join(bits)
+
+
+def _conditions(plan: QueryPlan) -> str:
+    out = []
+    if plan.terms:
+        out.append("título con " + " ".join(plan.terms))
+
+    def op(bound: str) -> str:
+        if bound.startswith("min_"):
+            return "al menos" if bound in plan.inclusive else "más de"
+        return "hasta" if bound in plan.inclusive else "menos de"
+
+    if plan.min_reviews is not None:
+        out.append(f"{op('min_reviews')} {plan.min_reviews} reseñas")
+    if plan.min_rating is not None:
+        out.append(f"{op('min_rating')} {plan.min_rating:g} estrellas")
+    if plan.min_price is not None:
+        out.append(f"{op('min_price')} ${plan.min_price:g}")
+    if plan.max_price is not None:
+        out.append(f"{op('max_price')} ${plan.max_price:g}")
+    if plan.free_delivery:
+        out.append("envío gratis")
+    return ", ".join(out)
+
+
+SORT_LABELS = {
+    ("price", False): ("más barata", "más baratas"), ("price", True): ("más cara", "más caras"),
+    ("rating", True): ("mejor valorada", "mejor valoradas"), ("reviews", True): ("con más reseñas", "con más reseñas"),
+}
+LIST_MAX = 10
+
+
+class QueryEngine:
+    """Índice + filtros tipados sobre un conjunto de productos purificados."""
+
+    def __init__(self, products: list[dict]):
+        self.products = products
+        self.index = BM25Index([p.get("title") or "" for p in products])
+
+    def _candidates(self, terms: list[str]) -> list[int] | None:
+        # un término que no aparece en ningún título ("¿sirve para jugar?", "bueno") no es un filtro
+        # que sepamos aplicar → None; los que aparecen en todos no acotan
+        if any(self.index.df(t) == 0 for t in terms):
+            return None
+        known = [t for t in terms if self.index.df(t) < self.index.n]
+        if not known:
+            return list(range(len(self.products)))
+        docs = set.intersection(*(set(self.index.postings[t]) for t in known))
+        return sorted(docs)
+
+    def answer(self, question: str) -> LocalAnswer | None:
+        """Respuesta exacta si la pregunta es una intención estructurada; None → pasar al LLM."""
+        plan = parse_question(question)
+        if not plan.structured:
+            return None
+        idx = self._candidates(plan.terms)
+        if idx is None:
+            return None  # habla de algo que no está en los títulos: mejor que lo interprete el LLM
+
+        def ok(p: dict) -> bool:
+            price = price_value(p)
+            return (
+                plan.within("min_reviews", reviews_value(p) or 0)
+                and plan.within("min_rating", rating_value(p) or 0)
+                and plan.within("min_price", price)
+                and plan.within("max_price", price)
+                and (not plan.free_delivery or has_free_delivery(p))
+            )
+
+        hits = [self.products[i] for i in idx if ok(self.products[i])]
+        if plan.sort:
+            fld, desc = plan.sort
+            key = SORT_KEYS[fld]
+            hits = [p for p in hits if key(p) is not None]
+            hits.sort(key=lambda p: (-key(p) if desc else key(p), p.get("id") or 0))
+        cond = _conditions(plan)
+        if not hits:
+            text = f"Ninguno de los {len(self.products)} productos cumple: {cond or 'la condición pedida'}."
+            return LocalAnswer(text, [], 0, plan)
+
+        shown = hits[: plan.limit or LIST_MAX]
+        where = f" ({cond})" if cond else ""
+        if plan.sort and len(shown) == 1:
+            text = f"La opción {SORT_LABELS[plan.sort][0]}{where} es {_describe(shown[0])}."
+        else:
+            head = (f"Las {len(shown)} opciones {SORT_LABELS[plan.sort][1]}" if plan.sort
+                    else f"{len(hits)} de {len(self.products)} productos cumplen")
+            text = f"{head}{where}:\n" + "\n".join(f"- {_describe(p)}" for p in shown)
+            if len(hits) > len(shown) and not plan.sort:
+                text += f"\n… y {len(hits) - len(shown)} más."
+        return LocalAnswer(text, shown, len(hits), plan)
+
+    def top_k(self, question: str, k: int) -> list[dict]:
+        """Los k productos más relevantes para el LLM (todos si ningún término aparece en los títulos)."""
+        if len(self.products) <= k:
+            return self.products
+        ranked = self.index.search(question, k)
+        if not ranked:
+            return self.products  # el presupuesto de tokens del prompt decide cuántos entran
+        return [self.products[i] for i, _ in ranked]
@@ -0,0 +1,227 @@
+# app/services/raw_store.py
+"""
+Capturas del HTML crudo de cada scrape, comprimidas y deduplicadas:
+
+    <RAW_CAPTURE_DIR>/blobs/ab/abcd….html.zst   raw_html por sha256 (una tarjeta que no cambia se guarda una vez)
+    <RAW_CAPTURE_DIR>/scrapes/<scrape_id>.ndjson.zst   cabecera + una línea por producto; raw_html → {"$blob": sha}
+
+Todas las escrituras (capturas, RAW_FILE/DATA_FILE y el nivel en disco de la caché) van a un único hilo en segundo plano:
+el scrape no espera al disco y los volcados se aplican en orden.
+"""
+import gzip
+import hashlib
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, BinaryIO, Callable
+
+from app.core.config import BASE_DIR, RAW_CAPTURE_DIR, RAW_CAPTURE_COMPRESSION
+from app.core.jsonio import atomic_write, dumps, loads
+from app.core.metrics import phase, RAW_BLOBS, RAW_WRITES_PENDING
+
+try:
+    import zstandard
+except ImportError:  # opcional: sin él se usa gzip
+    zstandard = None
+
+RAW_MODES = ("none", "compact", "full")
+_LEVEL = {mode: n for n, mode in enumerate(RAW_MODES)}
+BLOB_REF = "$blob"
+
+
+def needs_raw_html(raw: str) -> bool:
+    return raw == "full"
+
+
+def compact_item(item: Any) -> Any:
+    return {k: v for k, v in item.items() if k != "raw_html"} if isinstance(item, dict) else item
+
+
+class _Codec:
+    def __init__(self, name: str):
+        if name == "auto":
+            name = "zstd" if zstandard is not None else "gzip"
+        if name == "zstd" and zstandard is None:
+            raise RuntimeError("RAW_CAPTURE_COMPRESSION=zstd requiere el paquete zstandard")
+        if name not in ("zstd", "gzip"):
+            raise RuntimeError(f"RAW_CAPTURE_COMPRESSION desconocida: {name!r} (usa auto, zstd o gzip)")
+        self.name = name
+        self.ext = ".zst" if name == "zstd" else ".gz"
+
+    def compress(self, data: bytes) -> bytes:
+        if self.name == "zstd":
+            return zstandard.ZstdCompressor(level=3).compress(data)
+        return gzip.compress(data, compresslevel=6, mtime=0)
+
+
+def _open(path: Path) -> BinaryIO:
+    if path.suffix == ".zst":
+        if zstandard is None:
+            raise RuntimeError(f"{path.name} está comprimido con zstd y falta el paquete zstandard")
+        return zstandard.ZstdDecompressor().stream_reader(open(path, "rb"), closefd=True)
+    return gzip.open(path, "rb")
+
+
+def _read_first_line(path: Path) -> bytes:
+    with _open(path) as fh:
+        buf = b""
+        while b"\n" not in buf:
+            chunk = fh.read(4096)
+            if not chunk:
+                break
+            buf += chunk
+    return buf.split(b"\n", 1)[0]
+
+
+def _decompress(path: Path) -> bytes:
+    with _open(path) as fh:
+        return fh.read()
+
+
+class RawCaptureStore:
+    def __init__(self, root: str | Path = RAW_CAPTURE_DIR, compression: str = RAW_CAPTURE_COMPRESSION):
+        self.root = Path(root)
+        if not self.root.is_absolute():
+            self.root = BASE_DIR / self.root
+        self.codec = _Codec(compression)
+        self._executor: ThreadPoolExecutor | None = None
+        self._pending: set[Future] = set()
+        self._lock = threading.Lock()
+        self.blobs_stored = self.blobs_deduplicated = self.errors = 0
+        self.last_error: str | None = None
+
+    # ── escritura en segundo plano ────────────────────────────────────────────
+    def submit(self, fn: Callable[..., Any], *args: Any) -> Future:
+        """Encola `fn(*args)` en el hilo escritor; los errores se cuentan, no se propagan al scrape."""
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="raw-writer")
+            future = self._executor.submit(fn, *args)
+            self._pending.add(future)
+        future.add_done_callback(self._done)
+        return future
+
+    def _done(self, future: Future) -> None:
+        with self._lock:
+            self._pending.discard(future)
+        if not future.cancelled() and future.exception() is not None:
+            self.errors += 1
+            self.last_error = f"{type(future.exception()).__name__}: {future.exception()}"
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def flush(self) -> None:
+        """Espera a que terminen las escrituras encoladas hasta ahora."""
+        with self._lock:
+            futures = list(self._pending)
+        for f in futures:
+            try:
+                f.result()
+            except Exception:
+                pass  # ya contado en _done
+
+    def close(self) -> None:
+        self.flush()
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+    # ── capturas ─────────────────────────────────────────────────────────────
+    def _blob_path(self, digest: str, ext: str | None = None) -> Path:
+        return self.root / "blobs" / digest[:2] / f"{digest}.html{ext or self.codec.ext}"
+
+    def _capture_path(self, scrape_id: int, ext: str | None = None) -> Path:
+        return self.root / "scrapes" / f"{scrape_id}.ndjson{ext or self.codec.ext}"
+
+    def _put_blob(self, html: str) -> str:
+        data = html.encode("utf-8")
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._blob_path(digest)
+        if path.exists():
+            self.blobs_deduplicated += 1
+            RAW_BLOBS.inc(result="deduplicated")
+            return digest
+        path.parent.mkdir(parents=True, exist_ok=True)
+        atomic_write(path, self.codec.compress(data))
+        self.blobs_stored += 1
+        RAW_BLOBS.inc(result="stored")
+        return digest
+
+    def write_capture(self, scrape_id: int, url: str, items: list, raw: str) -> Path | None:
+        """Escribe (en el hilo actual) la captura de un scrape; `raw="none"` no escribe nada."""
+        if raw not in RAW_MODES:
+            raise ValueError(f"Modo raw desconocido: {raw!r} (usa {', '.join(RAW_MODES)})")
+        if raw == "none":
+            return None
+        with phase("raw_capture"):
+            lines = [dumps({"scrape_id": scrape_id, "url": url, "raw": raw, "items": len(items), "created_at": time.time()})]
+            for item in items:
+                if isinstance(item, dict):
+                    html = item.get("raw_html")
+                    item = compact_item(item)
+                    if raw == "full" and isinstance(html, str):
+                        item[BLOB_REF] = self._put_blob(html)
+                lines.append(dumps(item))
+            path = self._capture_path(scrape_id)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            atomic_write(path, self.codec.compress(b"\n".join(lines) + b"\n"))
+        return path
+
+    def capture(self, scrape_id: int, url: str, items: list, raw: str, only_missing: bool = False) -> Future | None:
+        """Encola la captura; con `only_missing` no reescribe una igual o más completa."""
+        if raw == "none":
+            return None
+        return self.submit(self.ensure_capture if only_missing else self.write_capture, scrape_id, url, items, raw)
+
+    def _find_capture(self, scrape_id: int) -> Path | None:
+        for ext in (".zst", ".gz"):
+            path = self._capture_path(scrape_id, ext)
+            if path.exists():
+                return path
+        return None
+
+    def captured_mode(self, scrape_id: int) -> str | None:
+        path = self._find_capture(scrape_id)
+        if path is None:
+            return None
+        return loads(_read_first_line(path)).get("raw")
+
+    def ensure_capture(self, scrape_id: int, url: str, items: list, raw: str) -> Path | None:
+        # p.ej. un acierto de caché con raw=full sobre un scrape que se capturó en compact
+        if _LEVEL[raw] <= _LEVEL.get(self.captured_mode(scrape_id), 0):
+            return None
+        return self.write_capture(scrape_id, url, items, raw)
+
+    def load(self, scrape_id: int) -> dict | None:
+        """Cabecera + productos en el formato de RAW_FILE (con raw_html reconstruido si se capturó)."""
+        path = self._find_capture(scrape_id)
+        if path is None:
+            return None
+        header, *rows = [loads(line) for line in _decompress(path).splitlines() if line]
+        items = []
+        for item in rows:
+            digest = item.pop(BLOB_REF, None) if isinstance(item, dict) else None
+            if digest is not None:
+                blob = next((p for p in (self._blob_path(digest, e) for e in (".zst", ".gz")) if p.exists()), None)
+                item["raw_html"] = _decompress(blob).decode("utf-8") if blob else None
+            items.append(item)
+        return {**header, "data": items}
+
+    def stats(self) -> dict:
+        return {
+            "dir": str(self.root),
+            "compression": self.codec.name,
+            "pending_writes": self.pending,
+            "blobs_stored": self.blobs_stored,
+            "blobs_deduplicated": self.blobs_deduplicated,
+            "errors": self.errors,
+            "last_error": self.last_error,
+        }
+
+
+raw_store = RawCaptureStore()
+RAW_WRITES_PENDING.set_function(lambda: raw_store.pending)
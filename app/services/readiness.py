@@ -0,0 +1,105 @@
+# app/services/readiness.py
+"""
+Checks de /readiness calculados en segundo plano cada READINESS_INTERVAL segundos:
+la sonda solo lee el último resultado (sin imports, subprocesos ni escrituras por petición).
+"""
+import asyncio
+import importlib.util
+import shutil
+import time
+from typing import Any
+
+from app.core.config import DATA_DIR, READINESS_INTERVAL, STARTUP_WARM
+from app.services.browser_pool import browser_pool
+
+
+def _playwright_installed() -> bool | str:
+    # find_spec no importa el paquete
+    return True if importlib.util.find_spec("playwright") is not None else "error: playwright no instalado"
+
+
+def _fs_write() -> bool | str:
+    try:
+        p = DATA_DIR / ".writetest.tmp"
+        p.write_text("ok", encoding="utf-8")
+        p.unlink(missing_ok=True)
+        return True
+    except Exception as e:
+        return f"error: {e}"
+
+
+def _static_checks() -> dict[str, Any]:
+    return {
+        "playwright_import": _playwright_installed(),
+        "playwright_cli": bool(shutil.which("playwright")),
+        "fs_write": _fs_write(),
+    }
+
+
+def _pool_check(pool: dict) -> bool | str:
+    if not pool["started"]:
+        # sin calentar por configuración arranca con el primer scrape; si debía estar arrancado, no está listo
+        return "error: pool de navegadores no arrancado" if "browser" in STARTUP_WARM else True
+    if pool["connected"] < pool["browsers"]:
+        return f"error: {pool['browsers'] - pool['connected']}/{pool['browsers']} navegadores desconectados"
+    if pool.get("responsive") is not None and pool["responsive"] < pool["connected"]:
+        return f"error: {pool['connected'] - pool['responsive']}/{pool['browsers']} navegadores no responden"
+    return True
+
+
+class ReadinessChecker:
+    def __init__(self, interval: float = READINESS_INTERVAL):
+        self.interval = max(0.5, interval)
+        self._checks: dict[str, Any] | None = None
+        self._pool: dict | None = None
+        self._checked_at = 0.0
+        self._task: asyncio.Task | None = None
+        self._lock = asyncio.Lock()
+        self.refreshes = 0
+
+    async def refresh(self) -> None:
+        async with self._lock:
+            checks = await asyncio.to_thread(_static_checks)
+            pool = browser_pool.alive()
+            pool["responsive"] = await browser_pool.ping() if pool["started"] else None
+            self._checks, self._pool, self._checked_at = checks, pool, time.time()
+            self.refreshes += 1
+
+    async def _loop(self) -> None:
+        while True:
+            try:
+                await self.refresh()
+            except Exception:
+                pass  # el siguiente ciclo lo reintenta; la sonda verá el resultado envejecer
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def snapshot(self) -> dict[str, Any]:
+        # sin bucle (p.ej. sin lifespan) o con el bucle atascado, se recalcula aquí
+        if self._checks is None or time.time() - self._checked_at > 3 * self.interval:
+            await self.refresh()
+        checks = dict(self._checks)
+        # conexión y contextos libres al día; `responsive` es del último ping
+        pool = {**browser_pool.alive(), "responsive": self._pool.get("responsive")}
+        checks["browser_pool"] = _pool_check(pool)
+        ready = all(v is True for v in checks.values())
+        return {
+            "status": "ok" if ready else "degraded",
+            "ready": ready,
+            "checks": checks,
+            "browser_pool": pool,
+            "checked_at": self._checked_at,
+            "age_seconds": round(time.time() - self._checked_at, 3),
+        }
+
+
+readiness = ReadinessChecker()
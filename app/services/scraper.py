@@ -1,48 +1,224 @@
 # app/services/scraper.py
-from playwright.sync_api import sync_playwright
-
-def scrape_amazon(url: str) -> list[dict]:
-    results: list[dict] = []
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=True)
-        context = browser.new_context(
-            locale="es-ES",
-            user_agent=(
-                "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-                "AppleWebKit/537.36 (KHTML, like Gecko) Chrome Safari"
-            )
-        )
-        page = context.new_page()
-
-        page.goto(url, wait_until="domcontentloaded", timeout=60000)
-        page.wait_for_selector("div.s-main-slot")
-
-        cards = page.query_selector_all('div.s-main-slot > div[data-component-type="s-search-result"]')
-        for card in cards:
-            sponsored_badge = card.query_selector('span[data-component-type="s-status-badge-component"]')
-            badge_text = any(
-                "Sponsored" in span.inner_text() or "Patrocinado" in span.inner_text()
-                for span in card.query_selector_all("span")
-            )
-            if sponsored_badge or badge_text:
-                continue
-
-            attrs = {}
-            for name in card.evaluate("el => Array.from(el.attributes).map(a => a.name)"):
-                attrs[name] = card.get_attribute(name)
-
-            children_text = {}
-            for child in card.query_selector_all(":scope > *"):
-                tag = child.evaluate("el => el.tagName.toLowerCase()")
-                text = child.inner_text().strip()
-                if text:
-                    children_text[tag] = text
-
-            results.append({
-                "attrs": attrs,
-                "children_text": children_text,
-                "raw_html": card.inner_html()
-            })
-
-        browser.close()
-    return results
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Awaitable, Callable
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+from app.core.config import SCRAPE_PAGE_CONCURRENCY, SCRAPE_FETCH_MODE
+from app.core.metrics import phase, FALLBACKS, PAGES_FETCHED
+from app.services.browser_pool import browser_pool
+from app.services.blocking import BlockStats, apply_profile, get_profile
+from app.services.extraction import extract_cards, to_raw_items
+from app.services.http_fetch import EmptyResults, FastPathMiss, fetch_search_cards
+from app.services.limiter import scrape_limiter, host_limiter
+
+if TYPE_CHECKING:
+    from playwright.async_api import BrowserContext
+
+FETCH_MODES = ("auto", "http", "browser")
+
+
+@dataclass
+class ScrapeStats:
+    blocked: BlockStats
+    http_pages: int = 0
+    browser_pages: int = 0
+    fallbacks: list[str] = field(default_factory=list)  # motivo de cada caída al navegador
+    failed_pages: list[int] = field(default_factory=list)  # páginas posteriores a la 1 que fallaron
+    truncated: bool = False  # se cortó al llegar a max_items: pudo haber más productos detrás
+
+    @property
+    def complete(self) -> bool:
+        """Se vio toda la búsqueda: un ASIN ausente es un ASIN que ya no aparece."""
+        return not self.failed_pages and not self.truncated
+
+    def to_dict(self) -> dict:
+        return {
+            "http_pages": self.http_pages, "browser_pages": self.browser_pages, "fallbacks": self.fallbacks,
+            "failed_pages": self.failed_pages, "truncated": self.truncated,
+        }
+
+
+def page_url(url: str, page: int) -> str:
+    # Amazon pagina con ?page=N; la página 1 es la URL tal cual
+    if page <= 1:
+        return url
+    parts = urlsplit(url)
+    query = [(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if k != "page"]
+    query.append(("page", str(page)))
+    return urlunsplit(parts._replace(query=urlencode(query)))
+
+def merge_pages(pages: dict[int, list[dict]], max_items: int | None = None) -> list[dict]:
+    # une en orden de página, sin repetir data-asin (los anuncios se repiten entre páginas)
+    seen: set[str] = set()
+    merged: list[dict] = []
+    for n in sorted(pages):
+        for item in pages[n]:
+            asin = (item.get("attrs") or {}).get("data-asin")
+            if asin:
+                if asin in seen:
+                    continue
+                seen.add(asin)
+            merged.append(item)
+            if max_items and len(merged) >= max_items:
+                return merged
+    return merged
+
+def _prefix(pages: dict[int, list[dict]]) -> dict[int, list[dict]]:
+    # páginas consecutivas ya completas desde la 1
+    out, n = {}, 1
+    while n in pages:
+        out[n] = pages[n]; n += 1
+    return out
+
+async def _crawl(
+    fetch: Callable[[int], Awaitable[list[dict]]],
+    pages: int,
+    max_items: int | None,
+    on_items: Callable[[list[dict]], None] | None = None,
+    failed: list[int] | None = None,
+) -> list[dict]:
+    """
+    Pide las páginas 1..N en paralelo, con corte temprano por `max_items` o página vacía.
+    `on_items` recibe los productos nuevos (ya deduplicados y en orden) en cuanto las
+    páginas consecutivas desde la 1 están completas; la concatenación es el resultado final.
+    `failed` recibe el número de cada página posterior a la 1 que falló (el resultado sigue sin ella).
+    """
+    emitted = 0
+
+    def emit(merged: list[dict]) -> None:
+        nonlocal emitted
+        if on_items is not None and len(merged) > emitted:
+            on_items(merged[emitted:])
+            emitted = len(merged)
+
+    if pages <= 1:
+        result = merge_pages({1: await fetch(1)}, max_items)
+        emit(result)
+        return result
+
+    tabs = asyncio.Semaphore(max(1, SCRAPE_PAGE_CONCURRENCY))
+
+    async def run(n: int) -> tuple[int, list[dict]]:
+        async with tabs:
+            return n, await fetch(n)
+
+    tasks = [asyncio.create_task(run(n)) for n in range(1, pages + 1)]
+    done: dict[int, list[dict]] = {}
+    last_page = pages
+    pending = set(tasks)
+    try:
+        while pending:
+            finished, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for t in finished:
+                if t.cancelled():
+                    continue
+                if t.exception() is not None:
+                    if t is tasks[0]:
+                        raise t.exception()  # la primera página es obligatoria
+                    if failed is not None:
+                        failed.append(tasks.index(t) + 1)  # no tumba el crawl, pero queda constancia
+                    continue
+                n, items = t.result()
+                done[n] = items
+                if not items:
+                    # página vacía → no hay más resultados detrás
+                    last_page = min(last_page, n)
+                    for later in tasks[n:]:
+                        later.cancel()
+            prefix = merge_pages(_prefix(done), max_items)
+            emit(prefix)
+            if max_items and len(prefix) >= max_items:
+                break
+    finally:
+        for t in tasks:
+            t.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+    result = merge_pages({n: v for n, v in done.items() if n <= last_page}, max_items)
+    emit(result)  # páginas posteriores a una que falló
+    return result
+
+async def _scrape_page(
+    context: BrowserContext, url: str, block: str | None, stats: BlockStats, raw_html: bool = True,
+    attrs: bool = True, limit_host: bool = True,
+) -> list[dict]:
+    page = await context.new_page()
+    try:
+        await apply_profile(page, get_profile(block), stats)
+        if limit_host:
+            await host_limiter.wait(url)
+        with phase("page_goto"):
+            await page.goto(url, wait_until="domcontentloaded", timeout=60000)
+        with phase("wait_selector"):
+            await page.wait_for_selector("div.s-main-slot")
+        with phase("extract_cards"):
+            cards = await extract_cards(page, raw_html=raw_html, attrs=attrs)
+        PAGES_FETCHED.inc(via="browser")
+        return to_raw_items(cards)
+    finally:
+        await page.close()
+
+async def scrape_amazon(
+    url: str,
+    pages: int = 1,
+    max_items: int | None = None,
+    block: str | None = None,
+    stats: ScrapeStats | None = None,
+    mode: str | None = None,
+    on_items: Callable[[list[dict]], None] | None = None,
+    raw_html: bool = True,
+    attrs: bool = True,
+) -> list[dict]:
+    """
+    `block`: perfil de bloqueo de recursos (minimal | text-only | full; por defecto SCRAPE_BLOCK_PROFILE).
+    `mode`: auto (HTTP y Playwright como respaldo por página) | http | browser; por defecto SCRAPE_FETCH_MODE.
+    `stats`: si se pasa, acumula bloqueos y qué páginas salieron por HTTP o por navegador.
+    `on_items`: callback con cada tanda de productos nuevos según se completan las páginas (ver `_crawl`).
+    `raw_html`: False → las tarjetas no traen `raw_html` (menos IPC con el navegador y menos memoria).
+    `attrs`: False → de los atributos de cada tarjeta solo se guarda `data-asin`.
+    """
+    profile = get_profile(block)
+    mode = mode or SCRAPE_FETCH_MODE
+    if mode not in FETCH_MODES:
+        raise ValueError(f"Modo de scraping desconocido: {mode!r} (usa {', '.join(FETCH_MODES)})")
+    stats = stats if stats is not None else ScrapeStats(BlockStats(profile.name))
+
+    async def in_browser(target: str, limit_host: bool = True) -> list[dict]:
+        # cada página pasa por la admisión y toma su propio contexto (siempre en ese orden):
+        # SCRAPE_MAX_IN_FLIGHT acota páginas de navegador en vuelo, no scrapes
+        async with scrape_limiter.admit():
+            async with browser_pool.context() as context:
+                items = await _scrape_page(context, target, profile.name, stats.blocked, raw_html, attrs, limit_host)
+        stats.browser_pages += 1
+        return items
+
+    async def crawl(fetch: Callable[[int], Awaitable[list[dict]]]) -> list[dict]:
+        result = await _crawl(fetch, pages, max_items, on_items, stats.failed_pages)
+        stats.failed_pages.sort()
+        stats.truncated = bool(max_items) and len(result) >= max_items
+        return result
+
+    if mode == "browser":
+        return await crawl(lambda n: in_browser(page_url(url, n)))
+
+    async def http_first(n: int) -> list[dict]:
+        target = page_url(url, n)
+        try:
+            await host_limiter.wait(target)
+            items = to_raw_items(await fetch_search_cards(target, raw_html=raw_html, attrs=attrs))
+            stats.http_pages += 1
+            PAGES_FETCHED.inc(via="http")
+            return items
+        except FastPathMiss as e:
+            if mode == "http":
+                if isinstance(e, EmptyResults):
+                    return []  # sin navegador con el que confirmarlo: fin de los resultados, no un fallo
+                raise
+            stats.fallbacks.append(f"page {n}: {e}")
+            FALLBACKS.inc()
+        # respaldo: esta página con navegador; el turno del host ya se cobró (un token por página)
+        return await in_browser(target, limit_host=False)
+
+    return await crawl(http_first)
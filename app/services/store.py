@@ -0,0 +1,314 @@
+# app/services/store.py
+import json
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Callable
+
+from app.core.config import BASE_DIR, DATA_DIR, DATABASE_URL
+
+
+class ProductStore(ABC):
+    """
+    Snapshots de cada scrape y sus productos (por ASIN).
+    Implementaciones: SQLiteStore; otras se registran con `register_backend`.
+    """
+
+    @abstractmethod
+    def begin_scrape(self, url: str, url_key: str, fields: tuple[str, ...] | None = None) -> int:
+        """`fields`: campos de sus productos si el scrape pidió una selección (None = todos)."""
+
+    @abstractmethod
+    def add_products(
+        self, scrape_id: int, products: list[dict], asins: list[str | None], fingerprints: list[str | None] | None = None,
+    ) -> None:
+        """`fingerprints`: hash del children_text de cada producto (ver `incremental.fingerprint`)."""
+
+    @abstractmethod
+    def finish_scrape(self, scrape_id: int, raw_items: int, structured_items: int, partial: bool = False) -> None:
+        """`partial`: faltaron páginas o se cortó en max_items (ver `ScrapeStats.complete`)."""
+
+    @abstractmethod
+    def touch_scrape(self, scrape_id: int) -> None:
+        """Marca el snapshot como el último servido (p.ej. al acertar en caché)."""
+
+    @abstractmethod
+    def latest_scrape(self) -> dict | None:
+        """Último snapshot servido con todos los campos (uno recortado con `fields` no sirve a /prompt)."""
+
+    @abstractmethod
+    def latest_snapshot(self, url_key: str) -> tuple[int, list[dict]] | None:
+        """
+        Último scrape terminado de esa clave: (scrape_id, [{asin, fingerprint, product}] en orden).
+        Si era parcial, se completa con los ASIN que no vio tomados de los anteriores (hasta el último
+        completo): lo que no se llegó a ver sigue con su último estado conocido.
+        """
+
+    @abstractmethod
+    def list_scrapes(
+        self, url_key: str | None = None, url: str | None = None, limit: int = 50, offset: int = 0,
+    ) -> list[dict]:
+        """`url_key`: clave exacta (ver `cache_key`); `url`: URL ya normalizada, cualquier pages/max."""
+
+    @abstractmethod
+    def products(
+        self,
+        scrape_id: int | None = None,
+        asin: str | None = None,
+        since: float | None = None,
+        limit: int | None = None,
+        offset: int = 0,
+        with_meta: bool = False,
+    ) -> list[dict]:
+        """Productos tal cual se purificaron; con `with_meta` añade `scrape_id` y `asin`."""
+
+    def close(self) -> None:
+        pass
+
+    def save_scrape(
+        self, url: str, url_key: str, raw_items: int, products: list[dict], asins: list[str | None],
+        fingerprints: list[str | None] | None = None, partial: bool = False, fields: tuple[str, ...] | None = None,
+    ) -> int:
+        scrape_id = self.begin_scrape(url, url_key, fields)
+        self.add_products(scrape_id, products, asins, fingerprints)
+        self.finish_scrape(scrape_id, raw_items, len(products), partial)
+        return scrape_id
+
+
+# scrapes parciales seguidos que se combinan como mucho al reconstruir el último snapshot
+SNAPSHOT_LOOKBACK = 20
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS scrapes (
+    id               INTEGER PRIMARY KEY AUTOINCREMENT,
+    url              TEXT NOT NULL,
+    url_key          TEXT NOT NULL,
+    created_at       REAL NOT NULL,
+    served_at        REAL NOT NULL,
+    finished_at      REAL,
+    raw_items        INTEGER,
+    structured_items INTEGER,
+    partial          INTEGER NOT NULL DEFAULT 0,  -- faltaron páginas o se cortó en max_items
+    fields           TEXT                         -- "title,price" si se pidió una selección; NULL = todos
+);
+CREATE INDEX IF NOT EXISTS ix_scrapes_url_key ON scrapes(url_key, created_at);
+CREATE INDEX IF NOT EXISTS ix_scrapes_created ON scrapes(created_at);
+CREATE INDEX IF NOT EXISTS ix_scrapes_served ON scrapes(served_at);
+
+CREATE TABLE IF NOT EXISTS products (
+    scrape_id  INTEGER NOT NULL REFERENCES scrapes(id) ON DELETE CASCADE,
+    item_id    INTEGER NOT NULL,  -- `id` del producto estructurado
+    asin       TEXT,
+    created_at REAL NOT NULL,
+    title      TEXT,
+    rating     REAL,
+    reviews    TEXT,
+    price      TEXT,
+    delivery   TEXT,
+    fingerprint TEXT,             -- hash del children_text (modo incremental)
+    data       TEXT NOT NULL,     -- producto completo en JSON
+    PRIMARY KEY (scrape_id, item_id)
+);
+CREATE INDEX IF NOT EXISTS ix_products_asin ON products(asin, created_at);
+CREATE INDEX IF NOT EXISTS ix_products_created ON products(created_at);
+"""
+
+
+class SQLiteStore(ProductStore):
+    """SQLite en modo WAL; una conexión por hilo (las llamadas llegan desde el threadpool)."""
+
+    def __init__(self, path: str | Path):
+        self.path = str(path)
+        self._local = threading.local()
+        self._conns: list[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+        with self._conn() as conn:
+            conn.executescript(SCHEMA)
+            columns = {r["name"] for r in conn.execute("PRAGMA table_info(products)")}
+            if "fingerprint" not in columns:  # BD creada antes del modo incremental
+                conn.execute("ALTER TABLE products ADD COLUMN fingerprint TEXT")
+            columns = {r["name"] for r in conn.execute("PRAGMA table_info(scrapes)")}
+            if "partial" not in columns:
+                conn.execute("ALTER TABLE scrapes ADD COLUMN partial INTEGER NOT NULL DEFAULT 0")
+            if "fields" not in columns:
+                conn.execute("ALTER TABLE scrapes ADD COLUMN fields TEXT")
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA foreign_keys=ON")
+            self._local.conn = conn
+            with self._lock:
+                self._conns.append(conn)
+        return conn
+
+    def begin_scrape(self, url: str, url_key: str, fields: tuple[str, ...] | None = None) -> int:
+        now = time.time()
+        with self._conn() as conn:
+            cur = conn.execute(
+                "INSERT INTO scrapes (url, url_key, created_at, served_at, fields) VALUES (?, ?, ?, ?, ?)",
+                (url, url_key, now, now, ",".join(fields) if fields else None),
+            )
+            return cur.lastrowid
+
+    def add_products(
+        self, scrape_id: int, products: list[dict], asins: list[str | None], fingerprints: list[str | None] | None = None,
+    ) -> None:
+        now = time.time()
+        fingerprints = fingerprints or [None] * len(products)
+        rows = [
+            (
+                scrape_id, p.get("id"), asin, now, p.get("title"), p.get("rating"), p.get("reviews"),
+                p.get("price"), p.get("delivery"), fp, json.dumps(p, ensure_ascii=False),
+            )
+            for p, asin, fp in zip(products, asins, fingerprints)
+        ]
+        with self._conn() as conn:  # una transacción por lote
+            conn.executemany(
+                "INSERT OR REPLACE INTO products "
+                "(scrape_id, item_id, asin, created_at, title, rating, reviews, price, delivery, fingerprint, data) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+
+    def finish_scrape(self, scrape_id: int, raw_items: int, structured_items: int, partial: bool = False) -> None:
+        with self._conn() as conn:
+            conn.execute(
+                "UPDATE scrapes SET finished_at = ?, raw_items = ?, structured_items = ?, partial = ? WHERE id = ?",
+                (time.time(), raw_items, structured_items, int(partial), scrape_id),
+            )
+
+    def touch_scrape(self, scrape_id: int) -> None:
+        with self._conn() as conn:
+            conn.execute("UPDATE scrapes SET served_at = ? WHERE id = ?", (time.time(), scrape_id))
+
+    def latest_scrape(self) -> dict | None:
+        row = self._conn().execute(
+            "SELECT * FROM scrapes WHERE finished_at IS NOT NULL AND fields IS NULL ORDER BY served_at DESC LIMIT 1"
+        ).fetchone()
+        return dict(row) if row else None
+
+    def latest_snapshot(self, url_key: str) -> tuple[int, list[dict]] | None:
+        conn = self._conn()
+        scrapes = conn.execute(
+            "SELECT id, partial FROM scrapes WHERE url_key = ? AND finished_at IS NOT NULL "
+            "ORDER BY created_at DESC, id DESC LIMIT ?",
+            (url_key, SNAPSHOT_LOOKBACK),
+        ).fetchall()
+        if not scrapes:
+            return None
+        out: list[dict] = []
+        seen: set[str] = set()
+        for n, scrape in enumerate(scrapes):
+            rows = conn.execute(
+                "SELECT asin, fingerprint, data FROM products WHERE scrape_id = ? ORDER BY item_id", (scrape["id"],),
+            )
+            for r in rows:
+                if n and (not r["asin"] or r["asin"] in seen):
+                    continue  # de los anteriores solo los ASIN que faltan
+                if r["asin"]:
+                    seen.add(r["asin"])
+                out.append({"asin": r["asin"], "fingerprint": r["fingerprint"], "product": json.loads(r["data"])})
+            if not scrape["partial"]:
+                break
+        return scrapes[0]["id"], out
+
+    def list_scrapes(
+        self, url_key: str | None = None, url: str | None = None, limit: int = 50, offset: int = 0,
+    ) -> list[dict]:
+        where, args = [], []
+        if url_key is not None:
+            where.append("url_key = ?"); args.append(url_key)
+        if url is not None:
+            # rango sobre el índice: claves que empiezan por "<url>|"
+            where.append("url_key >= ? AND url_key < ?"); args += [url + "|", url + "}"]
+        sql = "SELECT * FROM scrapes"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY created_at DESC LIMIT ? OFFSET ?"
+        args += [limit, offset]
+        return [dict(r) for r in self._conn().execute(sql, args)]
+
+    def products(
+        self,
+        scrape_id: int | None = None,
+        asin: str | None = None,
+        since: float | None = None,
+        limit: int | None = None,
+        offset: int = 0,
+        with_meta: bool = False,
+    ) -> list[dict]:
+        where, args = [], []
+        if scrape_id is not None:
+            where.append("scrape_id = ?"); args.append(scrape_id)
+        if asin is not None:
+            where.append("asin = ?"); args.append(asin)
+        if since is not None:
+            where.append("created_at >= ?"); args.append(since)
+        sql = "SELECT scrape_id, asin, data FROM products"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY scrape_id DESC, item_id LIMIT ? OFFSET ?"
+        args += [-1 if limit is None else limit, offset]
+        rows = self._conn().execute(sql, args)
+        if not with_meta:
+            return [json.loads(r["data"]) for r in rows]
+        return [{**json.loads(r["data"]), "scrape_id": r["scrape_id"], "asin": r["asin"]} for r in rows]
+
+    def close(self) -> None:
+        with self._lock:
+            for conn in self._conns:
+                conn.close()
+            self._conns.clear()
+        self._local = threading.local()
+
+
+def _sqlite_from_url(url: str) -> SQLiteStore:
+    # sqlite:///relativa/a/BASE_DIR.db | sqlite:////ruta/absoluta.db
+    path = url.split("://", 1)[1]
+    path = path[1:] if path.startswith("/") else path
+    p = Path(path)
+    if not p.is_absolute():
+        p = BASE_DIR / p
+    p.parent.mkdir(parents=True, exist_ok=True)
+    return SQLiteStore(p)
+
+
+_BACKENDS: dict[str, Callable[[str], ProductStore]] = {"sqlite": _sqlite_from_url}
+
+
+def register_backend(scheme: str, factory: Callable[[str], ProductStore]) -> None:
+    """Permite enchufar otro motor (p.ej. "postgresql") para DATABASE_URL."""
+    _BACKENDS[scheme] = factory
+
+
+def create_store(url: str | None = DATABASE_URL) -> ProductStore:
+    if not url:
+        return SQLiteStore(DATA_DIR / "amazon.db")
+    scheme = url.split("://", 1)[0].split("+", 1)[0].lower()
+    factory = _BACKENDS.get(scheme)
+    if factory is None:
+        raise RuntimeError(f"DATABASE_URL no soportada ({scheme}); registra un backend con register_backend()")
+    return factory(url)
+
+
+_store: ProductStore | None = None
+_store_pid: int | None = None
+_store_lock = threading.Lock()
+
+
+def get_store() -> ProductStore:
+    # una instancia por proceso: con gunicorn --preload los workers no heredan las conexiones del padre
+    global _store, _store_pid
+    if _store is None or _store_pid != os.getpid():
+        with _store_lock:
+            if _store is None or _store_pid != os.getpid():
+                _store, _store_pid = create_store(), os.getpid()
+    return _store
@@ -0,0 +1,60 @@
+# app/services/worker_metrics.py
+"""
+/metrics con varios workers (WEB_WORKERS > 1): cada proceso publica sus series en STATE_DB
+cada METRICS_SYNC segundos y el worker que atiende la petición devuelve las de todos,
+cada una con la etiqueta `worker` (agrega con `sum without (worker)`).
+Con un solo worker es el registro en memoria tal cual.
+"""
+import asyncio
+import os
+import sqlite3
+
+from app.core import config
+from app.core.metrics import families, render, render_merged
+from app.core.state import get_state
+
+
+def _multi_worker() -> bool:
+    return config.WEB_WORKERS > 1
+
+
+def publish() -> None:
+    get_state().publish_metrics(families(str(os.getpid())))
+
+
+def collect() -> str:
+    """Texto de /metrics (bloqueante: llamar fuera del event loop)."""
+    if not _multi_worker():
+        return render()
+    try:
+        publish()  # las de este worker, al día
+        return render_merged(get_state().worker_metrics())
+    except sqlite3.Error:
+        return render()  # sin estado compartido: al menos las de este worker
+
+
+class MetricsPublisher:
+    def __init__(self, interval: float = config.METRICS_SYNC):
+        self.interval = max(0.5, interval)
+        self._task: asyncio.Task | None = None
+
+    async def _loop(self) -> None:
+        while True:
+            try:
+                await asyncio.to_thread(publish)
+            except sqlite3.Error:
+                pass  # STATE_DB ocupada: se reintenta en el siguiente ciclo
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        if _multi_worker() and self._task is None:
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+
+metrics_publisher = MetricsPublisher()
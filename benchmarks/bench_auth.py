@@ -0,0 +1,79 @@
+# benchmarks/bench_auth.py
+"""
+Coste por petición de la autenticación: `decode_token` en cada llamada (comportamiento
+anterior de `require_jwt`) frente a la caché de claims verificados de `TokenVerifier`,
+incluida la comprobación de scope. Opcionalmente, a través de la app completa (--http).
+
+    python -m benchmarks.bench_auth [--seconds 2] [--http]
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+
+os.environ.setdefault("JWT_SECRET", "bench-secret")
+os.environ.setdefault("STATE_DB", os.path.join(tempfile.mkdtemp(prefix="amazon-bench-"), "state.db"))
+
+from app.core.auth import require_jwt, require_scope
+from app.core.security import create_access_token, decode_token, TokenVerifier
+
+
+def _per_call_us(fn, seconds: float, batch: int = 200) -> float:
+    n, t0 = 0, time.perf_counter()
+    while True:
+        for _ in range(batch):
+            fn()
+        n += batch
+        elapsed = time.perf_counter() - t0
+        if elapsed >= seconds:
+            return elapsed / n * 1e6
+
+
+def _http(token: str, seconds: float) -> dict:
+    # petición protegida mínima contra la app real (GET /scrape/cache no toca el navegador;
+    # sin `with` no se ejecuta el lifespan, así que no arranca el pool)
+    from fastapi.testclient import TestClient
+    from app.core import security
+    from app.main import app
+
+    headers = {"Authorization": f"Bearer {token}"}
+    out = {}
+    client = TestClient(app)
+    for label, max_entries in (("uncached", 0), ("cached", 10000)):
+        security.token_verifier.__init__(max_entries)
+        out[f"http_{label}_us"] = round(_per_call_us(lambda: client.get("/scrape/cache", headers=headers), seconds / 2), 1)
+    return out
+
+
+def run(seconds: float, http: bool = False) -> dict:
+    token = create_access_token("bench", scopes=["scrape", "ask"])
+    verifier = TokenVerifier()
+    check_scope = require_scope("scrape")
+
+    legacy = _per_call_us(lambda: decode_token(token), seconds)
+    cached = _per_call_us(lambda: check_scope(verifier.verify(token)), seconds)
+    dependency = _per_call_us(lambda: check_scope(require_jwt(token)), seconds)
+    result = {
+        "benchmark": "auth",
+        "decode_every_request_us": round(legacy, 2),
+        "cached_verify_and_scope_us": round(cached, 2),
+        "require_jwt_dependency_us": round(dependency, 2),
+        "speedup": round(legacy / cached, 1),
+        "cache": verifier.stats(),
+    }
+    if http:
+        result.update(_http(token, seconds))
+    return result
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--seconds", type=float, default=2.0)
+    ap.add_argument("--http", action="store_true", help="mide también una petición completa con TestClient")
+    args = ap.parse_args()
+    print(json.dumps(run(args.seconds, args.http), indent=2))
+
+
+if __name__ == "__main__":
+    main()
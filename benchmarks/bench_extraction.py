@@ -0,0 +1,101 @@
+# benchmarks/bench_extraction.py
+"""
+Compara la extracción de tarjetas histórica (llamadas Playwright por elemento)
+contra `extract_cards` (un único `page.evaluate`): idas y vueltas al navegador
+y tiempo de pared, verificando que ambas producen el mismo `raw_data`.
+
+    python -m benchmarks.bench_extraction [--cards 48] [--repeat 5]
+"""
+import argparse
+import asyncio
+import json
+import time
+
+from playwright.async_api import async_playwright
+from app.services.extraction import CARD_SELECTOR, extract_cards, to_raw_items
+from benchmarks.fixtures import render_search_page
+
+
+async def legacy_extract(page) -> tuple[list[dict], int]:
+    # copia del bucle original de `scrape_amazon`, contando cada llamada IPC
+    calls = 0
+    results = []
+    cards = await page.query_selector_all(CARD_SELECTOR); calls += 1
+    for card in cards:
+        sponsored_badge = await card.query_selector('span[data-component-type="s-status-badge-component"]'); calls += 1
+        spans = await card.query_selector_all("span"); calls += 1
+        badge_text = False
+        for span in spans:
+            text = await span.inner_text(); calls += 1
+            if "Sponsored" in text:
+                badge_text = True
+                break
+            text = await span.inner_text(); calls += 1  # el original llamaba inner_text() dos veces
+            if "Patrocinado" in text:
+                badge_text = True
+                break
+        if sponsored_badge or badge_text:
+            continue
+
+        attrs = {}
+        names = await card.evaluate("el => Array.from(el.attributes).map(a => a.name)"); calls += 1
+        for name in names:
+            attrs[name] = await card.get_attribute(name); calls += 1
+
+        children_text = {}
+        children = await card.query_selector_all(":scope > *"); calls += 1
+        for child in children:
+            tag = await child.evaluate("el => el.tagName.toLowerCase()"); calls += 1
+            text = (await child.inner_text()).strip(); calls += 1
+            if text:
+                children_text[tag] = text
+
+        raw_html = await card.inner_html(); calls += 1
+        results.append({"attrs": attrs, "children_text": children_text, "raw_html": raw_html})
+    return results, calls
+
+
+async def engine_extract(page) -> tuple[list[dict], int]:
+    return to_raw_items(await extract_cards(page)), 1
+
+
+async def _time(fn, page, repeat: int) -> tuple[list[dict], int, float]:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out, calls = await fn(page)
+        best = min(best, time.perf_counter() - t0)
+    return out, calls, best
+
+
+async def run(cards: int, repeat: int, locale: str) -> dict:
+    async with async_playwright() as p:
+        browser = await p.chromium.launch(headless=True)
+        page = await browser.new_page()
+        await page.set_content(render_search_page(count=cards, locale=locale))
+        legacy, legacy_calls, legacy_s = await _time(legacy_extract, page, repeat)
+        engine, engine_calls, engine_s = await _time(engine_extract, page, repeat)
+        await browser.close()
+    return {
+        "benchmark": "extraction",
+        "cards": cards,
+        "locale": locale,
+        "extracted": len(engine),
+        "identical": legacy == engine,
+        "legacy": {"round_trips": legacy_calls, "seconds": round(legacy_s, 4)},
+        "engine": {"round_trips": engine_calls, "seconds": round(engine_s, 4)},
+        "speedup": round(legacy_s / engine_s, 1) if engine_s else None,
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--cards", type=int, default=48)
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--locale", choices=["es", "en"], default="es")
+    args = ap.parse_args()
+    print(json.dumps(asyncio.run(run(args.cards, args.repeat, args.locale)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
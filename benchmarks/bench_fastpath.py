@@ -0,0 +1,57 @@
+# benchmarks/bench_fastpath.py
+"""
+Camino rápido HTTP contra el servidor stand-in: tiempo por búsqueda y por página,
+y comprobación de que un muro anti-bot cae al navegador (o falla en modo http).
+
+    python -m benchmarks.bench_fastpath [--pages 3] [--repeat 5]
+"""
+import argparse
+import asyncio
+import json
+import time
+
+from app.services.blocking import BlockStats
+from app.services.http_fetch import FastPathMiss, close_client
+from app.services.scraper import ScrapeStats, scrape_amazon
+from benchmarks.standin_server import serve
+
+
+async def run(pages: int, repeat: int, cards: int) -> dict:
+    with serve(cards=cards) as base:
+        url = f"{base}/s?k=gpus"
+        best = float("inf")
+        items = []
+        for _ in range(repeat):
+            stats = ScrapeStats(BlockStats("minimal"))
+            t0 = time.perf_counter()
+            items = await scrape_amazon(url, pages=pages, stats=stats, mode="http")
+            best = min(best, time.perf_counter() - t0)
+
+        try:
+            await scrape_amazon(f"{base}/s?k=gpus&wall=captcha", mode="http")
+            wall = "no detectado"
+        except FastPathMiss as e:
+            wall = f"FastPathMiss: {e}"
+        await close_client()
+    return {
+        "benchmark": "fastpath_http",
+        "pages": pages,
+        "items": len(items),
+        "seconds": round(best, 4),
+        "seconds_per_page": round(best / pages, 4),
+        "http_pages": stats.http_pages,
+        "bot_wall": wall,
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--pages", type=int, default=3)
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--cards", type=int, default=48)
+    args = ap.parse_args()
+    print(json.dumps(asyncio.run(run(args.pages, args.repeat, args.cards)), indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+# benchmarks/bench_purify.py
+"""
+Comprueba `purify_raw` contra el golden (benchmarks/data/purify_golden.json, generado
+con las heurísticas originales sobre benchmarks/data/scrapped_info_sample.json) y
+mide el throughput en productos/segundo frente a la implementación anterior.
+
+    python -m benchmarks.bench_purify [--raw ruta/scrapped_info.json] [--seconds 2]
+
+Sale con código 1 si la salida difiere del golden.
+"""
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+from app.services.purify import purify_raw, normalize_children_text
+from benchmarks import legacy_purify
+
+DATA = Path(__file__).resolve().parent / "data"
+
+
+def _throughput(fn, products: list, seconds: float) -> float:
+    n, t0 = 0, time.perf_counter()
+    while True:
+        for prod in products:
+            fn(prod)
+        n += len(products)
+        elapsed = time.perf_counter() - t0
+        if elapsed >= seconds:
+            return n / elapsed
+
+
+def run(raw_path: Path, golden_path: Path | None, seconds: float) -> dict:
+    raw = json.loads(raw_path.read_text(encoding="utf-8"))
+    out = purify_raw(raw)
+    golden_ok = None
+    if golden_path is not None:
+        golden = json.loads(golden_path.read_text(encoding="utf-8"))
+        golden_ok = out == golden
+        if not golden_ok:
+            for got, exp in zip(out, golden):
+                if got != exp:
+                    print(f"DIFERENCIA id={exp.get('id')}:\n  esperado {exp}\n  obtenido {got}", file=sys.stderr)
+                    break
+    legacy_ok = out == _legacy_purify_raw(raw)
+
+    texts = [p["children_text"] for p in raw if isinstance(p, dict) and isinstance(p.get("children_text"), dict)]
+    new_pps = _throughput(normalize_children_text, texts, seconds)
+    old_pps = _throughput(legacy_purify.normalize_children_text, texts, seconds)
+    return {
+        "benchmark": "purify",
+        "products": len(texts),
+        "golden_identical": golden_ok,
+        "legacy_identical": legacy_ok,
+        "legacy_products_per_second": round(old_pps),
+        "engine_products_per_second": round(new_pps),
+        "speedup": round(new_pps / old_pps, 2),
+    }
+
+
+def _legacy_purify_raw(raw: list) -> list:
+    out = []
+    for idx, prod in enumerate(raw, start=1):
+        if isinstance(prod, dict) and "children_text" in prod:
+            clean = legacy_purify.normalize_children_text(prod["children_text"])
+            if clean:
+                clean["id"] = idx
+                out.append(clean)
+    return out
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--raw", type=Path, default=DATA / "scrapped_info_sample.json")
+    ap.add_argument("--golden", type=Path, default=None, help="por defecto el golden de benchmarks/data si --raw es la muestra")
+    ap.add_argument("--seconds", type=float, default=2.0)
+    args = ap.parse_args()
+    golden = args.golden or (DATA / "purify_golden.json" if args.raw == DATA / "scrapped_info_sample.json" else None)
+    result = run(args.raw, golden, args.seconds)
+    print(json.dumps(result, indent=2))
+    if result["golden_identical"] is False or not result["legacy_identical"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+# benchmarks/fixtures.py
+"""
+Páginas de resultados sintéticas con la misma estructura que `div.s-main-slot`
+de Amazon (tarjetas `s-search-result`, badges de patrocinado, precios partidos).
+Deterministas: misma semilla → mismo HTML.
+"""
+import html
+import random
+from pathlib import Path
+
+_WORDS = [
+    "NVIDIA", "GeForce", "RTX", "4060", "Gaming", "OC", "8GB", "GDDR6", "Tarjeta", "Gráfica",
+    "ASUS", "Dual", "MSI", "Ventus", "2X", "White", "PCIe", "4.0", "DLSS", "3", "Radeon", "RX",
+    "7600", "Sapphire", "Pulse", "Gigabyte", "Eagle", "Low", "Profile", "Edition",
+]
+
+_TEXT = {
+    "es": {
+        "rating": "{r} de 5 estrellas",
+        "delivery": "Envío GRATIS el mar, 14 de oct",
+        "cart": "Añadir a la cesta",
+        "options": "Ver opciones",
+        "sponsored": "Patrocinado",
+        "stock": "Solo quedan {n} en stock",
+        "decimal": ",",
+    },
+    "en": {
+        "rating": "{r} out of 5 stars",
+        "delivery": "FREE delivery Tue, Oct 14",
+        "cart": "Add to cart",
+        "options": "See options",
+        "sponsored": "Sponsored",
+        "stock": "Only {n} left in stock - order soon.",
+        "decimal": ".",
+    },
+}
+
+
+def _card(rng: random.Random, idx: int, locale: str, sponsored: bool) -> str:
+    t = _TEXT[locale]
+    asin = "B0" + "".join(rng.choice("ABCDEFGHJKLMNPQRSTUVWXYZ0123456789") for _ in range(8))
+    title = " ".join(rng.choice(_WORDS) for _ in range(rng.randint(6, 14)))
+    rating = f"{rng.randint(30, 50) / 10:.1f}".replace(".", t["decimal"])
+    reviews = f"{rng.randint(3, 25000):,}"
+    whole, frac = rng.randint(49, 1899), rng.randint(0, 99)
+    badge = (
+        f'<span data-component-type="s-status-badge-component"><span class="puis-label-popover-default">'
+        f'{t["sponsored"]}</span></span>' if sponsored and idx % 2 else
+        f'<span class="a-color-secondary">{t["sponsored"]}</span>' if sponsored else ""
+    )
+    extras = []
+    if rng.random() < 0.3:
+        extras.append(f'<div class="a-row"><span class="a-color-price">{t["stock"].format(n=rng.randint(1, 9))}</span></div>')
+    if rng.random() < 0.25:
+        extras.append(f'<div class="a-row"><span class="a-text-price">List: ${whole + 40}.{frac:02d}</span></div>')
+    button = t["cart"] if rng.random() < 0.6 else t["options"]
+    return f"""
+<div role="listitem" data-asin="{asin}" data-index="{idx}" data-uuid="{rng.getrandbits(64):016x}"
+     data-component-type="s-search-result" class="sg-col-4-of-24 s-result-item s-asin sg-col" data-cel-widget="search_result_{idx}">
+  <div class="sg-col-inner">
+    <div cel_widget_id="MAIN-SEARCH_RESULTS-{idx}" class="s-widget-container">
+      {badge}
+      <div class="s-product-image-container"><img class="s-image" src="https://m.media-amazon.com/images/I/{asin}.jpg" alt=""></div>
+      <div data-cy="title-recipe"><h2 class="a-size-base-plus"><span>{html.escape(title)}</span></h2></div>
+      <div data-cy="reviews-block" class="a-section">
+        <div class="a-row"><span class="a-icon-alt">{rating} {t["rating"].format(r="").strip()}</span></div>
+        <div class="a-row"><span class="a-size-base s-underline-text">{reviews}</span></div>
+      </div>
+      <div data-cy="price-recipe">
+        <div class="a-row"><span class="a-price"><span class="a-offscreen">${whole}.{frac:02d}</span>
+          <span aria-hidden="true"><span class="a-price-whole">${whole}</span><span class="a-price-decimal">.</span><span class="a-price-fraction">{frac:02d}</span></span></span></div>
+      </div>
+      <div data-cy="delivery-recipe"><div class="a-row"><span>{t["delivery"]}</span></div></div>
+      {"".join(extras)}
+      <div class="puis-atcb-container"><span class="a-button"><span class="a-button-text">{button}</span></span></div>
+    </div>
+  </div>
+</div>"""
+
+
+def render_search_page(count: int = 48, locale: str = "es", sponsored_every: int = 6, seed: int = 0) -> str:
+    rng = random.Random(seed)
+    cards = [
+        _card(rng, i, locale, sponsored=bool(sponsored_every) and i % sponsored_every == 0)
+        for i in range(1, count + 1)
+    ]
+    lang = "es-ES" if locale == "es" else "en-US"
+    return f"""<!doctype html>
+<html lang="{lang}"><head><meta charset="utf-8"><title>Amazon.com : gpus</title>
+<style>.a-offscreen{{position:absolute;left:-9999px}}</style></head>
+<body>
+<div id="search"><div class="s-desktop-width-max s-desktop-content">
+<div class="s-main-slot s-result-list s-search-results sg-row">
+{"".join(cards)}
+</div></div></div>
+</body></html>"""
+
+
+# Juegos de páginas escritos por `write_fixtures` en benchmarks/data/html (se sirven tal cual con el stand-in):
+# nombre → (locale, tarjetas por página, páginas)
+FIXTURE_SETS = {
+    "es-48": ("es", 48, 3),
+    "en-24": ("en", 24, 2),
+    "es-16": ("es", 16, 1),
+}
+HTML_DIR = Path(__file__).resolve().parent / "data" / "html"
+
+
+def fixture_path(name: str, page: int) -> Path:
+    return HTML_DIR / f"{name}_p{page}.html"
+
+
+def write_fixtures(directory: Path = HTML_DIR) -> list[Path]:
+    directory.mkdir(parents=True, exist_ok=True)
+    written = []
+    for name, (locale, count, pages) in FIXTURE_SETS.items():
+        for page in range(1, pages + 1):
+            path = directory / f"{name}_p{page}.html"
+            path.write_text(render_search_page(count=count, locale=locale, seed=page), encoding="utf-8")
+            written.append(path)
+    return written
+
+
+if __name__ == "__main__":
+    # python -m benchmarks.fixtures → regenera benchmarks/data/html
+    for p in write_fixtures():
+        print(p)
@@ -0,0 +1,495 @@
+# benchmarks/run.py
+"""
+Suite de benchmarks offline: páginas de resultados sintéticas (las genera
+`benchmarks.fixtures.write_fixtures` en benchmarks/data/html; no son capturas de Amazon)
+servidas por el stand-in, sin Amazon y con un Gemini simulado.
+
+    scrape_e2e   scrape_amazon(mode="http") + purify por juego de fixtures: tiempo y memoria
+    scrape_browser  scrape_amazon(mode="browser") por juego de fixtures: goto, bloqueo de recursos y
+                 extracción en page.evaluate (se omite si Chromium no está instalado)
+    batch        scrape_batch de varias búsquedas (con latencia de red simulada): una a una frente a en paralelo
+    purify       throughput de normalize_children_text y de un re-scrape sin cambios (completo / incremental)
+    json_write   coste de volcar RAW_FILE/DATA_FILE y de la captura comprimida (a un directorio temporal)
+    api          latencia de POST /scrape (fresco / caché) y POST /prompt (local / LLM / caché)
+    fields       por conjunto de campos (fields=): purify/s, scrape de punta a punta y tamaño de tarjetas y respuesta
+    startup      tiempo de `import app.main` en un proceso nuevo, subsistemas pesados cargados y latencia de /readiness
+
+    python -m benchmarks.run [--out resultados.json] [--baseline base.json] [--tolerance 0.2] [--only scrape_e2e,api]
+
+Imprime JSON. Con --baseline compara cada métrica numérica (sufijos _s/_ms/_us/_bytes:
+menos es mejor; _per_s: más es mejor) y sale con código 1 si alguna empeora más que --tolerance.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+# antes de importar la app: nada de lo que se mida debe tocar data/ ni la BD real
+_TMP = Path(tempfile.mkdtemp(prefix="amazon-bench-"))
+os.environ.setdefault("JWT_SECRET", "bench-secret")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{_TMP / 'bench.db'}")
+os.environ.setdefault("STATE_DB", str(_TMP / "state.db"))
+os.environ.setdefault("RAW_CAPTURE_DIR", str(_TMP / "raw"))
+os.environ.setdefault("EXPORT_JSON_FILES", "false")
+
+from app.services import pipeline
+from app.services.blocking import BlockStats
+from app.services.html_cards import parse_search_cards
+from app.services.http_fetch import close_client
+from app.services.incremental import purify_incremental
+from app.services.purify import normalize_children_text, parse_fields, purify_raw
+from app.services.raw_store import RawCaptureStore
+from app.services.scraper import ScrapeStats, scrape_amazon
+from benchmarks.bench_purify import DATA, _throughput
+from benchmarks.fixtures import FIXTURE_SETS, fixture_path
+from benchmarks.standin_server import serve
+
+BENCHMARKS = ("scrape_e2e", "scrape_browser", "batch", "purify", "json_write", "api", "fields", "startup")
+
+
+def _best(samples: list[float]) -> float:
+    return min(samples)
+
+
+def _ms(seconds: float) -> float:
+    return round(seconds * 1000, 3)
+
+
+# ── scrape_amazon de punta a punta ───────────────────────────────────────────
+async def _scrape_once(url: str, pages: int) -> tuple[list, list]:
+    raw = await scrape_amazon(url, pages=pages, stats=ScrapeStats(BlockStats("minimal")), mode="http")
+    return raw, purify_raw(raw)
+
+
+async def bench_scrape_e2e(repeat: int) -> dict:
+    out = {}
+    for name, (locale, cards, pages) in FIXTURE_SETS.items():
+        with serve(fixtures=name) as base:
+            url = f"{base}/s?k=gpus"
+            await _scrape_once(url, pages)  # calienta el cliente HTTP
+            times = []
+            for _ in range(repeat):
+                t0 = time.perf_counter()
+                raw, structured = await _scrape_once(url, pages)
+                times.append(time.perf_counter() - t0)
+            # memoria en una pasada aparte: tracemalloc ralentiza lo que mide
+            tracemalloc.start()
+            await _scrape_once(url, pages)
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+        out[name] = {
+            "locale": locale,
+            "pages": pages,
+            "raw_items": len(raw),
+            "structured_items": len(structured),
+            "wall_ms": _ms(_best(times)),
+            "median_ms": _ms(statistics.median(times)),
+            "per_page_ms": _ms(_best(times) / pages),
+            "peak_alloc_bytes": peak,
+        }
+    await close_client()
+    return out
+
+
+# ── scrape_amazon con navegador ──────────────────────────────────────────────
+async def bench_scrape_browser(repeat: int) -> dict:
+    from app.services import scraper
+    from app.services.browser_pool import BrowserPool
+
+    # pool propio (sus locks son de este event loop), en lugar del global de la app
+    app_pool, pool = scraper.browser_pool, BrowserPool(size=1)
+    try:
+        await pool.start()
+    except Exception as e:  # sin playwright o sin `playwright install chromium`
+        return {"skipped": f"{type(e).__name__}: {(str(e).splitlines() or [''])[0]}"}
+    scraper.browser_pool = pool
+    out = {}
+    try:
+        for name, (locale, cards, pages) in FIXTURE_SETS.items():
+            with serve(fixtures=name) as base:
+                url = f"{base}/s?k=gpus"
+                times, stats = [], None
+                for i in range(repeat + 1):  # la primera pasada calienta contextos y caché del navegador
+                    stats = ScrapeStats(BlockStats("minimal"))
+                    t0 = time.perf_counter()
+                    raw = await scrape_amazon(url, pages=pages, stats=stats, mode="browser")
+                    if i:
+                        times.append(time.perf_counter() - t0)
+            out[name] = {
+                "locale": locale,
+                "pages": pages,
+                "raw_items": len(raw),
+                "structured_items": len(purify_raw(raw)),
+                "browser_pages": stats.browser_pages,
+                "blocked_requests": stats.blocked.blocked_requests,
+                "allowed_requests": stats.blocked.allowed_requests,
+                "wall_ms": _ms(_best(times)),
+                "median_ms": _ms(statistics.median(times)),
+                "per_page_ms": _ms(_best(times) / pages),
+            }
+    finally:
+        scraper.browser_pool = app_pool
+        await pool.stop()
+    return out
+
+
+# ── lotes de búsquedas ───────────────────────────────────────────────────────
+async def bench_batch(urls: int, delay: float = 0.2) -> dict:
+    from app.services.batch_scrape import scrape_batch
+
+    name = "es-48"
+    _, _, pages = FIXTURE_SETS[name]
+    out = {"urls": urls, "pages": pages, "server_delay_ms": _ms(delay)}
+    with serve(fixtures=name, delay=delay) as base:
+        batch = [f"{base}/s?k=gpu{i}" for i in range(urls)]
+        await scrape_batch(batch[:1], pages=pages, mode="http", fresh=True, raw="none")  # calienta
+        for label, parallelism in (("sequential", 1), ("parallel", None)):
+            items, elapsed = await scrape_batch(batch, parallelism, pages=pages, mode="http", fresh=True, raw="none")
+            failed = sum(i.error is not None for i in items)
+            out[label] = {"wall_ms": _ms(elapsed), "urls_per_s": round(urls / elapsed, 2), "failed": failed}
+    await close_client()
+    return out
+
+
+# ── purify ───────────────────────────────────────────────────────────────────
+def _sample() -> list:
+    return json.loads((DATA / "scrapped_info_sample.json").read_text(encoding="utf-8"))
+
+
+def bench_purify(seconds: float) -> dict:
+    raw = _sample()
+    texts = [p["children_text"] for p in raw if isinstance(p, dict) and isinstance(p.get("children_text"), dict)]
+    # re-scrape incremental sin cambios: huella + reutilización frente a purificar todo de nuevo
+    fixture = _fixture_raw("es-48")
+    inc = purify_incremental(fixture, None)
+    previous = [
+        {"asin": a, "fingerprint": f, "product": p} for a, f, p in zip(inc.asins, inc.fingerprints, inc.structured)
+    ]
+    return {
+        "products": len(texts),
+        "products_per_s": round(_throughput(normalize_children_text, texts, seconds)),
+        "rescrape_full_per_s": round(_throughput(lambda _: purify_raw(fixture), [None], seconds / 2) * len(fixture)),
+        "rescrape_incremental_per_s": round(
+            _throughput(lambda _: purify_incremental(fixture, previous), [None], seconds / 2) * len(fixture)
+        ),
+    }
+
+
+# ── selección de campos ──────────────────────────────────────────────────────
+FIELD_SETS = {"all": None, "title,price": "title,price", "title": "title", "price": "price", "badges": "badges"}
+
+
+async def bench_fields(repeat: int, seconds: float) -> dict:
+    from app.core.jsonio import dumps
+
+    texts = [p["children_text"] for p in _sample() if isinstance(p, dict) and isinstance(p.get("children_text"), dict)]
+    name = "es-48"
+    _, _, pages = FIXTURE_SETS[name]
+    out = {}
+    with serve(fixtures=name) as base:
+        url = f"{base}/s?k=gpus"
+        for label, spec in FIELD_SETS.items():
+            fields = parse_fields(spec)
+            # como /scrape: sin fields, raw_html (RAW_CAPTURE=full) y todos los atributos;
+            # con fields, ni raw_html ni más atributo que data-asin
+            async def once() -> tuple[list, list]:
+                raw = await scrape_amazon(
+                    url, pages=pages, stats=ScrapeStats(BlockStats("minimal")), mode="http",
+                    raw_html=fields is None, attrs=fields is None,
+                )
+                return raw, purify_raw(raw, fields)
+
+            await once()
+            times = []
+            for _ in range(repeat):
+                t0 = time.perf_counter()
+                raw, structured = await once()
+                times.append(time.perf_counter() - t0)
+            out[label] = {
+                "purify_per_s": round(_throughput(lambda t: normalize_children_text(t, fields), texts, seconds / 2)),
+                "scrape_ms": _ms(_best(times)),
+                # lo que viaja del navegador (IPC) o del parser por cada scrape, y lo que se responde
+                "cards_bytes": len(dumps(raw)),
+                "structured_bytes": len(dumps(structured)),
+            }
+    await close_client()
+    return out
+
+
+# ── volcado de RAW_FILE/DATA_FILE ────────────────────────────────────────────
+def _fixture_raw(name: str) -> list[dict]:
+    # tarjetas con raw_html, como las deja scrape_amazon en RAW_FILE
+    _, _, pages = FIXTURE_SETS[name]
+    raw = []
+    for n in range(1, pages + 1):
+        cards, _ = parse_search_cards(fixture_path(name, n).read_text(encoding="utf-8"))
+        raw += [{k: v for k, v in c.items() if k != "sponsored"} for c in cards if not c["sponsored"]]
+    return raw
+
+
+def bench_json_write(repeat: int) -> dict:
+    raw = _fixture_raw("es-48")
+    structured = purify_raw(raw)
+    files = (pipeline.RAW_FILE, pipeline.DATA_FILE, pipeline.EXPORT_LOCK)
+    pipeline.RAW_FILE, pipeline.DATA_FILE = _TMP / "scrapped_info.json", _TMP / "data.json"
+    pipeline.EXPORT_LOCK = _TMP / ".export.lock"
+    try:
+        times = []
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            pipeline._export_files(raw, structured)
+            times.append(time.perf_counter() - t0)
+        size = pipeline.RAW_FILE.stat().st_size + pipeline.DATA_FILE.stat().st_size
+    finally:
+        pipeline.RAW_FILE, pipeline.DATA_FILE, pipeline.EXPORT_LOCK = files
+    out = {
+        "raw_items": len(raw),
+        "structured_items": len(structured),
+        "written_bytes": size,
+        "write_ms": _ms(_best(times)),
+    }
+    # captura comprimida y deduplicada (2ª pasada: los raw_html ya están guardados)
+    for mode in ("compact", "full"):
+        store = RawCaptureStore(_TMP / f"raw-{mode}")
+        store.write_capture(1, "bench", raw, mode)
+        times = []
+        for n in range(repeat):
+            t0 = time.perf_counter()
+            path = store.write_capture(n + 2, "bench", raw, mode)
+            times.append(time.perf_counter() - t0)
+        out[f"capture_{mode}"] = {
+            "compression": store.codec.name,
+            "capture_bytes": path.stat().st_size,
+            "blob_bytes": sum(p.stat().st_size for p in (store.root / "blobs").rglob("*") if p.is_file()),
+            "write_ms": _ms(_best(times)),
+        }
+    return out
+
+
+# ── API en proceso con Gemini simulado ───────────────────────────────────────
+class StubGemini:
+    """Respuesta fija tras `latency` segundos (lo que costaría la llamada real)."""
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.calls = 0
+
+    def generate(self, prompt: str, model: str) -> str:
+        self.calls += 1
+        time.sleep(self.latency)
+        return "Respuesta simulada."
+
+    async def generate_async(self, prompt: str, model: str) -> str:
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+        return "Respuesta simulada."
+
+    async def stream(self, prompt: str, model: str):
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+        for word in ("Respuesta ", "simulada."):
+            yield word
+
+
+async def _latency(call, repeat: int) -> list[float]:
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        resp = await call()
+        times.append(time.perf_counter() - t0)
+        resp.raise_for_status()
+    return times
+
+
+async def bench_api(repeat: int, llm_latency: float) -> dict:
+    # ASGITransport no ejecuta el lifespan: no arranca el pool de navegadores (todo va por HTTP)
+    # y, a diferencia de TestClient, todas las peticiones comparten un único event loop
+    import httpx
+    from app.core.security import create_access_token
+    from app.main import app
+    from app.services import gemini
+
+    stub = StubGemini(llm_latency)
+    gemini.set_client(stub)
+    headers = {"Authorization": f"Bearer {create_access_token('bench', scopes=['scrape', 'ask'])}"}
+    name = "es-48"
+    _, _, pages = FIXTURE_SETS[name]
+    out = {}
+    try:
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench", headers=headers) as client:
+            with serve(fixtures=name) as base:
+                params = {"url": f"{base}/s?k=gpus", "pages": pages, "mode": "http"}
+                fresh = await _latency(lambda: client.post("/scrape", params={**params, "fresh": True}), repeat)
+                cached = await _latency(lambda: client.post("/scrape", params=params), repeat)
+            out["scrape"] = {"fresh_ms": _ms(_best(fresh)), "cached_ms": _ms(_best(cached))}
+
+            local_q = {"question": "¿Cuál es el más barato?"}
+            llm_q = {"question": "¿Cuál recomendarías para jugar en 1440p?"}
+            local = await _latency(lambda: client.post("/prompt", json=local_q), repeat)
+            llm = await _latency(lambda: client.post("/prompt", json={**llm_q, "fresh": True}), repeat)
+            hit = await _latency(lambda: client.post("/prompt", json=llm_q), repeat)
+            out["prompt"] = {
+                "local_ms": _ms(_best(local)),
+                "llm_ms": _ms(_best(llm)),
+                "cached_ms": _ms(_best(hit)),
+                "llm_stub_latency_ms": _ms(llm_latency),
+                "llm_calls": stub.calls,
+            }
+    finally:
+        gemini.set_client(None)
+        await close_client()
+    return out
+
+
+_IMPORT_PROBE = """
+import sys, time
+t0 = time.perf_counter()
+import app.main
+elapsed = time.perf_counter() - t0
+heavy = [m for m in ("google.generativeai", "playwright") if m in sys.modules]
+print(elapsed, ",".join(heavy))
+"""
+
+
+def _import_app() -> tuple[float, list[str]]:
+    # proceso nuevo: sin módulos ya cacheados por el resto de la suite
+    out = subprocess.run(
+        [sys.executable, "-W", "ignore", "-c", _IMPORT_PROBE], capture_output=True, text=True, check=True,
+        cwd=Path(__file__).resolve().parents[1], env=os.environ,
+    ).stdout.split()
+    return float(out[0]), (out[1].split(",") if len(out) > 1 else [])
+
+
+async def bench_startup(repeat: int) -> dict:
+    import httpx
+    from app.main import app
+    from app.services.readiness import readiness
+
+    imports = [_import_app() for _ in range(repeat)]
+    out = {
+        "import_app_ms": _ms(statistics.median(t for t, _ in imports)),
+        "heavy_modules_loaded": imports[-1][1],
+    }
+    refresh = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        await readiness.refresh()
+        refresh.append(time.perf_counter() - t0)
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        probe = await _latency(lambda: client.get("/readiness"), max(repeat, 20))
+    out["readiness"] = {
+        "probe_ms": _ms(statistics.median(probe)),
+        "refresh_ms": _ms(statistics.median(refresh)),  # lo que antes pagaba cada sonda (sin pool arrancado)
+    }
+    return out
+
+
+# ── comparación con una línea base ───────────────────────────────────────────
+def _flatten(results: dict, prefix: str = "") -> dict[str, float]:
+    flat = {}
+    for key, value in results.items():
+        path = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(_flatten(value, path + "."))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[path] = value
+    return flat
+
+
+_INPUTS = {"llm_stub_latency_ms", "server_delay_ms"}  # parámetros de la medida, no resultados
+
+
+def _direction(metric: str) -> int:
+    # +1: más es mejor; -1: menos es mejor; 0: informativa (recuentos, tamaños de entrada…)
+    name = metric.rsplit(".", 1)[-1]
+    if name.endswith("_per_s"):
+        return 1
+    if name.endswith(("_s", "_ms", "_us", "_bytes")) and name not in _INPUTS:
+        return -1
+    return 0
+
+
+def compare(current: dict, baseline: dict, tolerance: float) -> dict:
+    now, base = _flatten(current), _flatten(baseline)
+    changes, regressions = {}, []
+    for metric, value in now.items():
+        direction = _direction(metric)
+        old = base.get(metric)
+        if not direction or not old:
+            continue
+        change = (value - old) / old
+        changes[metric] = {"baseline": old, "current": value, "change": round(change, 3)}
+        if change * direction < -tolerance:
+            regressions.append(metric)
+    return {"tolerance": tolerance, "changes": changes, "regressions": regressions}
+
+
+def run(only: list[str], repeat: int, seconds: float, llm_latency: float, batch_urls: int = 12) -> dict:
+    results = {}
+    if "scrape_e2e" in only:
+        results["scrape_e2e"] = asyncio.run(bench_scrape_e2e(repeat))
+    if "scrape_browser" in only:
+        results["scrape_browser"] = asyncio.run(bench_scrape_browser(repeat))
+    if "batch" in only:
+        results["batch"] = asyncio.run(bench_batch(batch_urls))
+    if "purify" in only:
+        results["purify"] = bench_purify(seconds)
+    if "json_write" in only:
+        results["json_write"] = bench_json_write(repeat)
+    if "api" in only:
+        results["api"] = asyncio.run(bench_api(repeat, llm_latency))
+    if "fields" in only:
+        results["fields"] = asyncio.run(bench_fields(repeat, seconds))
+    if "startup" in only:
+        results["startup"] = asyncio.run(bench_startup(repeat))
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "repeat": repeat,
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            # ru_maxrss: KiB en Linux, bytes en macOS
+            "max_rss_bytes": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * (1 if sys.platform == "darwin" else 1024),
+        },
+        "results": results,
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Benchmarks offline con páginas sintéticas")
+    ap.add_argument("--only", default=",".join(BENCHMARKS), help=f"subconjunto de {','.join(BENCHMARKS)}")
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--seconds", type=float, default=1.0, help="duración de las medidas de throughput")
+    ap.add_argument("--batch-urls", type=int, default=12, help="búsquedas por lote en el benchmark batch")
+    ap.add_argument("--llm-latency", type=float, default=0.05, help="latencia simulada de Gemini (s)")
+    ap.add_argument("--out", type=Path, default=None, help="guarda el resultado (para usarlo como --baseline)")
+    ap.add_argument("--baseline", type=Path, default=None)
+    ap.add_argument("--tolerance", type=float, default=0.2, help="empeoramiento relativo permitido")
+    args = ap.parse_args()
+
+    only = [b.strip() for b in args.only.split(",") if b.strip()]
+    unknown = set(only) - set(BENCHMARKS)
+    if unknown:
+        sys.exit(f"Benchmarks desconocidos: {', '.join(sorted(unknown))}")
+    report = run(only, args.repeat, args.seconds, args.llm_latency, args.batch_urls)
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+        report["comparison"] = compare(report["results"], baseline.get("results", baseline), args.tolerance)
+    if args.out:
+        args.out.write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding="utf-8")
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+    if report.get("comparison", {}).get("regressions"):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+# benchmarks/standin_server.py
+"""
+Servidor HTTP local que imita las búsquedas de Amazon con páginas sintéticas.
+
+    /s?k=...&page=N        → página de resultados (semilla = N)
+    /s?...&wall=captcha    → página de captcha (fuerza el respaldo a navegador)
+    /s?...&empty=1         → s-main-slot sin tarjetas
+
+Con `fixtures=<juego>` sirve las páginas de benchmarks/data/html generadas por
+`fixtures.write_fixtures` (ver FIXTURE_SETS); más allá de la última página, una sin tarjetas.
+Con `failures={página: n}` esa página responde 503 las n primeras veces.
+
+    python -m benchmarks.standin_server --port 8765 [--cards 48] [--locale es] [--fixtures es-48]
+"""
+import argparse
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Iterator
+from urllib.parse import urlsplit, parse_qs
+
+from benchmarks.fixtures import FIXTURE_SETS, fixture_path, render_search_page
+
+CAPTCHA_HTML = """<!doctype html><html><head><title>Robot Check</title></head><body>
+<form action="/errors/validateCaptcha"><p>Type the characters you see in this image:</p></form>
+</body></html>"""
+
+
+def _load_fixture(name: str) -> list[str]:
+    _, _, pages = FIXTURE_SETS[name]
+    return [fixture_path(name, n).read_text(encoding="utf-8") for n in range(1, pages + 1)]
+
+
+def make_handler(
+    cards: int, locale: str, last_page: int, fixtures: str | None = None, delay: float = 0.0,
+    failures: dict[int, int] | None = None,
+):
+    # failures: página → nº de 503 que devolver antes de servirla (se va consumiendo; el llamador puede rellenarlo)
+    saved = _load_fixture(fixtures) if fixtures else None
+    failures = failures if failures is not None else {}
+    fail_lock = threading.Lock()
+    if fixtures:
+        locale, _, last_page = FIXTURE_SETS[fixtures]
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive como Amazon
+
+        def do_GET(self):
+            parts = urlsplit(self.path)
+            qs = parse_qs(parts.query)
+            page = int(qs.get("page", ["1"])[0])
+            with fail_lock:
+                fail = failures.get(page, 0) > 0
+                if fail:
+                    failures[page] -= 1
+            if fail:
+                self.send_response(503)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            if qs.get("wall") == ["captcha"]:
+                body = CAPTCHA_HTML
+            elif qs.get("empty") == ["1"] or page > last_page:
+                body = render_search_page(count=0, locale=locale)
+            elif saved is not None:
+                body = saved[page - 1]
+            else:
+                body = render_search_page(count=cards, locale=locale, seed=page)
+            data = body.encode("utf-8")
+            if delay:
+                time.sleep(delay)  # latencia de red simulada
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, *args):
+            pass
+
+    return Handler
+
+
+@contextmanager
+def serve(
+    port: int = 0, cards: int = 48, locale: str = "es", last_page: int = 20, fixtures: str | None = None,
+    delay: float = 0.0, failures: dict[int, int] | None = None,
+) -> Iterator[str]:
+    """Arranca el servidor en un hilo y devuelve la URL base (http://127.0.0.1:<port>)."""
+    server = ThreadingHTTPServer(
+        ("127.0.0.1", port), make_handler(cards, locale, last_page, fixtures, delay, failures),
+    )
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--cards", type=int, default=48)
+    ap.add_argument("--locale", choices=["es", "en"], default="es")
+    ap.add_argument("--fixtures", choices=sorted(FIXTURE_SETS), default=None, help="servir un juego de páginas de benchmarks/data/html")
+    ap.add_argument("--delay", type=float, default=0.0, help="segundos de latencia por respuesta")
+    args = ap.parse_args()
+    handler = make_handler(args.cards, args.locale, 20, args.fixtures, args.delay)
+    server = ThreadingHTTPServer(("127.0.0.1", args.port), handler)
+    print(f"stand-in en http://127.0.0.1:{args.port}/s?k=gpus")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
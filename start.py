@@ -1,8 +1,68 @@
 # start.py
-import sys, asyncio, uvicorn
+"""
+Arranque del servicio.
+  python start.py                           → un proceso (desarrollo), 127.0.0.1:8000
+  python start.py --workers 8 --host 0.0.0.0 [--preload]
+Con varios workers se usa gunicorn + UvicornWorker si está instalado (Linux/macOS);
+si no, los workers de uvicorn (sin preload). Cada worker arranca su propio pool de navegadores.
+"""
+import os, sys, asyncio, argparse, uvicorn
+
+from app.core import config
+from app.core.config import WEB_HOST, WEB_PORT, WEB_WORKERS, WEB_PRELOAD, WEB_TIMEOUT
+
+try:
+    from gunicorn.app.base import BaseApplication
+except ImportError:  # opcional (no existe en Windows)
+    BaseApplication = None
 
 if sys.platform.startswith("win"):
     asyncio.set_event_loop_policy(asyncio.WindowsProactorEventLoopPolicy())
 
+
+def run_gunicorn(host: str, port: int, workers: int, preload: bool, timeout: int) -> None:
+    class _App(BaseApplication):
+        def load_config(self):
+            options = {
+                "bind": f"{host}:{port}",
+                "workers": workers,
+                "worker_class": "uvicorn.workers.UvicornWorker",
+                "preload_app": preload,  # importa la app una vez en el padre; el lifespan sigue siendo por worker
+                "timeout": timeout,
+                "graceful_timeout": timeout,
+            }
+            for key, value in options.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            from app.main import app
+            return app
+
+    _App().run()
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Amazon scraper API")
+    parser.add_argument("--host", default=WEB_HOST)
+    parser.add_argument("--port", type=int, default=WEB_PORT)
+    parser.add_argument("--workers", type=int, default=WEB_WORKERS, help="procesos (p.ej. nº de núcleos)")
+    parser.add_argument("--preload", action="store_true", default=WEB_PRELOAD, help="cargar la app antes del fork (gunicorn)")
+    parser.add_argument("--timeout", type=int, default=WEB_TIMEOUT)
+    args = parser.parse_args(argv)
+    workers = max(1, args.workers)
+    # la app decide con WEB_WORKERS si publica métricas compartidas: los workers de uvicorn
+    # reimportan la config (entorno) y los de gunicorn heredan este módulo ya importado
+    os.environ["WEB_WORKERS"] = str(workers)
+    config.WEB_WORKERS = workers
+
+    if workers > 1 and BaseApplication is not None:
+        run_gunicorn(args.host, args.port, workers, args.preload, args.timeout)
+        return
+    if args.preload and workers > 1:
+        print("--preload requiere gunicorn; se arranca con los workers de uvicorn", file=sys.stderr)
+    uvicorn.run("app.main:app", host=args.host, port=args.port, workers=workers, reload=False,
+                timeout_graceful_shutdown=args.timeout)
+
+
 if __name__ == "__main__":
-    uvicorn.run("app.main:app", host="127.0.0.1", port=8000, reload=False)
+    main()
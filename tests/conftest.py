@@ -0,0 +1,12 @@
+import os
+import tempfile
+from pathlib import Path
+
+# antes de importar la app: los tests no tocan data/ ni la BD real
+_TMP = Path(tempfile.mkdtemp(prefix="amazon-tests-"))
+os.environ["DATABASE_URL"] = f"sqlite:///{_TMP / 'test.db'}"
+os.environ["STATE_DB"] = str(_TMP / "state.db")
+os.environ["RAW_CAPTURE_DIR"] = str(_TMP / "raw")
+os.environ["EXPORT_JSON_FILES"] = "false"
+os.environ["SCRAPE_CACHE_DIR"] = ""
+os.environ.setdefault("JWT_SECRET", "test-secret")
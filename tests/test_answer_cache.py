@@ -0,0 +1,91 @@
+import asyncio
+
+import pytest
+
+from app.services import gemini
+from app.services.answer_cache import AnswerCache
+
+PRODUCTS = [
+    {"id": 1, "title": "MSI GeForce RTX 4060", "rating": 4.5, "reviews": "1,000", "price": "$300.00"},
+    {"id": 2, "title": "ASUS Dual Radeon RX 7600", "rating": 4.0, "reviews": "999", "price": "$299.99"},
+]
+QUESTION = "¿cuál recomiendas para jugar en 1080p?"
+
+
+class StubClient:
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.calls = 0
+
+    def generate(self, prompt: str, model: str) -> str:
+        raise AssertionError("ask_gemini_cached debe usar generate_async")
+
+    async def generate_async(self, prompt: str, model: str) -> str:
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return f"respuesta {self.calls}"
+
+    async def stream(self, prompt: str, model: str):
+        yield await self.generate_async(prompt, model)
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1_000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def client(monkeypatch):
+    stub = StubClient(delay=0.05)
+    gemini.set_client(stub)
+    monkeypatch.setattr(gemini, "answer_cache", AnswerCache(ttl=60))
+    yield stub
+    gemini.set_client(None)
+
+
+def test_concurrent_identical_questions_share_one_call(client):
+    async def main():
+        return await asyncio.gather(*(gemini.ask_gemini_cached(PRODUCTS, QUESTION) for _ in range(10)))
+
+    results = asyncio.run(main())
+    assert client.calls == 1
+    assert {ans for ans, _, _ in results} == {"respuesta 1"}
+    assert sorted(source for _, _, source in results) == ["coalesced"] * 9 + ["miss"]
+
+
+def test_entry_expires_after_ttl(client, monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(gemini, "answer_cache", AnswerCache(ttl=60, timer=clock))
+
+    async def ask():
+        return (await gemini.ask_gemini_cached(PRODUCTS, QUESTION))[2]
+
+    assert asyncio.run(ask()) == "miss"
+    clock.now += 59
+    assert asyncio.run(ask()) == "hit"
+    clock.now += 2
+    assert asyncio.run(ask()) == "miss"
+    assert client.calls == 2
+
+
+def test_changed_snapshot_misses(client):
+    changed = [dict(PRODUCTS[0], price="$279.00"), PRODUCTS[1]]
+
+    async def ask(products):
+        return (await gemini.ask_gemini_cached(products, QUESTION))[2]
+
+    assert asyncio.run(ask(PRODUCTS)) == "miss"
+    assert asyncio.run(ask(changed)) == "miss"
+    assert asyncio.run(ask(PRODUCTS)) == "hit"
+    assert client.calls == 2
+
+
+def test_same_question_reworded_hits(client):
+    async def ask(question):
+        return (await gemini.ask_gemini_cached(PRODUCTS, question))[2]
+
+    assert asyncio.run(ask(QUESTION)) == "miss"
+    assert asyncio.run(ask("  Cuál recomiendas para jugar en 1080p ")) == "hit"
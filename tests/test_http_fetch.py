@@ -0,0 +1,112 @@
+import asyncio
+from contextlib import asynccontextmanager
+
+import pytest
+
+from app.services import scraper
+from app.services.blocking import BlockStats
+from app.services.html_cards import parse_search_cards
+from app.services.http_fetch import EmptyResults, FastPathMiss, close_client, fetch_search_cards
+from app.services.scraper import ScrapeStats, scrape_amazon
+from benchmarks.fixtures import FIXTURE_SETS, fixture_path
+from benchmarks.standin_server import serve
+
+BROWSER_ITEMS = [{"attrs": {"data-asin": "BROWSER"}, "children_text": {"div": "desde el navegador"}}]
+
+
+def run(coro_fn):
+    async def main():
+        try:
+            return await coro_fn()
+        finally:
+            await close_client()
+
+    return asyncio.run(main())
+
+
+def _without_raw_html(cards: list[dict]) -> list[dict]:
+    # raw_html es el fuente tal cual frente al innerHTML re-serializado por el navegador
+    return [{k: v for k, v in c.items() if k != "raw_html"} for c in cards]
+
+
+def test_html_parser_matches_browser_extraction():
+    pytest.importorskip("playwright.async_api")
+    from playwright.async_api import async_playwright
+    from app.services.extraction import extract_cards
+
+    async def main():
+        async with async_playwright() as p:
+            try:
+                browser = await p.chromium.launch(headless=True)
+            except Exception as e:  # sin `playwright install chromium`
+                pytest.skip(f"Chromium no disponible: {type(e).__name__}")
+            page = await browser.new_page()
+            try:
+                for name, (_, _, pages) in FIXTURE_SETS.items():
+                    for n in range(1, pages + 1):
+                        html = fixture_path(name, n).read_text(encoding="utf-8")
+                        await page.set_content(html)
+                        js = await extract_cards(page)
+                        parsed, has_slot = parse_search_cards(html)
+                        assert has_slot
+                        assert _without_raw_html(parsed) == _without_raw_html(js), f"{name} página {n}"
+            finally:
+                await browser.close()
+
+    asyncio.run(main())
+
+
+@pytest.fixture
+def fake_browser(monkeypatch):
+    # el respaldo usa el pool de la app; aquí cada página "de navegador" devuelve BROWSER_ITEMS
+    class Pool:
+        @asynccontextmanager
+        async def context(self, timeout=None):
+            yield None
+
+    async def scrape_page(context, url, *args, **kwargs):
+        return list(BROWSER_ITEMS)
+
+    monkeypatch.setattr(scraper, "browser_pool", Pool())
+    monkeypatch.setattr(scraper, "_scrape_page", scrape_page)
+
+
+def auto(url: str) -> tuple[list[dict], ScrapeStats]:
+    stats = ScrapeStats(BlockStats("minimal"))
+    raw = run(lambda: scrape_amazon(url, stats=stats, mode="auto", raw_html=False))
+    return raw, stats
+
+
+def test_http_success_skips_browser(fake_browser):
+    with serve(fixtures="es-16") as base:
+        raw, stats = auto(f"{base}/s?k=gpus")
+    assert (stats.http_pages, stats.browser_pages, stats.fallbacks) == (1, 0, [])
+    assert raw and raw != BROWSER_ITEMS
+
+
+def test_captcha_falls_back_to_browser(fake_browser):
+    with serve(fixtures="es-16") as base:
+        with pytest.raises(FastPathMiss, match="captcha"):
+            run(lambda: fetch_search_cards(f"{base}/s?k=gpus&wall=captcha"))
+        raw, stats = auto(f"{base}/s?k=gpus&wall=captcha")
+    assert raw == BROWSER_ITEMS
+    assert (stats.http_pages, stats.browser_pages) == (0, 1)
+    assert stats.fallbacks == ["page 1: captcha/bot wall"]
+
+
+def test_zero_cards_falls_back_to_browser(fake_browser):
+    with serve(fixtures="es-16") as base:
+        with pytest.raises(EmptyResults):
+            run(lambda: fetch_search_cards(f"{base}/s?k=gpus&empty=1"))
+        raw, stats = auto(f"{base}/s?k=gpus&empty=1")
+    assert raw == BROWSER_ITEMS
+    assert stats.fallbacks == ["page 1: s-main-slot vacío"]
+
+
+def test_non_200_falls_back_to_browser(fake_browser):
+    with serve(fixtures="es-16", failures={1: 2}) as base:
+        with pytest.raises(FastPathMiss, match="HTTP 503"):
+            run(lambda: fetch_search_cards(f"{base}/s?k=gpus"))
+        raw, stats = auto(f"{base}/s?k=gpus")
+    assert raw == BROWSER_ITEMS
+    assert stats.fallbacks == ["page 1: HTTP 503"]
@@ -0,0 +1,67 @@
+import asyncio
+
+from app.services.cache import normalize_url
+from app.services.http_fetch import close_client
+from app.services.incremental import IncrementalResult, diff
+from app.services.pipeline import scrape_and_save
+from app.services.store import get_store
+from benchmarks.standin_server import serve
+
+
+def scrape(url: str, **kwargs) -> dict:
+    async def run() -> dict:
+        try:
+            return await scrape_and_save(
+                url, pages=3, fresh=True, mode="http", raw="none", export=False, incremental=True, **kwargs,
+            )
+        finally:
+            await close_client()
+
+    return asyncio.run(run())
+
+
+def test_failed_page_does_not_report_removed():
+    failures: dict[int, int] = {}
+    with serve(fixtures="es-48", failures=failures) as base:
+        url = f"{base}/s?k=failed-page"
+        full = scrape(url)
+        assert full["fetch"]["failed_pages"] == []
+        assert full["delta"]["complete"] is True
+
+        failures[2] = 1  # la página 2 responde un 503
+        partial = scrape(url)
+        assert partial["fetch"]["failed_pages"] == [2]
+        assert partial["structured_items"] < full["structured_items"]
+        assert partial["delta"]["complete"] is False
+        assert partial["delta"]["removed"] == []
+        assert partial["delta"]["added"] == []
+
+        # lo que no se vio sigue en el snapshot: el siguiente scrape completo no lo da por nuevo
+        again = scrape(url)
+        assert again["fetch"]["failed_pages"] == []
+        assert again["delta"]["added"] == [] and again["delta"]["removed"] == []
+        assert again["delta"]["unchanged"] == full["delta"]["unchanged"] + len(full["delta"]["added"])
+
+
+def test_max_items_cut_is_incomplete():
+    with serve(fixtures="es-48") as base:
+        cut = scrape(f"{base}/s?k=max-items", max_items=60)
+    assert cut["structured_items"] == 60
+    assert cut["fetch"]["truncated"] is True
+    assert cut["delta"]["complete"] is False
+
+
+def test_diff_skips_removed_when_incomplete():
+    previous = [{"asin": "B0GONE", "fingerprint": "x", "product": {"id": 1, "title": "Gone"}}]
+    current = IncrementalResult([{"id": 1, "title": "New"}], ["B0NEW"], ["y"])
+    assert diff(7, previous, current).removed == [{"asin": "B0GONE", "id": 1, "title": "Gone"}]
+    assert diff(7, previous, current, complete=False).removed == []
+
+
+def test_partial_scrape_is_marked_in_store():
+    with serve(fixtures="es-48", failures={3: 1}) as base:
+        url = f"{base}/s?k=marked"
+        result = scrape(url)
+    assert result["fetch"]["failed_pages"] == [3]
+    [row] = get_store().list_scrapes(url=normalize_url(url), limit=1)
+    assert row["partial"] == 1
@@ -0,0 +1,32 @@
+from fastapi.testclient import TestClient
+
+from app.core.auth import require_jwt
+from app.main import app
+from app.services.store import get_store
+
+URL = "https://www.amazon.com/s?k=prompt-test"
+FULL = [
+    {"id": 1, "title": "MSI GeForce RTX 4060", "rating": 4.5, "reviews": "1,000", "price": "$300.00"},
+    {"id": 2, "title": "ASUS Dual Radeon RX 7600", "rating": 3.9, "reviews": "999", "price": "$299.99"},
+]
+PRUNED = [{"id": p["id"], "title": p["title"], "price": p["price"]} for p in FULL]
+
+
+def ask(question: str) -> dict:
+    app.dependency_overrides[require_jwt] = lambda: {"sub": "test", "scopes": ["ask"]}
+    try:
+        return TestClient(app).post("/prompt", json={"question": question}).json()
+    finally:
+        app.dependency_overrides.pop(require_jwt, None)
+
+
+def test_pruned_scrape_does_not_replace_full_snapshot_for_prompt():
+    store = get_store()
+    full_id = store.save_scrape(URL, "prompt-test", len(FULL), FULL, ["A1", "A2"])
+    pruned_id = store.save_scrape(URL, "prompt-test", len(PRUNED), PRUNED, ["A1", "A2"], fields=("title", "price"))
+    assert store.latest_scrape()["id"] == full_id != pruned_id
+
+    body = ask("cuales tienen al menos 4 estrellas")
+    assert body["source"] == "local"
+    assert body["matched"] == 1
+    assert body["product_ids"] == [1]
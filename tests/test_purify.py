@@ -0,0 +1,28 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from app.services.purify import FIELDS, project, purify_raw
+from benchmarks import legacy_purify
+
+DATA = Path(__file__).resolve().parent.parent / "benchmarks" / "data"
+RAW = json.loads((DATA / "scrapped_info_sample.json").read_text(encoding="utf-8"))
+GOLDEN = json.loads((DATA / "purify_golden.json").read_text(encoding="utf-8"))
+
+
+def test_matches_golden():
+    assert purify_raw(RAW) == GOLDEN
+
+
+def test_matches_legacy_heuristics():
+    assert purify_raw(RAW) == legacy_purify.purify_raw(RAW)
+
+
+@pytest.mark.parametrize("fields", [
+    ("title",), ("rating",), ("reviews",), ("price",), ("delivery",), ("badges",),
+    ("title", "price"), ("rating", "reviews"), ("price", "delivery", "badges"), FIELDS,
+])
+def test_fields_match_legacy_projection(fields):
+    # solo se ejecutan los extractores pedidos, pero el resultado es el de siempre recortado
+    assert purify_raw(RAW, fields) == [project(p, fields) for p in legacy_purify.purify_raw(RAW)]
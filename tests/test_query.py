@@ -0,0 +1,64 @@
+from app.services.query import QueryEngine, parse_question
+
+PRODUCTS = [
+    {"id": 1, "title": "MSI GeForce RTX 4060 Gaming X", "rating": 4.5, "reviews": "1,000", "price": "$300.00",
+     "delivery": "Envío GRATIS el mar, 14 de oct"},
+    {"id": 2, "title": "ASUS Dual Radeon RX 7600", "rating": 4.0, "reviews": "999", "price": "$299.99",
+     "delivery": "Recíbelo el lunes"},
+    {"id": 3, "title": "Gigabyte GeForce RTX 4070 Gaming OC", "rating": 4.8, "reviews": "2,500", "price": "$549.00",
+     "delivery": "Envío GRATIS el jue, 16 de oct"},
+]
+
+
+def ids(answer) -> list[int]:
+    return [p["id"] for p in answer.products]
+
+
+def test_unknown_title_word_falls_through_to_llm():
+    # "good" no aparece en ningún título: no se responde como "la más barata de gaming"
+    assert QueryEngine(PRODUCTS).answer("is the cheapest one good for gaming?") is None
+
+
+def test_known_title_word_narrows():
+    assert ids(QueryEngine(PRODUCTS).answer("cheapest gaming")) == [1]
+
+
+def test_min_reviews_at_least_is_inclusive():
+    engine = QueryEngine(PRODUCTS)
+    assert ids(engine.answer("which ones have at least 1000 reviews?")) == [1, 3]
+    assert ids(engine.answer("cuales tienen al menos 1000 reseñas")) == [1, 3]
+    assert ids(engine.answer("cuales tienen >= 1000 reseñas")) == [1, 3]
+
+
+def test_min_reviews_more_than_is_strict():
+    assert ids(QueryEngine(PRODUCTS).answer("which ones have more than 1000 reviews?")) == [3]
+
+
+def test_min_rating_over_is_strict():
+    engine = QueryEngine(PRODUCTS)
+    assert ids(engine.answer("which ones have over 4.5 stars?")) == [3]
+    assert ids(engine.answer("cuales tienen mas de 4.5 estrellas")) == [3]
+    assert ids(engine.answer("which ones have above 4.5 stars?")) == [3]
+
+
+def test_min_rating_at_least_is_inclusive():
+    engine = QueryEngine(PRODUCTS)
+    assert ids(engine.answer("which ones have at least 4.5 stars?")) == [1, 3]
+    assert ids(engine.answer("cuales tienen 4.5 estrellas o mas")) == [1, 3]
+
+
+def test_max_price_up_to_is_inclusive():
+    engine = QueryEngine(PRODUCTS)
+    assert ids(engine.answer("cuales cuestan hasta $300")) == [1, 2]
+    assert ids(engine.answer("products max $300")) == [1, 2]
+    assert ids(engine.answer("products <= $300")) == [1, 2]
+
+
+def test_max_price_under_is_strict():
+    assert ids(QueryEngine(PRODUCTS).answer("products under $300")) == [2]
+
+
+def test_plan_records_inclusive_bounds():
+    plan = parse_question("al menos 1000 reseñas y hasta $300")
+    assert (plan.min_reviews, plan.max_price) == (1000, 300)
+    assert plan.inclusive == {"min_reviews", "max_price"}
@@ -0,0 +1,55 @@
+import time
+import uuid
+
+import pytest
+from fastapi.testclient import TestClient
+from jose import JWTError, jwt
+
+from app.core import config, security
+from app.core.security import TokenVerifier, create_access_token
+from app.main import app
+
+
+def short_lived_token(seconds: int) -> tuple[str, int]:
+    exp = int(time.time()) + seconds
+    claims = {"sub": "test", "scopes": ["ask"], "exp": exp, "jti": uuid.uuid4().hex}
+    return jwt.encode(claims, security.JWT_SECRET, algorithm=security.ALGORITHM), exp
+
+
+def test_cached_token_rejected_after_exp():
+    verifier = TokenVerifier(sync_interval=60)
+    token, exp = short_lived_token(1)
+    verifier.verify(token)
+    verifier.verify(token)
+    assert verifier.hits == 1  # el segundo uso sale de la caché de claims
+    time.sleep(max(0.0, exp + 1 - time.time()))
+    with pytest.raises(JWTError):
+        verifier.verify(token)
+
+
+def test_revoked_in_other_worker_rejected_within_sync_interval(monkeypatch):
+    monkeypatch.setattr(config, "WEB_WORKERS", 2)
+    worker_a, worker_b = TokenVerifier(sync_interval=0.2), TokenVerifier(sync_interval=0.2)
+    token = create_access_token("test", scopes=["ask"])
+    worker_a.verify(token)  # en caché en A
+    worker_b.revoke(token)
+    with pytest.raises(JWTError):
+        worker_b.verify(token)
+    time.sleep(0.25)
+    with pytest.raises(JWTError):
+        worker_a.verify(token)
+
+
+def test_single_worker_reads_revocations_on_start():
+    token = create_access_token("test", scopes=["ask"])
+    TokenVerifier().revoke(token)
+    with pytest.raises(JWTError):
+        TokenVerifier().verify(token)  # p.ej. revocado antes de un reinicio
+
+
+def test_missing_scope_is_forbidden():
+    client = TestClient(app)
+    token = create_access_token("test", scopes=["scrape"])
+    resp = client.post("/prompt", json={"question": "la más barata"}, headers={"Authorization": f"Bearer {token}"})
+    assert resp.status_code == 403
+    assert client.post("/prompt", json={"question": "la más barata"}).status_code == 401